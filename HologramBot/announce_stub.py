@@ -0,0 +1,76 @@
+# announce_stub.py - Test için sahte hologram cihazı: UDP duyurusu + isteğe bağlı WebSocket ucu
+
+"""
+Kullanım:
+    python announce_stub.py --id TEST_DEVICE_1
+    python announce_stub.py --id TEST_DEVICE_1 --serve          # ws://0.0.0.0:8080/ws de açılır
+
+Duyuru biçimi (bot.py / _main.py pasif keşfi ile aynı):
+    "HOLOGRAM <device_id> <port>"  ->  UDP yayını, varsayılan port 8089
+--serve ile PING -> PONG, GET_ID -> <device_id> yanıtlayan, onaylı moddaki
+komutlara "ACK <device_id> <seq>" dönen küçük bir cihaz taklidi çalışır.
+"""
+
+import argparse
+import asyncio
+import socket
+
+import websockets
+
+
+async def announce(device_id: str, ws_port: int, announce_port: int, interval: float, target: str):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    message = f"HOLOGRAM {device_id} {ws_port}".encode("utf-8")
+    try:
+        while True:
+            sock.sendto(message, (target, announce_port))
+            print(f"📣 {message.decode()} -> {target}:{announce_port}")
+            await asyncio.sleep(interval)
+    finally:
+        sock.close()
+
+
+async def serve(device_id: str, port: int):
+    async def handler(ws):
+        async for message in ws:
+            if not isinstance(message, str):
+                continue
+            if message.startswith("PING"):
+                await ws.send(f"PONG {device_id}")
+            elif message == "GET_ID":
+                await ws.send(device_id)
+            elif message.startswith(device_id + " "):
+                content = message[len(device_id) + 1:]
+                # Onaylı mod: "#<seq> <komut>" -> "ACK <id> <seq>"
+                if content.startswith("#") and " " in content:
+                    seq, content = content[1:].split(" ", 1)
+                    await ws.send(f"ACK {device_id} {seq}")
+                print(f"📥 {content}")
+
+    async with websockets.serve(handler, "0.0.0.0", port):
+        print(f"🔌 Cihaz taklidi: ws://0.0.0.0:{port}/ws")
+        await asyncio.Future()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Sahte hologram cihazı duyurucu")
+    parser.add_argument("--id", default="TEST_DEVICE")
+    parser.add_argument("--port", type=int, default=8080, help="cihazın WebSocket portu")
+    parser.add_argument("--announce-port", type=int, default=8089)
+    parser.add_argument("--interval", type=float, default=2.0)
+    parser.add_argument("--target", default="255.255.255.255", help="yayın veya tek adres (örn. 127.0.0.1)")
+    parser.add_argument("--serve", action="store_true", help="PING/GET_ID yanıtlayan WebSocket ucu da aç")
+    args = parser.parse_args()
+
+    jobs = [announce(args.id, args.port, args.announce_port, args.interval, args.target)]
+    if args.serve:
+        jobs.append(serve(args.id, args.port))
+    await asyncio.gather(*jobs)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
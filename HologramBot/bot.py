@@ -5,16 +5,20 @@ from discord.ext import commands, tasks
 import asyncio
 import websockets
 import socket
-import subprocess
-import platform
+import math
+import random
+import ipaddress
 import re
 import json
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Iterator, Iterable, Callable
 import logging
 import os
 from dotenv import load_dotenv
 from datetime import datetime
 import aiohttp
+from protocol_v2 import PROTOCOL_VERSION, hello, parse_hello, decode_acks
+from device_link import (ACK_TIMEOUT, BATCH_MAX_COMMANDS, RELAY_KEY, CommandQueue, DeliveryResult,
+                         DeviceState, RelayLink, send_commands)
 
 # .env dosyasındaki değişkenleri yükle
 load_dotenv()
@@ -45,6 +49,58 @@ MODEL_SHORTCUTS: Dict[str, Dict[str, Any]] = {}
 # Config dosya yolu
 CONFIG_FILE = "bot_config.json"
 
+# Cihaz portu ve tarama ayarları
+DEVICE_PORT = 8080
+SCAN_CONCURRENCY = 256       # aynı anda açık TCP bağlantı denemesi
+SCAN_CONNECT_TIMEOUT = 0.5   # port açık mı? (saniye)
+SCAN_PROGRESS_INTERVAL = 2.0 # ilerleme mesajı en fazla bu sıklıkta düzenlenir (Discord hız sınırı)
+
+# Cihazların isteğe bağlı UDP duyuruları: "HOLOGRAM <device_id> [port]"
+ANNOUNCE_PORT = int(os.getenv("HOLOGRAM_ANNOUNCE_PORT", "8089"))
+ANNOUNCE_MAGIC = "HOLOGRAM"
+
+# Arka plan yeniden keşfi (DHCP ile IP'si değişen cihazlar için)
+DISCOVERY_TTL = 60.0          # bu süre içinde yoklanan adres tekrar yoklanmaz (saniye)
+REDISCOVERY_INTERVAL = 10     # bağlı olmayan cihaz varken tarama sıklığı (saniye)
+REDISCOVERY_CONCURRENCY = 64
+
+# Giden komut kuyrukları (birleştirme/öncelik kuralları ve ACK_TIMEOUT): device_link.py
+
+# Onaylı mod: "<device_id> #<seq> <komut>" gönderilir, cihaz "ACK <device_id> <seq>" döner.
+# Cihaz bazında config'teki "ack" anahtarı ile açılır (varsayılan: HOLOGRAM_ACK_MODE)
+ACK_MODE = os.getenv("HOLOGRAM_ACK_MODE", "0") == "1"
+
+# İkili komut protokolü (protocol_v2.py): bağlanınca "HELLO" ile anlaşılır, cevap
+# gelmezse metin protokolü sürer. Cihaz bazında config'teki "v2" anahtarı ile açılır
+# (varsayılan: HOLOGRAM_PROTOCOL_V2). Röle modunda her zaman metin kullanılır.
+PROTOCOL_V2 = os.getenv("HOLOGRAM_PROTOCOL_V2", "0") == "1"
+
+# Toplu gönderim: bir cihaza BATCH_WINDOW içinde sıraya giren komutlar tek çerçevede gider
+#   metin: "<device_id> BATCH <adet>\n<komut>\n<komut>..." (onaylı modda satırlar "#<seq> <komut>",
+#          cihaz "ACK <device_id> <seq> <seq>..." ile toplu onaylar)
+#   v2:    "<device_id> " + protocol_v2.encode_batch
+# 0 kapatır; cihaz yazılımı desteklemiyorsa config'te "batch": false
+BATCH_WINDOW = float(os.getenv("HOLOGRAM_BATCH_WINDOW_MS", "0")) / 1000.0
+
+# Canlılık: PING -> PONG süresi (RTT); art arda MAX_MISSED_PONGS kaçırılırsa bağlantı ölü sayılır
+HEARTBEAT_INTERVAL = 5.0
+PONG_TIMEOUT = 2.0            # kaçırılan PONG'dan sonra tam aralık beklenmeden tekrar denenir
+MAX_MISSED_PONGS = 3
+HEARTBEAT_TICK = 0.25         # zamanlayıcı çarkının dilim süresi (saniye)
+HEARTBEAT_JITTER = 0.5        # her yeniden planlamaya eklenen ± sapma (saniye)
+
+# Yeniden bağlanma: aynı anda en fazla CONNECT_CONCURRENCY el sıkışma, bekleme süresi
+# [0, min(MAX, BASE * 2^deneme)] aralığından rastgele (full jitter)
+CONNECT_CONCURRENCY = 8
+RECONNECT_BASE_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+RECONNECT_STABLE_AFTER = 30.0 # bu kadar ayakta kalan bağlantıdan sonra backoff sıfırlanır
+
+# Röle modu: cihaz başına soket yerine röle sunucusuna (holographic-display-main/server)
+# tek bağlantı. Röle her mesajı herkese yayınlar, cihazlar "<device_id> " önekiyle süzer.
+# Sınıfın kendisi device_link.RelayLink (GUI ile ortak); görev anahtarı RELAY_KEY.
+RELAY_URL = os.getenv("HOLOGRAM_RELAY_URL", "")   # örn. ws://192.168.1.10:8080/ws; boşsa doğrudan
+
 # ===== BOT AYARLARI =====
 intents = discord.Intents.default()
 intents.message_content = True
@@ -55,13 +111,31 @@ bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
 # Global WebSocket bağlantıları
 websockets_dict: Dict[str, websockets.WebSocketClientProtocol] = {}
 websocket_connected_dict: Dict[str, bool] = {}
-websocket_tasks: Dict[str, asyncio.Task] = {}
+command_queues: Dict[str, "CommandQueue"] = {}
+connection_health: Dict[str, "ConnectionHealth"] = {}
+device_states: Dict[str, "DeviceState"] = {}
+heartbeat_wheel: Optional["HeartbeatWheel"] = None
+connection_supervisor: Optional["ConnectionSupervisor"] = None
+relay_link: Optional["BotRelayLink"] = None
+
+# Kanal başına süren tarama (!iptal ile durdurulur)
+active_scans: Dict[int, asyncio.Task] = {}
+
+# Pasif keşif: IP -> son duyuru
+announced_devices: Dict[str, Dict[str, Any]] = {}
+announcement_transport: Optional[asyncio.DatagramTransport] = None
+
+# Keşif önbelleği: device_id -> {"ip", "seen"}; cihaz çıkmayan adresler: IP -> son yoklama
+discovery_cache: Dict[str, Dict[str, Any]] = {}
+empty_addresses: Dict[str, datetime] = {}
+pending_verifications: set = set()
 
 # İstatistikler
 stats = {
     "commands_executed": 0,
     "messages_sent": 0,
     "devices_discovered": 0,
+    "ip_changes": 0,
     "uptime_start": None
 }
 
@@ -93,11 +167,10 @@ def save_config():
         logger.error(f"Config kaydetme hatası: {e}")
 
 # ===== AĞ TARAMA FONKSİYONLARI =====
-async def check_hologram_device(ip: str) -> Dict[str, Any]:
+async def check_hologram_device(ip: str, port: int = DEVICE_PORT) -> Dict[str, Any]:
     """Bir IP'de hologram cihazı olup olmadığını kontrol et"""
     try:
-        # PORT 8080 OLARAK DEĞİŞTİRİLDİ
-        ws_url = f"ws://{ip}:8080/ws"
+        ws_url = f"ws://{ip}:{port}/ws"
         async with asyncio.timeout(2):
             ws = await websockets.connect(ws_url)
             try:
@@ -116,7 +189,7 @@ async def check_hologram_device(ip: str) -> Dict[str, Any]:
                     device_id = f"DEVICE_{ip.replace('.', '_')}"
                 
                 await ws.close()
-                return {"ip": ip, "device_id": device_id, "found": True}
+                return {"ip": ip, "port": port, "device_id": device_id, "found": True}
             except Exception as e:
                 logger.debug(f"Device check failed for {ip}: {e}")
                 await ws.close()
@@ -125,86 +198,751 @@ async def check_hologram_device(ip: str) -> Dict[str, Any]:
         logger.debug(f"Connection failed for {ip}: {e}")
         return {"ip": ip, "found": False}
 
-async def scan_network(ip_range: str = "192.168.1") -> List[Dict[str, Any]]:
-    """Ağdaki tüm hologram cihazlarını bul"""
-    logger.info(f"🔍 Network scan started: {ip_range}.x")
-    
-    async def ping_ip(i: int) -> Optional[str]:
-        ip = f"{ip_range}.{i}"
+def parse_scan_networks(ip_range: str) -> List[Any]:
+    """Tarama aralığını ağlara çevir (geçersiz aralık ValueError fırlatır)
+
+    Kabul edilenler (virgülle birden fazla verilebilir):
+      "192.168.1"       -> eski biçim, 192.168.1.0/24
+      "10.0.0.0/22"     -> CIDR
+      "192.168.1.50"    -> tek adres
+    """
+    networks = []
+    for part in ip_range.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "/" not in part and part.count(".") == 2:
+            part += ".0/24"
+        networks.append(ipaddress.ip_network(part, strict=False))
+    return networks
+
+def iter_scan_targets(ip_range: str) -> Iterator[str]:
+    """Tarama hedeflerini sırayla üret"""
+    for network in parse_scan_networks(ip_range):
+        if network.num_addresses == 1:
+            yield str(network.network_address)
+        else:
+            for host in network.hosts():
+                yield str(host)
+
+def count_scan_targets(ip_range: str) -> int:
+    """Taranacak adres sayısı (ilerleme yüzdesi için)"""
+    return sum(1 if network.num_addresses == 1 else max(network.num_addresses - 2, 1)
+               for network in parse_scan_networks(ip_range))
+
+# ===== PASİF KEŞİF =====
+class AnnouncementProtocol(asyncio.DatagramProtocol):
+    """Cihaz duyurularını dinler: "HOLOGRAM <device_id> [port]" (UDP yayını)"""
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]):
+        parts = data.decode("utf-8", errors="ignore").split()
+        if len(parts) < 2 or parts[0] != ANNOUNCE_MAGIC:
+            return
+        port = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else DEVICE_PORT
+        if addr[0] not in announced_devices:
+            logger.info(f"📣 Duyuru: {parts[1]} @ {addr[0]}:{port}")
+        announced_devices[addr[0]] = {"device_id": parts[1], "port": port, "seen": datetime.now()}
+        note_announcement(parts[1], addr[0], port)
+
+async def start_announcement_listener() -> None:
+    """Duyuru dinleyicisini bir kez başlat (on_ready tekrar çalışabilir)"""
+    global announcement_transport
+    if announcement_transport is not None:
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        announcement_transport, _ = await loop.create_datagram_endpoint(
+            AnnouncementProtocol, local_addr=("0.0.0.0", ANNOUNCE_PORT), allow_broadcast=True
+        )
+        logger.info(f"📣 Cihaz duyuruları dinleniyor: UDP {ANNOUNCE_PORT}")
+    except OSError as e:
+        logger.warning(f"⚠️ Duyuru portu açılamadı ({ANNOUNCE_PORT}): {e}")
+
+def announced_port(ip: str) -> int:
+    """Adresin duyurduğu WebSocket portu (duyuru yoksa DEVICE_PORT)"""
+    return announced_devices.get(ip, {}).get("port", DEVICE_PORT)
+
+def device_port(info: Dict[str, Any]) -> int:
+    """Kayıtlı cihazın portu (eski config'lerde "port" yok)"""
+    return info.get("port", DEVICE_PORT)
+
+async def read_neighbour_table() -> List[str]:
+    """İşletim sisteminin ARP/komşu tablosundaki IPv4 adresleri"""
+    if os.path.exists("/proc/net/arp"):
+        with open("/proc/net/arp", "r", encoding="utf-8") as f:
+            rows = [line.split() for line in f.read().splitlines()[1:]]
+        # Flags 0x0 = çözümlenmemiş kayıt
+        return [row[0] for row in rows if len(row) >= 4 and row[2] != "0x0"]
+    # Linux dışı (Windows/macOS): tek bir "arp -a" çıktısı
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "arp", "-a", stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+        output, _ = await asyncio.wait_for(proc.communicate(), timeout=3)
+    except (OSError, asyncio.TimeoutError):
+        return []
+    ips = []
+    for ip in re.findall(r"\b\d{1,3}(?:\.\d{1,3}){3}\b", output.decode(errors="ignore")):
         try:
-            param = '-n' if platform.system().lower() == 'windows' else '-c'
-            command = ['ping', param, '1', '-w', '100', ip]
-            result = await asyncio.create_subprocess_exec(
-                *command,
-                stdout=asyncio.subprocess.DEVNULL,
-                stderr=asyncio.subprocess.DEVNULL
-            )
-            await asyncio.wait_for(result.wait(), timeout=1.0)
-            if result.returncode == 0:
-                return ip
-        except (asyncio.TimeoutError, Exception):
-            pass
-        return None
-    
-    # Tüm IP'leri ping'le
-    ping_tasks = [ping_ip(i) for i in range(1, 255)]
-    ping_results = await asyncio.gather(*ping_tasks)
-    active_ips = [ip for ip in ping_results if ip is not None]
-    
-    logger.info(f"📡 {len(active_ips)} aktif IP bulundu")
-    
-    # Aktif IP'lerde WebSocket kontrolü yap
-    ws_tasks = [check_hologram_device(ip) for ip in active_ips]
-    ws_results = await asyncio.gather(*ws_tasks)
-    found_devices = [device for device in ws_results if device["found"]]
-    
+            addr = ipaddress.ip_address(ip)
+        except ValueError:
+            continue
+        if not (addr.is_multicast or addr.is_unspecified or ip.endswith(".255")):
+            ips.append(ip)
+    return ips
+
+async def passive_candidates(ip_range: Optional[str] = None) -> List[str]:
+    """Duyuru yapan + komşu tablosundaki adresler (aralık verildiyse sadece içindekiler)"""
+    candidates = list(dict.fromkeys(list(announced_devices) + await read_neighbour_table()))
+    if ip_range:
+        networks = parse_scan_networks(ip_range)
+        candidates = [ip for ip in candidates
+                      if any(ipaddress.ip_address(ip) in network for network in networks)]
+    return candidates
+
+async def probe_port(ip: str, port: int = DEVICE_PORT, timeout: float = SCAN_CONNECT_TIMEOUT) -> bool:
+    """Bloklamayan TCP bağlantısı: port açık mı? (ICMP'ye bağlı değil)"""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+async def probe_targets(targets: Iterable[str], concurrency: int = SCAN_CONCURRENCY,
+                        on_found: Optional[Callable[[Dict[str, Any]], None]] = None,
+                        progress: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+    """Hedefleri sabit sayıda worker ile yokla; sonuçlar keşif önbelleğine işlenir"""
+    targets = iter(targets)
+    found_devices: List[Dict[str, Any]] = []
+    if progress is None:
+        progress = {}
+    progress.update(scanned=0, open=0)
+
+    async def worker():
+        for ip in targets:
+            port = announced_port(ip)
+            is_open = await probe_port(ip, port)
+            progress["scanned"] += 1
+            if not is_open:
+                empty_addresses[ip] = datetime.now()
+                continue
+            progress["open"] += 1
+            device = await check_hologram_device(ip, port)
+            if not device["found"]:
+                empty_addresses[ip] = datetime.now()
+                continue
+            found_devices.append(device)
+            remember_device(device["device_id"], ip, port)
+            if on_found is not None:
+                on_found(device)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return found_devices
+
+async def scan_network(ip_range: Optional[str] = "192.168.1", concurrency: int = SCAN_CONCURRENCY,
+                       on_found: Optional[Callable[[Dict[str, Any]], None]] = None,
+                       progress: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+    """Ağdaki tüm hologram cihazlarını bul
+
+    Önce pasif adaylar (UDP duyuruları + ARP tablosu) yoklanır; ip_range None
+    ise sadece onlar, verildiyse ardından aralığın geri kalanı taranır.
+    Sabit sayıda worker hedefleri ortak bir üreticiden çeker; /16 gibi büyük
+    aralıklarda bile görev/soket sayısı concurrency ile sınırlı kalır.
+    PING/GET_ID el sıkışması sadece portu açık adreslerde yapılır.
+    Bulunan her cihaz anında on_found'a verilir; progress sözlüğünde
+    "total" / "scanned" / "open" sayaçları güncellenir.
+    """
+    candidates = await passive_candidates(ip_range)
+    candidate_set = set(candidates)
+
+    def all_targets() -> Iterator[str]:
+        yield from candidates
+        if ip_range:
+            for ip in iter_scan_targets(ip_range):
+                if ip not in candidate_set:
+                    yield ip
+
+    targets = all_targets()
+    logger.info(f"🔍 Network scan started: {ip_range or 'pasif'} ({len(candidates)} pasif aday)")
+
+    if progress is None:
+        progress = {}
+    # Aralık verildiyse adaylar zaten aralığın içinde
+    total = count_scan_targets(ip_range) if ip_range else len(candidates)
+    progress.update(total=total)
+    found_devices = await probe_targets(targets, concurrency, on_found, progress)
+
+    logger.info(f"📡 {progress['open']} adreste cihaz portu açık")
     logger.info(f"✅ {len(found_devices)} hologram cihazı bulundu")
     stats["devices_discovered"] += len(found_devices)
     
     return found_devices
 
+# ===== KEŞİF ÖNBELLEĞİ VE IP DEĞİŞİKLİĞİ TAKİBİ =====
+def remember_device(device_id: str, ip: str, port: int = DEVICE_PORT) -> None:
+    """El sıkışmayla doğrulanmış cihazı önbelleğe yaz; kayıtlı cihaz taşındıysa bağlantıyı yenile
+
+    Kayıtlı adresteki bağlantı hâlâ açıksa yeni adres ikinci bir arayüz/yansıma
+    olabilir: taşımadan önce eski adres yoklanır (confirm_move). Bağlantı kopmuşsa
+    (DHCP yenilemesi) hemen taşınır.
+    """
+    for nickname, info in HOLOGRAM_DEVICES.items():
+        old = (info["ip"], device_port(info))
+        if (info["device_id"] == device_id and old != (ip, port)
+                and websocket_connected_dict.get(nickname, False)):
+            key = (device_id, old)
+            if key not in pending_verifications:
+                pending_verifications.add(key)
+                asyncio.get_running_loop().create_task(confirm_move(device_id, ip, port, *old))
+            return
+    accept_device_address(device_id, ip, port)
+
+def accept_device_address(device_id: str, ip: str, port: int) -> None:
+    """Adresi önbelleğe yaz ve kayıtlı cihazları oraya taşı"""
+    discovery_cache[device_id] = {"ip": ip, "port": port, "seen": datetime.now()}
+    empty_addresses.pop(ip, None)
+    relocate_device(device_id, ip, port)
+
+async def confirm_move(device_id: str, ip: str, port: int, old_ip: str, old_port: int) -> None:
+    """Eski adres hâlâ aynı cihazsa yeni adres ikinci arayüzdür; yanıt vermiyorsa taşı"""
+    try:
+        device = await check_hologram_device(old_ip, old_port)
+        if device["found"] and device["device_id"] == device_id:
+            logger.debug(f"{device_id} ayrıca {ip}:{port} adresinde görüldü, kayıtlı adres korunuyor")
+            return
+        accept_device_address(device_id, ip, port)
+    finally:
+        pending_verifications.discard((device_id, (old_ip, old_port)))
+
+def relocate_device(device_id: str, ip: str, port: int = DEVICE_PORT) -> List[str]:
+    """device_id'si eşleşen kayıtlı cihazların adresini güncelle ve bağlantılarını yeniden başlat"""
+    moved = []
+    for nickname, info in HOLOGRAM_DEVICES.items():
+        if info["device_id"] == device_id and (info["ip"], device_port(info)) != (ip, port):
+            logger.info(f"🔀 [{nickname}] Adres değişti: {info['ip']}:{device_port(info)} -> {ip}:{port}")
+            info["ip"] = ip
+            info["port"] = port
+            moved.append(nickname)
+    if moved:
+        stats["ip_changes"] += len(moved)
+        save_config()
+        for nickname in moved:
+            restart_connection(nickname)
+    return moved
+
+def restart_connection(nickname: str) -> None:
+    """Cihazın bağlantı görevini iptal edip yenisini başlat (bekleyen backoff beklenmez)"""
+    websocket_connected_dict[nickname] = False
+    get_connection_supervisor().restart(nickname)
+
+def note_announcement(device_id: str, ip: str, port: int = DEVICE_PORT) -> None:
+    """Duyuru kayıtlı bir cihazın yeni adresini (veya portunu) gösteriyorsa el sıkışmayla doğrula"""
+    cached = discovery_cache.get(device_id)
+    if cached is not None and (cached["ip"], cached["port"]) == (ip, port):
+        cached["seen"] = datetime.now()
+        return
+    known = any(info["device_id"] == device_id and (info["ip"], device_port(info)) != (ip, port)
+                for info in HOLOGRAM_DEVICES.values())
+    if known and ip not in pending_verifications:
+        pending_verifications.add(ip)
+        asyncio.get_running_loop().create_task(verify_address(ip))
+
+async def verify_address(ip: str) -> None:
+    """Duyuru yapan adresi doğrula (duyurular kimlik doğrulamasız UDP'dir)"""
+    port = announced_port(ip)
+    try:
+        device = await check_hologram_device(ip, port)
+        if device["found"]:
+            remember_device(device["device_id"], ip, port)
+    finally:
+        pending_verifications.discard(ip)
+
+def rediscovery_targets(missing: List[Dict[str, Any]], candidates: List[str]) -> Iterator[str]:
+    """Sadece bayat veya bilinmeyen adresler
+
+    Pasif adaylar (duyuru/ARP) önbellekte taze bir cihazın adresi değilse her
+    turda yoklanır; kayıp cihazların son bilinen /24 ağındaki diğer adresler
+    ise ayrıca son DISCOVERY_TTL içinde boş çıkmadıysa yoklanır.
+    """
+    now = datetime.now()
+    missing_ids = {info["device_id"] for info in missing}
+
+    def is_fresh(seen: datetime) -> bool:
+        return (now - seen).total_seconds() < DISCOVERY_TTL
+
+    occupied = {entry["ip"] for device_id, entry in discovery_cache.items()
+                if device_id not in missing_ids and is_fresh(entry["seen"])}
+    emitted = set(occupied)
+    for ip in candidates:
+        if ip not in emitted:
+            emitted.add(ip)
+            yield ip
+    networks = dict.fromkeys(ipaddress.ip_network(f"{info['ip']}/24", strict=False) for info in missing)
+    for network in networks:
+        for host in network.hosts():
+            ip = str(host)
+            seen = empty_addresses.get(ip)
+            if ip in emitted or (seen is not None and is_fresh(seen)):
+                continue
+            emitted.add(ip)
+            yield ip
+
 # ===== WEBSOCKET BAĞLANTISI VE YÖNETİMİ =====
-async def connect_websocket(nickname: str) -> None:
-    """Bir cihaza WebSocket bağlantısı kur ve heartbeat gönder"""
-    device_info = HOLOGRAM_DEVICES.get(nickname)
-    if not device_info:
+def get_heartbeat_wheel() -> "HeartbeatWheel":
+    """Ortak heartbeat çarkı (ilk bağlantıda, bot döngüsü içinde oluşturulur)"""
+    global heartbeat_wheel
+    if heartbeat_wheel is None:
+        heartbeat_wheel = HeartbeatWheel()
+    return heartbeat_wheel
+
+def get_connection_supervisor() -> "ConnectionSupervisor":
+    """Ortak bağlantı yöneticisi (bot döngüsü içinde oluşturulur)"""
+    global connection_supervisor
+    if connection_supervisor is None:
+        connection_supervisor = ConnectionSupervisor()
+    return connection_supervisor
+
+def get_relay_link() -> "BotRelayLink":
+    """Röle bağlantısı (sadece RELAY_URL ayarlıysa kullanılır)"""
+    global relay_link
+    if relay_link is None:
+        relay_link = BotRelayLink(RELAY_URL, websocket_connected_dict, command_queues)
+    return relay_link
+
+class ConnectionHealth:
+    """Bir bağlantının PING/PONG durumu (okuyucu görev doldurur, HeartbeatWheel okur)"""
+
+    def __init__(self):
+        self.closed = asyncio.Event()
+        self.generation = 0                      # her yeni bağlantıda artar (eski çark kayıtları geçersiz)
+        self.ws = None
+        self.device_id = ""
+        self.protocol = 1                        # HELLO cevabıyla anlaşılan sürüm
+        self.ping_sent_at: Optional[float] = None
+        self.last_rx: Optional[float] = None     # cihazdan son mesaj (loop.time())
+        self.rtt_ms: Optional[float] = None      # son ölçüm
+        self.srtt_ms: Optional[float] = None     # yumuşatılmış (1/8 ağırlık)
+        self.missed = 0
+        self.dead_connections = 0
+
+    def reset(self, ws, device_id: str) -> None:
+        """Yeni bağlantı: olay ve kaçırma sayacı sıfırlanır, RTT geçmişi kalır"""
+        self.closed = asyncio.Event()
+        self.generation += 1
+        self.ws = ws
+        self.device_id = device_id
+        self.protocol = 1
+        self.ping_sent_at = None
+        self.last_rx = None
+        self.missed = 0
+
+    def on_pong(self) -> None:
+        if self.ping_sent_at is None:
+            return   # beklenmeyen/tekrarlanan PONG
+        self.rtt_ms = (asyncio.get_running_loop().time() - self.ping_sent_at) * 1000.0
+        self.srtt_ms = self.rtt_ms if self.srtt_ms is None else self.srtt_ms + (self.rtt_ms - self.srtt_ms) / 8
+        self.ping_sent_at = None
+        self.missed = 0
+
+    def summary(self) -> str:
+        if self.rtt_ms is None:
+            return "RTT ölçülmedi"
+        text = f"RTT {self.rtt_ms:.0f} ms (ort. {self.srtt_ms:.0f})"
+        if self.missed:
+            text += f" · {self.missed} PONG kaçtı"
+        if self.protocol >= 2:
+            text += f" · protokol v{self.protocol}"
+        return text
+
+def record_command(nickname: str, command: str, receipt: Optional[asyncio.Future]) -> None:
+    device_states.setdefault(nickname, DeviceState()).record(command, receipt)
+
+def resync_device(nickname: str, put: Callable[[str], Optional[asyncio.Future]]) -> None:
+    """Yeniden bağlanan cihaza sadece farklı kalan alanları gönder"""
+    state = device_states.get(nickname)
+    commands = state.pending() if state is not None else []
+    if not commands:
         return
-    
-    device_id = device_info["device_id"]
-    # PORT 8080 OLARAK DEĞİŞTİRİLDİ
-    websocket_url = f"ws://{device_info['ip']}:8080/ws"
-    reconnect_delay = 3
-    max_reconnect_delay = 30
+    state.resyncs += 1
+    state.replayed += len(commands)
+    logger.info(f"🔁 [{nickname}] Durum senkronlanıyor: {' · '.join(commands)}")
+    for command in commands:
+        state.record(command, put(command))
+
+class HeartbeatWheel:
+    """Tüm cihazların heartbeat'ini tek görevden yöneten zamanlayıcı çarkı
+
+    Çark HEARTBEAT_TICK'lik dilimlerden oluşur; her bağlantı (nickname, nesil)
+    anahtarıyla bir dilime yazılır. İlk dilim aralık içinde rastgele seçilir,
+    sonraki planlamalara ±jitter eklenir; böylece aynı anda açılan yüzlerce
+    bağlantı bile aralığa eşit yayılır. Bir dilim geldiğinde:
+      - PING bekliyorsa ve PONG_TIMEOUT dolduysa kaçırma sayılır, hemen yeniden
+        PING atılır; MAX_MISSED_PONGS'ta bağlantı ölü ilan edilir (closed olayı).
+      - Cihazdan aralık içinde mesaj geldiyse (PONG, ACK...) PING atlanır.
+      - Aksi halde PING atılır, PONG_TIMEOUT sonrasına kontrol planlanır.
+    Bir dilimdeki PING'ler tek seferde gönderilir. Boş dilimlerde uyanılmaz:
+    görev bir sonraki dolu dilime (veya yeni kayda) kadar uyur.
+    """
+
+    def __init__(self, interval: float = HEARTBEAT_INTERVAL, tick: float = HEARTBEAT_TICK,
+                 jitter: float = HEARTBEAT_JITTER, pong_timeout: float = PONG_TIMEOUT,
+                 max_missed: int = MAX_MISSED_PONGS):
+        self.interval = interval
+        self.tick = tick
+        self.pong_timeout = pong_timeout
+        self.max_missed = max_missed
+        self.interval_ticks = max(1, round(interval / tick))
+        self.jitter_ticks = round(jitter / tick)
+        self.timeout_ticks = max(1, math.ceil(pong_timeout / tick))
+        self.slots: List[set] = [set() for _ in range(self.interval_ticks + self.jitter_ticks + self.timeout_ticks + 1)]
+        self.current = 0          # son işlenen mutlak dilim
+        self.origin: Optional[float] = None
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {"wakeups": 0, "pings": 0, "skipped": 0, "missed": 0, "dead": 0}
+
+    def __len__(self) -> int:
+        return sum(len(slot) for slot in self.slots)
+
+    def _schedule(self, key: Tuple[str, int], delay_ticks: int) -> None:
+        n = len(self.slots)
+        base = self.current
+        if self.origin is not None:
+            # Görev uyurken gelen kayıt gerçek zamana göre planlanır
+            now_tick = int((asyncio.get_running_loop().time() - self.origin) / self.tick)
+            if now_tick > self.current and not any(self.slots):
+                self.current = now_tick    # boş çark: aradaki dilimleri işlemeye gerek yok
+            base = max(self.current, min(now_tick, self.current + n - 2))
+        delay_ticks = max(1, min(delay_ticks, n - 1 - (base - self.current)))
+        self.slots[(base + delay_ticks) % n].add(key)
+        self.changed.set()
+
+    def _jittered(self, ticks: int) -> int:
+        return ticks + random.randint(-self.jitter_ticks, self.jitter_ticks)
+
+    def register(self, nickname: str, health: ConnectionHealth) -> None:
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        self._schedule((nickname, health.generation), random.randint(1, self.interval_ticks))
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.origin = origin = loop.time() - self.current * self.tick
+        n = len(self.slots)
+        while True:
+            now_tick = int((loop.time() - origin) / self.tick)
+            while self.current < now_tick:
+                self.current += 1
+                due = self.slots[self.current % n]
+                if due:
+                    self.slots[self.current % n] = set()
+                    await self._fire(due)
+
+            self.changed.clear()
+            delay = next((d for d in range(1, n) if self.slots[(self.current + d) % n]), None)
+            timeout = None if delay is None else max(0.0, origin + (self.current + delay) * self.tick - loop.time())
+            try:
+                await asyncio.wait_for(self.changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self.stats["wakeups"] += 1
+
+    async def _fire(self, due: set) -> None:
+        now = asyncio.get_running_loop().time()
+        batch: List[Tuple[str, ConnectionHealth]] = []
+        for key in due:
+            nickname, generation = key
+            health = connection_health.get(nickname)
+            if health is None or health.generation != generation or health.closed.is_set():
+                continue   # bağlantı kapanmış/yenilenmiş: kayıt düşer
+
+            if health.ping_sent_at is not None:
+                waited = now - health.ping_sent_at
+                if waited < self.pong_timeout:
+                    self._schedule(key, math.ceil((self.pong_timeout - waited) / self.tick))
+                    continue
+                health.missed += 1
+                self.stats["missed"] += 1
+                logger.warning(f"⚠️ [{nickname}] PONG gelmedi ({health.missed}/{self.max_missed})")
+                if health.missed >= self.max_missed:
+                    logger.error(f"💀 [{nickname}] Cihaz yanıt vermiyor, bağlantı yenileniyor")
+                    health.dead_connections += 1
+                    self.stats["dead"] += 1
+                    websocket_connected_dict[nickname] = False
+                    health.closed.set()
+                    continue
+            elif health.last_rx is not None and now - health.last_rx < self.interval:
+                # Yakın zamanda trafik var: bağlantı canlı, PING gereksiz
+                self.stats["skipped"] += 1
+                remaining = self.interval - (now - health.last_rx)
+                self._schedule(key, self._jittered(math.ceil(remaining / self.tick)))
+                continue
+
+            health.ping_sent_at = now
+            batch.append((nickname, health))
+            self._schedule(key, self.timeout_ticks)
+
+        if not batch:
+            return
+        results = await asyncio.gather(*(h.ws.send(f"PING {h.device_id}") for _, h in batch),
+                                       return_exceptions=True)
+        for (nickname, health), result in zip(batch, results):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ [{nickname}] PING gönderilemedi: {result}")
+                websocket_connected_dict[nickname] = False
+                health.closed.set()
+        self.stats["pings"] += len(batch)
+        logger.debug(f"💓 {len(batch)} PING gönderildi (dilim {self.current}, {len(due)} kayıt)")
+
+class ConnectionSupervisor:
+    """Cihaz başına tek bağlantı görevi, sınırlı eşzamanlı deneme ve jitter'lı backoff
+
+    Tüm görevler buradan başlatılır: ensure() zaten çalışan görevi yeniden
+    başlatmaz, bu yüzden on_ready'nin tekrar tetiklenmesi (gateway yeniden
+    bağlanması) bağlantıları çoğaltmaz. Ağ kesintisinden sonra cihazlar aynı anda
+    değil, rastgele yayılmış sürelerle ve en fazla CONNECT_CONCURRENCY el sıkışma
+    aynı anda olacak şekilde geri döner.
+    """
+
+    def __init__(self, concurrency: int = CONNECT_CONCURRENCY,
+                 base_delay: float = RECONNECT_BASE_DELAY, max_delay: float = RECONNECT_MAX_DELAY):
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.slots = asyncio.Semaphore(concurrency)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.devices: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"attempts": 0, "connects": 0, "reconnects": 0, "failures": 0, "waiting": 0}
+
+    def state(self, nickname: str) -> Dict[str, Any]:
+        return self.devices.setdefault(nickname, {
+            "attempts": 0, "connects": 0, "failures": 0, "step": 0, "last_error": None,
+        })
+
+    def ensure(self, nickname: str) -> None:
+        """Cihazın görevi yoksa (veya bittiyse) başlat; röle modunda tüm cihazlar tek görevdir"""
+        if RELAY_URL:
+            nickname = RELAY_KEY
+        task = self.tasks.get(nickname)
+        if task is None or task.done():
+            coro = get_relay_link().run() if nickname == RELAY_KEY else connect_websocket(nickname)
+            self.tasks[nickname] = bot.loop.create_task(coro)
+
+    def restart(self, nickname: str) -> None:
+        """Görevi iptal edip hemen yeniden başlat (IP değişti; backoff sıfırlanır)"""
+        self.stop(nickname)
+        self.state(nickname)["step"] = 0
+        self.ensure(nickname)
+
+    def stop(self, nickname: str) -> None:
+        task = self.tasks.pop(nickname, None)
+        if task is not None:
+            task.cancel()
+
+    def forget(self, nickname: str) -> None:
+        self.stop(nickname)
+        self.devices.pop(nickname, None)
+
+    def sync(self) -> None:
+        """Kayıtlı her cihaz için tam bir görev; silinmiş cihazların görevleri durur"""
+        for nickname in list(self.tasks):
+            if nickname not in HOLOGRAM_DEVICES and nickname != RELAY_KEY:
+                self.forget(nickname)
+        for nickname in HOLOGRAM_DEVICES:
+            self.ensure(nickname)
+
+    async def open(self, nickname: str, url: str, **options):
+        """Eşzamanlı deneme sınırı içinde bağlan; açık bağlantıyı döner"""
+        state = self.state(nickname)
+        options = {"ping_interval": None, "close_timeout": 1, "open_timeout": 10, **options}
+        async with self.slots:
+            state["attempts"] += 1
+            self.stats["attempts"] += 1
+            ws = await websockets.connect(url, **options)
+        if state["connects"]:
+            self.stats["reconnects"] += 1
+        state["connects"] += 1
+        self.stats["connects"] += 1
+        return ws
+
+    def record_failure(self, nickname: str, error: Exception) -> None:
+        state = self.state(nickname)
+        state["failures"] += 1
+        state["last_error"] = str(error) or type(error).__name__
+        self.stats["failures"] += 1
+
+    async def wait_retry(self, nickname: str, uptime: Optional[float]) -> None:
+        """Full jitter: [0, min(max, base * 2^adım)] arasında rastgele bekle"""
+        state = self.state(nickname)
+        if uptime is not None and uptime >= RECONNECT_STABLE_AFTER:
+            state["step"] = 0
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** state["step"]))
+        state["step"] = min(state["step"] + 1, 16)
+        logger.info(f"🔄 [{nickname}] {delay:.1f}s sonra yeniden bağlanılacak...")
+        self.stats["waiting"] += 1
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.stats["waiting"] -= 1
+
+    def summary(self, nickname: str) -> str:
+        state = self.devices.get(nickname)
+        if not state or state["connects"] <= 1 and not state["failures"]:
+            return ""
+        return f"🔁 {max(0, state['connects'] - 1)} yeniden bağlanma · {state['failures']} hata"
+
+class BotRelayLink(RelayLink):
+    """device_link.RelayLink'in bot tarafı: ayarlar, ConnectionSupervisor ve durum senkronu"""
+
+    ack_mode = ACK_MODE
+    batch_window = BATCH_WINDOW
+    heartbeat_interval = HEARTBEAT_INTERVAL
+
+    def devices(self) -> Dict[str, Dict[str, Any]]:
+        return HOLOGRAM_DEVICES
+
+    def enabled(self) -> bool:
+        return bool(RELAY_URL)
+
+    def device_online(self, nickname: str) -> None:
+        resync_device(nickname, lambda command: self.put(nickname, command))
+
+    async def connect(self):
+        # Röle (gorilla/websocket) kontrol ping'lerine kendiliğinden yanıt verir
+        return await get_connection_supervisor().open(RELAY_KEY, self.url, ping_interval=HEARTBEAT_INTERVAL,
+                                                      ping_timeout=PONG_TIMEOUT * MAX_MISSED_PONGS)
+
+    def connect_failed(self, error: Exception) -> None:
+        get_connection_supervisor().record_failure(RELAY_KEY, error)
+
+    async def wait_retry(self, uptime: Optional[float]) -> None:
+        await get_connection_supervisor().wait_retry(RELAY_KEY, uptime)
+
+    async def send_commands(self, ws, label: str, prefix: str, queue: CommandQueue,
+                            items: List[Tuple[str, asyncio.Future]], ack: bool) -> Tuple[int, Optional[Exception]]:
+        sent, error = await super().send_commands(ws, label, prefix, queue, items, ack)
+        stats["messages_sent"] += sent
+        return sent, error
+
+async def command_sender(nickname: str, ws, queue: CommandQueue, health: ConnectionHealth) -> None:
+    """Kuyruktaki komutları sırayla gönder; yavaş cihaz sadece kendi kuyruğunu bekletir
+
+    Toplu gönderim açıksa ilk komuttan sonra BATCH_WINDOW kadar beklenir, o arada
+    gelenler (ve birleşenler) tek çerçevede gider.
+    """
+    device_id = HOLOGRAM_DEVICES[nickname]["device_id"]
+    while True:
+        await queue.wakeup.wait()
+        info = HOLOGRAM_DEVICES.get(nickname, {})
+        batching = BATCH_WINDOW > 0 and info.get("batch", True)
+        if batching and len(queue) < BATCH_MAX_COMMANDS:
+            await asyncio.sleep(BATCH_WINDOW)
+        items = queue.pop_batch(BATCH_MAX_COMMANDS if batching else 1)
+        if not items:
+            continue
+        sent, error = await send_commands(ws, nickname, f"{device_id} ", queue, items,
+                                          info.get("ack", ACK_MODE), health.protocol >= 2)
+        stats["messages_sent"] += sent
+        if error is not None:
+            logger.error(f"❌ [{nickname}] Gönderme hatası: {error}")
+            websocket_connected_dict[nickname] = False
+            return
+
+async def connection_reader(nickname: str, ws, queue: CommandQueue, health: ConnectionHealth) -> None:
+    """Cihazdan gelen her mesajı oku (alım tamponu birikmesin)
+
+    "ACK <device_id> <seq>..." onayları (v2'de "<device_id> " + ACK çerçeveleri) kuyrukla,
+    "PONG [device_id]" heartbeat ile eşleşir, "HELLO <device_id> <sürüm>" protokolü belirler.
+    Eski cihaz yazılımları kimliksiz "PONG" döner; bekleyen PING varsa o da sayılır.
+    """
+    device_id = HOLOGRAM_DEVICES[nickname]["device_id"]
+    loop = asyncio.get_running_loop()
+    try:
+        async for message in ws:
+            health.last_rx = loop.time()
+            if not isinstance(message, str):
+                for request_id in decode_acks(message, device_id):
+                    queue.acknowledge_request(request_id)
+                continue
+            parts = message.split()
+            if not parts:
+                continue
+            if parts[0] == "PONG" and (len(parts) == 1 or parts[1] == device_id):
+                health.on_pong()
+            elif parts[0] == "ACK" and len(parts) >= 3 and parts[1] == device_id:
+                # Toplu gönderimde cihaz birden fazla sıra numarasını tek mesajda onaylar
+                for part in parts[2:]:
+                    if part.isdigit():
+                        queue.acknowledge(int(part))
+            elif parts[0] == "HELLO":
+                reply = parse_hello(message)
+                if reply is not None and reply[0] == device_id:
+                    health.protocol = min(reply[1], PROTOCOL_VERSION)
+                    logger.info(f"🔤 [{nickname}] Protokol v{health.protocol}")
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    websocket_connected_dict[nickname] = False
+    health.closed.set()
+
+async def connect_websocket(nickname: str) -> None:
+    """Bir cihaza WebSocket bağlantısı kur ve heartbeat gönder (ConnectionSupervisor başlatır)"""
+    supervisor = get_connection_supervisor()
+    loop = asyncio.get_running_loop()
     
     while nickname in HOLOGRAM_DEVICES:
+        device_info = HOLOGRAM_DEVICES[nickname]
+        device_id = device_info["device_id"]
+        websocket_url = f"ws://{device_info['ip']}:{device_port(device_info)}/ws"
+        connected_at = None
         try:
-            async with websockets.connect(websocket_url, ping_interval=None) as ws:
+            # close_timeout kısa: yanıt vermeyen bağlantı kapanırken bekletmesin
+            ws = await supervisor.open(nickname, websocket_url)
+            connected_at = loop.time()
+            async with ws:
                 websockets_dict[nickname] = ws
                 websocket_connected_dict[nickname] = True
-                reconnect_delay = 3  # Reset delay on successful connection
                 
                 logger.info(f"✅ [{nickname}] Bağlandı: {device_info['ip']}")
                 
+                queue = command_queues.setdefault(nickname, CommandQueue())
+                health = connection_health.setdefault(nickname, ConnectionHealth())
+                health.reset(ws, device_id)
+                if device_info.get("v2", PROTOCOL_V2):
+                    # Cevap gelene kadar komutlar metin gider
+                    await ws.send(hello(device_id))
+                resync_device(nickname, queue.put)
+                sender = asyncio.create_task(command_sender(nickname, ws, queue, health))
+                reader = asyncio.create_task(connection_reader(nickname, ws, queue, health))
+                closed = asyncio.create_task(health.closed.wait())
                 try:
-                    # Heartbeat döngüsü
-                    while websocket_connected_dict.get(nickname, False):
-                        await ws.send(f"PING {device_id}")
-                        logger.debug(f"[{nickname}] PING gönderildi")
-                        await asyncio.sleep(5)
-                        
-                except websockets.exceptions.ConnectionClosed:
+                    # Heartbeat ortak çarktan gelir; burada sadece bağlantının bitmesi beklenir
+                    # (okuyucu kapanışı gördü, çark ölü ilan etti veya gönderici hata aldı)
+                    get_heartbeat_wheel().register(nickname, health)
+                    await asyncio.wait({reader, sender, closed}, return_when=asyncio.FIRST_COMPLETED)
                     logger.warning(f"⚠️ [{nickname}] Bağlantı kapandı")
                 except Exception as e:
-                    logger.error(f"❌ [{nickname}] Heartbeat hatası: {e}")
+                    logger.error(f"❌ [{nickname}] Bağlantı izleme hatası: {e}")
+                finally:
+                    health.closed.set()
+                    closed.cancel()
+                    sender.cancel()
+                    reader.cancel()
+                    dropped = queue.clear()
+                    if dropped:
+                        logger.warning(f"⚠️ [{nickname}] Bağlantı koptu, {dropped} komut atıldı")
                     
         except Exception as e:
             logger.error(f"❌ [{nickname}] Bağlantı hatası: {e}")
-            websocket_connected_dict[nickname] = False
-            
-            # Exponential backoff
-            logger.info(f"🔄 [{nickname}] {reconnect_delay}s sonra yeniden bağlanılacak...")
-            await asyncio.sleep(reconnect_delay)
-            reconnect_delay = min(reconnect_delay * 2, max_reconnect_delay)
+            supervisor.record_failure(nickname, e)
+        
+        websocket_connected_dict[nickname] = False
+        websockets_dict.pop(nickname, None)
+        # Kopan her bağlantı (hata veya kapanış) jitter'lı backoff ile yeniden denenir
+        uptime = loop.time() - connected_at if connected_at is not None else None
+        await supervisor.wait_retry(nickname, uptime)
     
     # Cleanup
     websocket_connected_dict[nickname] = False
@@ -212,44 +950,75 @@ async def connect_websocket(nickname: str) -> None:
         del websockets_dict[nickname]
     logger.info(f"🔌 [{nickname}] Bağlantı sonlandırıldı")
 
-async def send_command_to_device(nickname: str, command: str) -> bool:
-    """Belirli bir cihaza komut gönder"""
+async def send_command_to_device(nickname: str, command: str) -> Optional[asyncio.Future]:
+    """Belirli bir cihazın kuyruğuna komut ekle; makbuzu döner (bağlı değilse None)"""
     device_info = HOLOGRAM_DEVICES.get(nickname)
     if not device_info:
-        return False
+        return None
+    
+    # Bağlı olmasa da istenen durum kaydedilir, bağlanınca gönderilir
+    if RELAY_URL:
+        receipt = get_relay_link().put(nickname, command)
+        if receipt is None:
+            logger.warning(f"⚠️ [{nickname}] Röle üzerinden görünmüyor")
+        record_command(nickname, command, receipt)
+        return receipt
     
     ws = websockets_dict.get(nickname)
     if not ws or not websocket_connected_dict.get(nickname, False):
         logger.warning(f"⚠️ [{nickname}] Bağlı değil")
-        return False
+        record_command(nickname, command, None)
+        return None
     
-    try:
-        message = f"{device_info['device_id']} {command}"
-        await ws.send(message)
-        logger.info(f"📤 [{nickname}] Komut gönderildi: {command}")
-        stats["messages_sent"] += 1
-        return True
-    except Exception as e:
-        logger.error(f"❌ [{nickname}] Gönderme hatası: {e}")
-        websocket_connected_dict[nickname] = False
-        return False
+    # Gönderimi cihazın kendi görevi yapar (command_sender)
+    receipt = command_queues[nickname].put(command)
+    record_command(nickname, command, receipt)
+    return receipt
 
-async def send_command_to_all(command: str) -> Tuple[int, int]:
-    """Tüm cihazlara komut gönder"""
-    if not HOLOGRAM_DEVICES:
-        return 0, 0
-    
-    success_count = 0
+async def send_command_to_all(command: str) -> DeliveryResult:
+    """Tüm cihazlara komut gönder ve teslim sonuçlarını bekle (en fazla ACK_TIMEOUT + 1 sn)"""
     total_count = len(HOLOGRAM_DEVICES)
     
+    # Röle modunda herkese tek öneksiz mesaj (cihaz başına onay istenmiyorsa)
+    if RELAY_URL and not any(info.get("ack", ACK_MODE) for info in HOLOGRAM_DEVICES.values()):
+        online = sum(1 for nickname in HOLOGRAM_DEVICES if websocket_connected_dict.get(nickname, False))
+        receipt = get_relay_link().put_broadcast(command) if online else None
+        for nickname in HOLOGRAM_DEVICES:
+            # Yayını sadece çevrimiçi cihazlar alır; diğerleri bağlanınca senkronlanır
+            record_command(nickname, command, receipt if websocket_connected_dict.get(nickname, False) else None)
+        if receipt is None:
+            return DeliveryResult(total_count, 0, 0, 0, 0, 0)
+        await asyncio.wait({receipt}, timeout=ACK_TIMEOUT + 1.0)
+        delivered = online if receipt.done() and receipt.result() == "sent" else 0
+        return DeliveryResult(total=total_count, queued=online, sent=delivered, acked=0,
+                              unconfirmed=0, failed=online - delivered)
+    
     tasks = []
     for nickname in HOLOGRAM_DEVICES.keys():
         tasks.append(send_command_to_device(nickname, command))
     
-    results = await asyncio.gather(*tasks)
-    success_count = sum(1 for r in results if r)
-    
-    return success_count, total_count
+    receipts = [r for r in await asyncio.gather(*tasks) if r is not None]
+    if receipts:
+        await asyncio.wait(receipts, timeout=ACK_TIMEOUT + 1.0)
+    outcomes = [r.result() if r.done() else "unconfirmed" for r in receipts]
+    
+    return DeliveryResult(
+        total=total_count,
+        queued=len(receipts),
+        sent=outcomes.count("sent"),
+        acked=outcomes.count("acked"),
+        unconfirmed=outcomes.count("unconfirmed"),
+        failed=outcomes.count("dropped") + outcomes.count("error"),
+    )
+
+def format_delivery(result: DeliveryResult) -> str:
+    """Komut yanıtındaki teslim satırı; onaylı cihaz varsa onay/onaysız sayıları ayrıca"""
+    text = f"📡 Gönderildi: {result.sent + result.acked}/{result.total} cihaz"
+    if result.acked or result.unconfirmed:
+        text += f"\n✅ Onaylandı: {result.acked} · ⏳ Onaysız: {result.unconfirmed}"
+    if result.failed:
+        text += f"\n⚠️ İletilemedi: {result.failed}"
+    return text
 
 # ===== DISCORD BOT OLAYLARI =====
 @bot.event
@@ -258,18 +1027,27 @@ async def on_ready():
     logger.info(f"✅ Bot giriş yaptı: {bot.user}")
     logger.info(f"📊 Sunucu sayısı: {len(bot.guilds)}")
     
-    stats["uptime_start"] = datetime.now()
+    # on_ready gateway yeniden bağlanınca tekrar gelir: config ilk seferde yüklenir,
+    # görevler ve bağlantılar yeniden başlatılmaz
+    if stats["uptime_start"] is None:
+        stats["uptime_start"] = datetime.now()
+        
+        # Kaydedilmiş config'i yükle
+        load_config()
     
-    # Kaydedilmiş config'i yükle
-    load_config()
+    # Cihaz duyurularını dinle (pasif keşif)
+    await start_announcement_listener()
     
-    # Kaydedilmiş cihazlara bağlan
-    for nickname in HOLOGRAM_DEVICES.keys():
-        task = bot.loop.create_task(connect_websocket(nickname))
-        websocket_tasks[nickname] = task
+    # Kaydedilmiş cihazlara bağlan (cihaz başına tek görev)
+    get_connection_supervisor().sync()
     
     # Status güncelleme task'ını başlat
-    update_status.start()
+    if not update_status.is_running():
+        update_status.start()
+    
+    # IP'si değişen cihazları arka planda yeniden bul
+    if not rediscover_devices.is_running():
+        rediscover_devices.start()
     
     # Bot durumunu ayarla
     await bot.change_presence(
@@ -313,13 +1091,13 @@ async def on_command_error(ctx, error):
             else:
                 cmd = f"model {url}"
             
-            success, total = await send_command_to_all(cmd)
+            result = await send_command_to_all(cmd)
             
-            if success > 0:
+            if result.queued > 0:
                 repeat_text = "∞" if loop else str(repeat_count)
                 await ctx.send(
                     f"🎬 **{keyword}** modeli yükleniyor\n"
-                    f"📡 Gönderildi: {success}/{total} cihaz\n"
+                    f"{format_delivery(result)}\n"
                     f"🔄 Tekrar: {repeat_text}"
                 )
             else:
@@ -350,55 +1128,146 @@ async def on_message(message):
     await bot.process_commands(message)
 
 # ===== CİHAZ YÖNETİMİ KOMUTLARI =====
+def format_scan_progress(ip_range: str, progress: Dict[str, int], total: int,
+                         found: List[Dict[str, Any]], elapsed: float) -> str:
+    """Tek ilerleme mesajının içeriği"""
+    scanned = progress.get("scanned", 0)
+    percent = scanned * 100 // total if total else 100
+    rate = scanned / elapsed if elapsed > 0 else 0.0
+    lines = [
+        f"🔍 `{ip_range}` taranıyor... %{percent} ({scanned}/{total}, {rate:.0f} adres/sn)",
+        f"🌐 Bulunan: {len(found)} cihaz" + (" | İptal: `!iptal`" if scanned < total else ""),
+    ]
+    # Mesaj sınırına takılmamak için son cihazlar
+    for device in found[-10:]:
+        lines.append(f"• `{device['device_id']}` - `{device['ip']}:{device['port']}`")
+    if len(found) > 10:
+        lines.append(f"… ve {len(found) - 10} cihaz daha")
+    return "\n".join(lines)
+
 @bot.command(name="keşfet", aliases=["scan", "search"])
-async def discover(ctx, ip_range: str = "192.168.1"):
+async def discover(ctx, ip_range: Optional[str] = None):
     """Ağdaki hologram cihazlarını bul
     
+    Aralık verilmezse sadece pasif adaylar (duyurular + ARP tablosu) yoklanır.
+    
     Kullanım: !keşfet [ip_range]
+    Örnek: !keşfet
     Örnek: !keşfet 192.168.1
+    Örnek: !keşfet 10.0.0.0/16,192.168.1
     """
     stats["commands_executed"] += 1
     
-    msg = await ctx.send(f"🔍 `{ip_range}.x` ağı taranıyor...")
+    try:
+        total = count_scan_targets(ip_range) if ip_range else 0
+    except ValueError:
+        await ctx.send(f"❌ Geçersiz IP aralığı: `{ip_range}`")
+        return
+    label = ip_range or "pasif keşif"
     
-    found = await scan_network(ip_range)
+    if ctx.channel.id in active_scans:
+        await ctx.send("⚠️ Bu kanalda zaten bir tarama sürüyor. Durdurmak için: `!iptal`")
+        return
+    
+    msg = await ctx.send(f"🔍 `{label}` taranıyor..." + (f" ({total} adres)" if total else ""))
+    
+    # Bulunanlar tarama sürerken tek mesaj düzenlenerek gösterilir
+    found: List[Dict[str, Any]] = []
+    progress: Dict[str, int] = {}
+    started = datetime.now()
+    scan_task = asyncio.ensure_future(scan_network(ip_range, on_found=found.append, progress=progress))
+    active_scans[ctx.channel.id] = scan_task
+    
+    last_content = None
+    try:
+        while not scan_task.done():
+            await asyncio.wait({scan_task}, timeout=SCAN_PROGRESS_INTERVAL)
+            if scan_task.done():
+                break
+            elapsed = (datetime.now() - started).total_seconds()
+            content = format_scan_progress(label, progress, progress.get("total", total), found, elapsed)
+            if content != last_content:
+                await msg.edit(content=content)
+                last_content = content
+    finally:
+        active_scans.pop(ctx.channel.id, None)
+    
+    cancelled = scan_task.cancelled()
+    if not cancelled and scan_task.exception() is not None:
+        raise scan_task.exception()
+    
+    elapsed = (datetime.now() - started).total_seconds()
+    scanned = progress.get("scanned", 0)
+    rate = scanned / elapsed if elapsed > 0 else 0.0
+    summary = f"{scanned}/{progress.get('total', total)} adres, {elapsed:.1f} sn, {rate:.0f} adres/sn"
     
     if not found:
-        await msg.edit(content="❌ Hiç cihaz bulunamadı.")
+        prefix = "⏹️ Tarama iptal edildi." if cancelled else "❌ Hiç cihaz bulunamadı."
+        if not ip_range and not cancelled:
+            prefix += "\n💡 Tam tarama için: `!keşfet 192.168.1`"
+        await msg.edit(content=f"{prefix}\n📊 {summary}")
         return
     
     embed = discord.Embed(
-        title="🌐 Bulunan Hologram Cihazları",
-        description=f"Toplam {len(found)} cihaz bulundu",
-        color=discord.Color.green(),
+        title="🌐 Bulunan Hologram Cihazları" + (" (iptal edildi)" if cancelled else ""),
+        description=f"Toplam {len(found)} cihaz bulundu\n📊 {summary}",
+        color=discord.Color.orange() if cancelled else discord.Color.green(),
         timestamp=datetime.now()
     )
     
-    for i, device in enumerate(found, 1):
+    # Embed en fazla 25 alan alır
+    for i, device in enumerate(found[:25], 1):
         embed.add_field(
             name=f"Cihaz {i}",
-            # IP GÖRÜNÜMÜNE 8080 EKLENDİ
-            value=f"🆔 ID: `{device['device_id']}`\n📡 IP: `{device['ip']}:8080`",
+            value=f"🆔 ID: `{device['device_id']}`\n📡 IP: `{device['ip']}:{device['port']}`",
             inline=False
         )
     
-    embed.set_footer(text="Cihaz eklemek için: !ekle <nickname> <device_id> <ip>")
+    footer = "Cihaz eklemek için: !ekle <nickname> <device_id> <ip>[:port]"
+    if len(found) > 25:
+        footer = f"+{len(found) - 25} cihaz daha | " + footer
+    embed.set_footer(text=footer)
     
     await msg.edit(content=None, embed=embed)
 
+@bot.command(name="iptal", aliases=["cancel"])
+async def cancel_scan(ctx):
+    """Bu kanalda süren ağ taramasını durdur
+    
+    Kullanım: !iptal
+    """
+    stats["commands_executed"] += 1
+    
+    scan_task = active_scans.get(ctx.channel.id)
+    if scan_task is None or scan_task.done():
+        await ctx.send("📭 Bu kanalda süren bir tarama yok.")
+        return
+    
+    scan_task.cancel()
+    await ctx.send("⏹️ Tarama durduruluyor...")
+
 @bot.command(name="ekle", aliases=["add"])
 async def add(ctx, nickname: str, device_id: str, ip: str):
     """Yeni bir hologram cihazı ekle
     
-    Kullanım: !ekle <nickname> <device_id> <ip>
+    Kullanım: !ekle <nickname> <device_id> <ip>[:port]
     Örnek: !ekle holo1 DEVICE_192_168_1_100 192.168.1.100
+    Örnek: !ekle holo2 DEVICE_2 192.168.1.101:8081
     """
     stats["commands_executed"] += 1
     
+    # Port verilmezse duyurulan port, o da yoksa DEVICE_PORT
+    ip, _, port = ip.partition(":")
+    if port and not port.isdigit():
+        await ctx.send(f"❌ Geçersiz port: `{port}`")
+        return
+    port = int(port) if port else announced_port(ip)
+    
     # Cihazı kaydet
     HOLOGRAM_DEVICES[nickname] = {
         "device_id": device_id,
         "ip": ip,
+        "port": port,
         "added_by": str(ctx.author),
         "added_at": datetime.now().isoformat()
     }
@@ -406,9 +1275,8 @@ async def add(ctx, nickname: str, device_id: str, ip: str):
     # Config'e kaydet
     save_config()
     
-    # WebSocket bağlantısını başlat
-    task = bot.loop.create_task(connect_websocket(nickname))
-    websocket_tasks[nickname] = task
+    # WebSocket bağlantısını başlat (aynı nickname yeniden eklendiyse yeni IP ile)
+    get_connection_supervisor().restart(nickname)
     
     embed = discord.Embed(
         title="✅ Cihaz Eklendi",
@@ -416,8 +1284,7 @@ async def add(ctx, nickname: str, device_id: str, ip: str):
     )
     embed.add_field(name="Nickname", value=f"`{nickname}`", inline=True)
     embed.add_field(name="Device ID", value=f"`{device_id}`", inline=True)
-    # GÖRÜNÜME 8080 EKLENDİ
-    embed.add_field(name="IP", value=f"`{ip}:8080`", inline=True)
+    embed.add_field(name="IP", value=f"`{ip}:{port}`", inline=True)
     
     await ctx.send(embed=embed)
 
@@ -436,11 +1303,12 @@ async def remove(ctx, nickname: str):
     
     # WebSocket bağlantısını durdur
     websocket_connected_dict[nickname] = False
-    if nickname in websocket_tasks:
-        websocket_tasks[nickname].cancel()
-        del websocket_tasks[nickname]
+    get_connection_supervisor().forget(nickname)
     
     # Cihazı sil
+    command_queues.pop(nickname, None)
+    connection_health.pop(nickname, None)
+    device_states.pop(nickname, None)
     del HOLOGRAM_DEVICES[nickname]
     save_config()
     
@@ -467,12 +1335,65 @@ async def list_devices(ctx):
     
     for nickname, info in HOLOGRAM_DEVICES.items():
         status = "🟢 Bağlı" if websocket_connected_dict.get(nickname, False) else "🔴 Bağlı Değil"
-        # GÖRÜNÜME 8080 EKLENDİ
-        value = f"{status}\n📡 IP: `{info['ip']}:8080`\n🆔 ID: `{info['device_id']}`"
+        value = f"{status}\n📡 IP: `{info['ip']}:{device_port(info)}`\n🆔 ID: `{info['device_id']}`"
+        health = connection_health.get(nickname)
+        if health is not None:
+            value += f"\n📶 {health.summary()}"
         embed.add_field(name=nickname, value=value, inline=False)
     
     await ctx.send(embed=embed)
 
+@bot.command(name="onay", aliases=["ack"])
+async def ack_mode(ctx, nickname: str, mode: str):
+    """Bir cihaz için onaylı gönderim modunu aç/kapat
+    
+    Onaylı modda komutlar sıra numarasıyla gider, cihaz "ACK" ile cevap verir;
+    !durum teslim gecikmesi dağılımını ve onaysız komutları gösterir.
+    Cihaz yazılımının ACK desteği olmalıdır.
+    
+    Kullanım: !onay <nickname> <aç|kapat>
+    Örnek: !onay holo1 aç
+    """
+    stats["commands_executed"] += 1
+    
+    if nickname not in HOLOGRAM_DEVICES:
+        await ctx.send(f"❌ `{nickname}` bulunamadı!")
+        return
+    if mode.lower() not in ("aç", "ac", "on", "kapat", "off"):
+        await ctx.send("❌ Mod `aç` veya `kapat` olmalı.")
+        return
+    
+    enabled = mode.lower() in ("aç", "ac", "on")
+    HOLOGRAM_DEVICES[nickname]["ack"] = enabled
+    save_config()
+    await ctx.send(f"{'✅' if enabled else '⏹️'} `{nickname}` onaylı mod: {'açık' if enabled else 'kapalı'}")
+
+@bot.command(name="protokol", aliases=["protocol"])
+async def protocol_mode(ctx, nickname: str, version: str):
+    """Bir cihaz için ikili komut protokolünü (v2) aç/kapat
+    
+    v2'de komutlar sayısal opcode ve tipli parametreyle ikili çerçeve olarak gider;
+    bağlantı başında anlaşılır, cihaz desteklemiyorsa metin protokolü kullanılır.
+    Değişiklik bir sonraki bağlantıda geçerli olur.
+    
+    Kullanım: !protokol <nickname> <1|2>
+    Örnek: !protokol holo1 2
+    """
+    stats["commands_executed"] += 1
+    
+    if nickname not in HOLOGRAM_DEVICES:
+        await ctx.send(f"❌ `{nickname}` bulunamadı!")
+        return
+    if version not in ("1", "2"):
+        await ctx.send("❌ Sürüm `1` veya `2` olmalı.")
+        return
+    
+    HOLOGRAM_DEVICES[nickname]["v2"] = version == "2"
+    save_config()
+    if websocket_connected_dict.get(nickname, False):
+        restart_connection(nickname)
+    await ctx.send(f"🔤 `{nickname}` protokol: v{version}")
+
 # ===== KONTROL KOMUTLARI =====
 @bot.command(name="model")
 async def model(ctx, url: str, *, params: str = ""):
@@ -488,10 +1409,10 @@ async def model(ctx, url: str, *, params: str = ""):
     if params:
         command += f" {params}"
     
-    success, total = await send_command_to_all(command)
+    result = await send_command_to_all(command)
     
-    if success > 0:
-        await ctx.send(f"🎬 Model yükleniyor: {url}\n📡 Gönderildi: {success}/{total} cihaz")
+    if result.queued > 0:
+        await ctx.send(f"🎬 Model yükleniyor: {url}\n{format_delivery(result)}")
     else:
         await ctx.send("❌ Hiçbir cihaz bağlı değil!")
 
@@ -504,10 +1425,10 @@ async def video(ctx, url: str):
     """
     stats["commands_executed"] += 1
     
-    success, total = await send_command_to_all(f"video {url}")
+    result = await send_command_to_all(f"video {url}")
     
-    if success > 0:
-        await ctx.send(f"🎥 Video oynatılıyor: {url}\n📡 Gönderildi: {success}/{total} cihaz")
+    if result.queued > 0:
+        await ctx.send(f"🎥 Video oynatılıyor: {url}\n{format_delivery(result)}")
     else:
         await ctx.send("❌ Hiçbir cihaz bağlı değil!")
 
@@ -519,10 +1440,10 @@ async def stop_video(ctx):
     """
     stats["commands_executed"] += 1
     
-    success, total = await send_command_to_all("stop_video")
+    result = await send_command_to_all("stop_video")
     
-    if success > 0:
-        await ctx.send(f"⏹️ Video durduruldu\n📡 Gönderildi: {success}/{total} cihaz")
+    if result.queued > 0:
+        await ctx.send(f"⏹️ Video durduruldu\n{format_delivery(result)}")
     else:
         await ctx.send("❌ Hiçbir cihaz bağlı değil!")
 
@@ -535,10 +1456,10 @@ async def rpm(ctx, value: float):
     """
     stats["commands_executed"] += 1
     
-    success, total = await send_command_to_all(f"rpm {value}")
+    result = await send_command_to_all(f"rpm {value}")
     
-    if success > 0:
-        await ctx.send(f"⚡ RPM ayarlandı: {value}\n📡 Gönderildi: {success}/{total} cihaz")
+    if result.queued > 0:
+        await ctx.send(f"⚡ RPM ayarlandı: {value}\n{format_delivery(result)}")
     else:
         await ctx.send("❌ Hiçbir cihaz bağlı değil!")
 
@@ -551,10 +1472,10 @@ async def phase(ctx, value: int):
     """
     stats["commands_executed"] += 1
     
-    success, total = await send_command_to_all(f"phase {value}")
+    result = await send_command_to_all(f"phase {value}")
     
-    if success > 0:
-        await ctx.send(f"🔄 Faz ayarlandı: {value}°\n📡 Gönderildi: {success}/{total} cihaz")
+    if result.queued > 0:
+        await ctx.send(f"🔄 Faz ayarlandı: {value}°\n{format_delivery(result)}")
     else:
         await ctx.send("❌ Hiçbir cihaz bağlı değil!")
 
@@ -567,10 +1488,10 @@ async def light(ctx, value: float):
     """
     stats["commands_executed"] += 1
     
-    success, total = await send_command_to_all(f"light {value}")
+    result = await send_command_to_all(f"light {value}")
     
-    if success > 0:
-        await ctx.send(f"💡 Işık ayarlandı: {value}\n📡 Gönderildi: {success}/{total} cihaz")
+    if result.queued > 0:
+        await ctx.send(f"💡 Işık ayarlandı: {value}\n{format_delivery(result)}")
     else:
         await ctx.send("❌ Hiçbir cihaz bağlı değil!")
 
@@ -582,10 +1503,10 @@ async def reset(ctx):
     """
     stats["commands_executed"] += 1
     
-    success, total = await send_command_to_all("reset")
+    result = await send_command_to_all("reset")
     
-    if success > 0:
-        await ctx.send(f"🔄 Animasyon sıfırlandı\n📡 Gönderildi: {success}/{total} cihaz")
+    if result.queued > 0:
+        await ctx.send(f"🔄 Animasyon sıfırlandı\n{format_delivery(result)}")
     else:
         await ctx.send("❌ Hiçbir cihaz bağlı değil!")
 
@@ -688,17 +1609,63 @@ async def status(ctx):
         value=f"⏱️ Uptime: {uptime_str}\n"
               f"💬 Komut: {stats['commands_executed']}\n"
               f"📤 Mesaj: {stats['messages_sent']}\n"
-              f"🔍 Keşif: {stats['devices_discovered']} cihaz",
+              f"🔍 Keşif: {stats['devices_discovered']} cihaz\n"
+              f"🔀 IP değişikliği: {stats['ip_changes']}",
         inline=False
     )
     
+    if relay_link is not None:
+        r = relay_link.stats
+        embed.add_field(
+            name="📡 Röle",
+            value=f"{'🟢' if relay_link.ws is not None else '🔴'} {relay_link.url}\n"
+                  f"{r['sent']} gönderildi ({r['broadcasts']} herkese) · {r['received']} alındı",
+            inline=False
+        )
+    
+    if connection_supervisor is not None:
+        c = connection_supervisor.stats
+        embed.add_field(
+            name="🔌 Bağlantılar",
+            value=f"{c['connects']} bağlantı · {c['reconnects']} yeniden bağlanma · "
+                  f"{c['failures']} hata · {c['waiting']} bekliyor",
+            inline=False
+        )
+    
+    if heartbeat_wheel is not None:
+        w = heartbeat_wheel.stats
+        embed.add_field(
+            name="💓 Heartbeat",
+            value=f"{len(heartbeat_wheel)} bağlantı · {w['wakeups']} uyanma · "
+                  f"{w['pings']} PING · {w['skipped']} atlandı · {w['dead']} kopuk",
+            inline=False
+        )
+    
     # Cihaz durumları
     if HOLOGRAM_DEVICES:
         device_status = []
         for nickname, info in HOLOGRAM_DEVICES.items():
             status_icon = "🟢" if websocket_connected_dict.get(nickname, False) else "🔴"
-            # GÖRÜNÜME 8080 EKLENDİ
-            device_status.append(f"{status_icon} **{nickname}** - {info['ip']}:8080")
+            line = f"{status_icon} **{nickname}** - {info['ip']}:{device_port(info)}"
+            health = connection_health.get(nickname)
+            if health is not None:
+                line += f" · 📶 {health.summary()}"
+            if connection_supervisor is not None and connection_supervisor.summary(nickname):
+                line += f" · {connection_supervisor.summary(nickname)}"
+            state = device_states.get(nickname)
+            if state is not None and state.desired:
+                line += f"\n  🎛️ {state.summary()}"
+            queue = command_queues.get(nickname)
+            if queue is not None:
+                q = queue.stats
+                line += f"\n  📬 {len(queue)} sırada · {q['sent']} gönderildi · {q['coalesced']} birleşti · {q['dropped']} düştü"
+                if q["frames"] < q["sent"]:
+                    line += f" · {q['frames']} çerçeve"
+                if info.get("ack", ACK_MODE):
+                    line += f"\n  ✅ {q['acked']} onaylı · ⏳ {q['unacked']} onaysız · {queue.latency.summary()}"
+                    if queue.recent_unacked:
+                        line += f"\n  ⏳ Son onaysız: {', '.join(queue.recent_unacked)}"
+            device_status.append(line)
         
         embed.add_field(
             name=f"🌐 Cihazlar ({len(HOLOGRAM_DEVICES)})",
@@ -785,9 +1752,11 @@ async def help_cmd(ctx, command_name: str = None):
     embed.add_field(
         name="🌐 Cihaz Yönetimi",
         value="```\n"
-              "!keşfet [ip]      - Ağdaki cihazları bul\n"
-              "!ekle <nick> <id> <ip> - Cihaz ekle\n"
+              "!keşfet [ip]      - Cihazları bul (boş = pasif)\n"
+              "!iptal            - Süren taramayı durdur\n"
+              "!ekle <nick> <id> <ip>[:port] - Cihaz ekle\n"
               "!çıkar <nick>    - Cihaz çıkar\n"
+              "!onay <nick> <aç|kapat> - Onaylı gönderim\n"
               "!liste            - Cihazları listele\n"
               "!durum            - Durum göster\n"
               "```",
@@ -849,6 +1818,30 @@ async def update_status():
     except Exception as e:
         logger.error(f"Status güncelleme hatası: {e}")
 
+@tasks.loop(seconds=REDISCOVERY_INTERVAL)
+async def rediscover_devices():
+    """Bağlı olmayan kayıtlı cihazları (IP değişmiş olabilir) arka planda ara"""
+    if RELAY_URL:
+        return   # röle modunda cihazlar röleye kendileri bağlanır, IP'leri kullanılmaz
+    try:
+        now = datetime.now()
+        for ip, seen in list(empty_addresses.items()):
+            if (now - seen).total_seconds() >= DISCOVERY_TTL:
+                del empty_addresses[ip]
+        
+        missing = [info for nickname, info in HOLOGRAM_DEVICES.items()
+                   if not websocket_connected_dict.get(nickname, False)]
+        if not missing:
+            return
+        
+        progress: Dict[str, int] = {}
+        targets = rediscovery_targets(missing, await passive_candidates())
+        found = await probe_targets(targets, REDISCOVERY_CONCURRENCY, progress=progress)
+        if progress["scanned"]:
+            logger.debug(f"🔁 Yeniden keşif: {progress['scanned']} adres, {len(found)} cihaz")
+    except Exception as e:
+        logger.error(f"Yeniden keşif hatası: {e}")
+
 # ===== BOT BAŞLAT =====
 if __name__ == "__main__":
     try:
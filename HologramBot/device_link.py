@@ -0,0 +1,575 @@
+# device_link.py - Cihaz bağlantı katmanı: bot.py ve _GUI-main/_main.py'nin ortak kodu
+
+"""
+Discord'a ya da Tk'ye bağlı olmayan her şey burada durur; iki betik sadece
+kendi arayüz yapıştırıcısını taşır (_main.py bu klasörü sys.path'e ekler).
+
+Komut kuyruğu (CommandQueue):
+    rpm/phase/light son-değer-kazanır, stop_video/reset öne geçer ve geçersiz
+    kıldığı bekleyen komutları siler; her komutun makbuzu (Future) "sent",
+    "acked", "unconfirmed", "dropped" veya "error" ile sonuçlanır.
+Cihaz durumu (DeviceState):
+    istenen ve cihaza ulaştığı bilinen model/video/rpm/phase/light; yeniden
+    bağlanınca sadece aradaki fark gönderilir.
+Gönderim (pack_commands/send_commands):
+    aynı pencerede sıraya girenler tek zarfta (metin "BATCH" veya v2 toplu
+    çerçeve, protocol_v2.py); her mesaj "<device_id> " önekini taşır.
+Röle bağlantısı (RelayLink):
+    tüm cihazlara tek WebSocket; betikler alt sınıfta sadece ayarları,
+    bağlanma/yeniden deneme adımlarını ve gönderimi verir.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from protocol_v2 import address, encode_batch, encode_command
+
+logger = logging.getLogger(__name__)
+
+QUEUE_MAX_DEPTH = 32
+COALESCED_COMMANDS = {"rpm", "phase", "light"}   # cihaz sadece son değeri uygular
+PRIORITY_COMMANDS = {"stop_video", "reset"}      # kuyruğun önüne geçer
+# Öncelikli komut, kendinden önce sıraya girmiş bu komutları geçersiz kılar.
+# reset sadece animasyonu baştan başlatır (rpm/phase/light'a dokunmaz), bir şey silmez
+SUPERSEDED_BY = {"reset": set(), "stop_video": {"video"}}
+ACK_TIMEOUT = 2.0             # bu sürede onaylanmayan komut "onaysız" sayılır (saniye)
+LATENCY_BUCKETS_MS = (5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+BATCH_MAX_COMMANDS = 16       # toplu gönderimde bir çerçevedeki en fazla komut
+
+RELAY_KEY = "@relay"          # röle bağlantısının görev anahtarı / yayın kuyruğunun adı
+RELAY_PRESENCE_MISSES = 3     # cihazın kendi heartbeat'i bu kadar aralık gelmezse çevrimdışı
+
+
+class DeliveryResult(NamedTuple):
+    total: int          # kayıtlı cihaz
+    queued: int         # bağlı olup kuyruğa alınan
+    sent: int           # onaysız modda sokete yazılan
+    acked: int          # onaylı modda cihazın onayladığı
+    unconfirmed: int    # ack_timeout içinde onay gelmeyen
+    failed: int         # kuyruktan düşen / gönderilemeyen
+
+
+class LatencyHistogram:
+    """Gönderim -> onay gecikmesi için sabit kovalı histogram (ms)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # son kova: en büyük sınırın üstü
+        self.count = 0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        index = next((i for i, bound in enumerate(self.buckets) if ms <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> float:
+        """p. yüzdelik dilimin kova üst sınırı (son kovada gözlenen en büyük değer)"""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return float(self.buckets[i]) if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> str:
+        if not self.count:
+            return "onay yok"
+        return (f"p50 ≤{self.percentile(50):.0f}ms · p95 ≤{self.percentile(95):.0f}ms · "
+                f"max {self.max_ms:.0f}ms · n={self.count}")
+
+
+def resolve_receipt(receipt: asyncio.Future, outcome: str) -> None:
+    if not receipt.done():
+        receipt.set_result(outcome)
+
+
+def follow_receipt(old: asyncio.Future, new: asyncio.Future) -> None:
+    """Birleştirilen/geçersiz kılınan komutun sonucu onu taşıyan komutunkidir"""
+    new.add_done_callback(lambda f: resolve_receipt(old, f.result()))
+
+
+class CommandQueue:
+    """Bir cihaza giden komut kuyruğu (tek gönderici görev tarafından boşaltılır)
+
+    rpm/phase/light son-değer-kazanır şeklinde birleştirilir: bekleyen eski
+    değer atılır, yenisi sıranın sonuna geçer. stop_video/reset her şeyden
+    önce gönderilir ve geçersiz kıldığı bekleyen komutları siler. Derinlik
+    max_depth ile sınırlıdır; taşınca en eski komut atılır.
+    Her komutun bir makbuzu (Future) vardır: "sent", "acked", "unconfirmed",
+    "dropped" veya "error" ile sonuçlanır. Onaylı modda gönderilen komutlar
+    inflight'ta ack_timeout kadar onay bekler.
+    """
+
+    def __init__(self, max_depth: int = QUEUE_MAX_DEPTH, ack_timeout: float = ACK_TIMEOUT):
+        self.max_depth = max_depth
+        self.ack_timeout = ack_timeout
+        self.urgent: deque = deque()
+        self.pending: OrderedDict = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self._serial = 0
+        self.next_seq = 0
+        self.inflight: Dict[int, Tuple[str, float, asyncio.Future]] = {}
+        self.latency = LatencyHistogram()
+        self.recent_unacked: deque = deque(maxlen=5)
+        self.stats = {"queued": 0, "sent": 0, "frames": 0, "coalesced": 0, "dropped": 0,
+                      "send_errors": 0, "acked": 0, "unacked": 0, "late_acks": 0}
+
+    def __len__(self) -> int:
+        return len(self.urgent) + len(self.pending)
+
+    def put(self, command: str) -> asyncio.Future:
+        receipt = asyncio.get_running_loop().create_future()
+        name = command.split(" ", 1)[0]
+        self.stats["queued"] += 1
+        if name in PRIORITY_COMMANDS:
+            superseded = SUPERSEDED_BY.get(name, set())
+            for key in [k for k, (c, _) in self.pending.items() if c.split(" ", 1)[0] in superseded]:
+                follow_receipt(self.pending.pop(key)[1], receipt)
+                self.stats["coalesced"] += 1
+            queued = next((r for c, r in self.urgent if c == command), None)
+            if queued is not None:
+                follow_receipt(receipt, queued)
+                self.stats["coalesced"] += 1
+            else:
+                self.urgent.append((command, receipt))
+        elif name in COALESCED_COMMANDS:
+            if name in self.pending:
+                follow_receipt(self.pending.pop(name)[1], receipt)
+                self.stats["coalesced"] += 1
+            self.pending[name] = (command, receipt)
+        else:
+            self._serial += 1
+            self.pending[self._serial] = (command, receipt)
+
+        while len(self) > self.max_depth:
+            _, dropped = self.pending.popitem(last=False)[1] if self.pending else self.urgent.popleft()
+            resolve_receipt(dropped, "dropped")
+            self.stats["dropped"] += 1
+        self.wakeup.set()
+        return receipt
+
+    def pop(self) -> Optional[Tuple[str, asyncio.Future]]:
+        if self.urgent:
+            return self.urgent.popleft()
+        if self.pending:
+            return self.pending.popitem(last=False)[1]
+        self.wakeup.clear()
+        return None
+
+    def pop_batch(self, limit: int) -> List[Tuple[str, asyncio.Future]]:
+        items = []
+        while len(items) < limit:
+            item = self.pop()
+            if item is None:
+                break
+            items.append(item)
+        return items
+
+    def track(self, command: str, receipt: asyncio.Future) -> int:
+        """Onay beklenecek komuta sıra numarası ver"""
+        loop = asyncio.get_running_loop()
+        self.next_seq += 1
+        if self.next_seq & 0xFFFF == 0:
+            self.next_seq += 1   # v2'de istek no 0 "onay bekleme" demek
+        seq = self.next_seq
+        self.inflight[seq] = (command, loop.time(), receipt)
+        loop.call_later(self.ack_timeout, self.expire, seq)
+        return seq
+
+    def acknowledge(self, seq: int) -> None:
+        entry = self.inflight.pop(seq, None)
+        if entry is None:
+            self.stats["late_acks"] += 1   # süresi dolmuş veya bilinmeyen
+            return
+        _, sent_at, receipt = entry
+        self.latency.add((asyncio.get_running_loop().time() - sent_at) * 1000.0)
+        self.stats["acked"] += 1
+        resolve_receipt(receipt, "acked")
+
+    def acknowledge_request(self, request_id: int) -> None:
+        """v2 ACK'i: 16 bitlik istek no'yu bekleyen sıra numarasıyla eşle"""
+        self.acknowledge(next((seq for seq in self.inflight if seq & 0xFFFF == request_id), 0))
+
+    def expire(self, seq: int) -> None:
+        entry = self.inflight.pop(seq, None)
+        if entry is None:
+            return
+        command, _, receipt = entry
+        self.stats["unacked"] += 1
+        self.recent_unacked.append(command)
+        resolve_receipt(receipt, "unconfirmed")
+
+    def clear(self) -> int:
+        """Bekleyenleri at (bağlantı koptuğunda eski komutlar sonradan gitmesin)"""
+        count = len(self)
+        for _, receipt in list(self.urgent) + list(self.pending.values()):
+            resolve_receipt(receipt, "dropped")
+        self.urgent.clear()
+        self.pending.clear()
+        self.stats["dropped"] += count
+        # Onayı beklenenler artık gelmeyecek
+        for seq in list(self.inflight):
+            self.expire(seq)
+        return count
+
+
+class DeviceState:
+    """Cihazın son bilinen durumu: model (repeat/loop parametreleriyle), video, rpm, phase, light
+
+    desired her komutla güncellenir (bağlı olmayan cihaz için de); applied makbuzu
+    "sent"/"acked" ile kapanan komutlardan dolar. Bağlantı koparken atılan veya
+    onaylanmayan komutlar ikisi arasında fark bırakır, yeniden bağlanınca sadece
+    bu fark gönderilir (cihaz model/rpm/phase/light'ı kendi config'inde saklar).
+    """
+
+    FIELDS = ("model", "rpm", "phase", "light", "video")   # yeniden gönderme sırası
+
+    def __init__(self):
+        self.desired: Dict[str, Optional[str]] = {}
+        self.applied: Dict[str, Optional[str]] = {}
+        self.updated_at: Optional[datetime] = None
+        self.resyncs = 0
+        self.replayed = 0
+
+    @staticmethod
+    def parse(command: str) -> Dict[str, Optional[str]]:
+        name, _, arg = command.partition(" ")
+        if name == "model":
+            return {"model": arg, "video": None}   # model yüklemek videoyu durdurur
+        if name == "video":
+            return {"video": arg}
+        if name == "stop_video":
+            return {"video": None}
+        if name in ("rpm", "phase", "light"):
+            return {name: arg}
+        return {}
+
+    def record(self, command: str, receipt: Optional[asyncio.Future] = None) -> None:
+        changes = self.parse(command)
+        if not changes:
+            return
+        self.desired.update(changes)
+        self.updated_at = datetime.now()
+        if receipt is not None:
+            receipt.add_done_callback(lambda f: self.delivered(changes, f.result()))
+
+    def delivered(self, changes: Dict[str, Optional[str]], outcome: str) -> None:
+        if outcome not in ("sent", "acked"):
+            return
+        for field, value in changes.items():
+            # Birleştirilip yerine yenisi gönderilen eski değer uygulanmış sayılmaz
+            if self.desired.get(field) == value:
+                self.applied[field] = value
+
+    def pending(self) -> List[str]:
+        """Cihaza ulaştığı bilinmeyen alanları geri getiren komutlar (gönderme sırasıyla)"""
+        commands = []
+        for field in self.FIELDS:
+            if field not in self.desired or self.applied.get(field, "") == self.desired[field]:
+                continue
+            value = self.desired[field]
+            if field == "video":
+                if value is not None:
+                    commands.append(f"video {value}")
+                elif not commands or not commands[0].startswith("model "):
+                    commands.append("stop_video")   # model zaten videoyu durdurur
+            else:
+                commands.append(f"{field} {value}")
+        return commands
+
+    def summary(self) -> str:
+        d = self.desired
+        parts = []
+        if d.get("video"):
+            parts.append(f"🎥 {d['video'].rsplit('/', 1)[-1]}")
+        if d.get("model"):
+            url, _, params = d["model"].partition(" ")
+            parts.append(f"🎬 {url.rsplit('/', 1)[-1]}" + (f" ({params})" if params else ""))
+        parts.extend(f"{icon} {d[field]}" for field, icon in (("rpm", "⚡"), ("phase", "🔄"), ("light", "💡"))
+                     if d.get(field) is not None)
+        text = " · ".join(parts)
+        waiting = len(self.pending())
+        if waiting:
+            text += f" · ⏳ {waiting} alan teslim bekliyor"
+        return text
+
+
+def pack_commands(prefix: str, queue: CommandQueue, items: List[Tuple[str, asyncio.Future]],
+                  ack: bool, binary: bool) -> List[Tuple[Any, List[Tuple[str, asyncio.Future]]]]:
+    """Komutları gönderilecek mesajlara çevir: [(mesaj, içindeki komutlar)]
+
+    Art arda gelen aynı türden (metin / v2) komutlar tek zarfta toplanır; satır sonu
+    içeren metin komutu zarfa konamaz, tek başına gider. v2 mesajı da metin gibi
+    "<device_id> " önekini taşır (yayın yapan sunucuda diğer ekranlar yok sayar).
+    """
+    groups: List[Tuple[bool, List[Any], List[Tuple[str, asyncio.Future]]]] = []
+    sealed = True
+    for command, receipt in items:
+        # v2 çerçevesi olmayan komutlar (tabloda yok / parametre uymuyor) metin gider
+        frame = encode_command(command) if binary else None
+        if frame is not None:
+            if ack:
+                frame = encode_command(command, queue.track(command, receipt))
+        else:
+            frame = f"#{queue.track(command, receipt)} {command}" if ack else command
+        is_binary = isinstance(frame, bytes)
+        multiline = not is_binary and "\n" in command
+        if not sealed and not multiline and groups[-1][0] == is_binary:
+            groups[-1][1].append(frame)
+            groups[-1][2].append((command, receipt))
+        else:
+            groups.append((is_binary, [frame], [(command, receipt)]))
+        sealed = multiline
+
+    messages = []
+    for is_binary, frames, batch in groups:
+        if is_binary:
+            frame = frames[0] if len(frames) == 1 else encode_batch(frames)
+            message = address(prefix.rstrip(" "), frame)
+        elif len(frames) == 1:
+            message = prefix + frames[0]
+        else:
+            message = f"{prefix}BATCH {len(frames)}\n" + "\n".join(frames)
+        messages.append((message, batch))
+    return messages
+
+
+async def send_commands(ws, label: str, prefix: str, queue: CommandQueue,
+                        items: List[Tuple[str, asyncio.Future]], ack: bool,
+                        binary: bool = False) -> Tuple[int, Optional[Exception]]:
+    """Komutları paketleyip gönder; (gönderilen komut sayısı, hata)
+
+    Hata olursa henüz gitmemiş komutların makbuzları "error" ile kapanır.
+    """
+    messages = pack_commands(prefix, queue, items, ack, binary)
+    sent = 0
+    for index, (message, batch) in enumerate(messages):
+        try:
+            await ws.send(message)
+        except Exception as e:
+            queue.stats["send_errors"] += 1
+            for _, rest in messages[index:]:
+                for _, receipt in rest:
+                    resolve_receipt(receipt, "error")
+            return sent, e
+        sent += len(batch)
+        queue.stats["frames"] += 1
+        queue.stats["sent"] += len(batch)
+        if not ack:
+            for _, receipt in batch:
+                resolve_receipt(receipt, "sent")
+        if len(batch) == 1:
+            logger.info(f"📤 [{label}] Komut gönderildi: {batch[0][0]}")
+        else:
+            logger.info(f"📦 [{label}] {len(batch)} komut tek çerçevede: {' · '.join(c for c, _ in batch)}")
+    return sent, None
+
+
+class RelayLink:
+    """Röle sunucusuna tek WebSocket: cihazlar bağlantıyla değil kimlikle adreslenir
+
+    Röle her mesajı tüm istemcilere yayınlar, cihazlar "<device_id> " önekine
+    bakar (websocket.gd). Soket ve görev sayısı cihaz sayısından bağımsızdır:
+      - Cihaz kuyrukları (CommandQueue, birleştirme ve onay dahil) aynen kalır;
+        tek yazıcı görev hazır kuyrukları sırayla boşaltır.
+      - Herkese giden komut öneksiz tek mesajdır (broadcast kuyruğu).
+      - Bağlantı durumu cihazların kendi "PING <id> <n>" heartbeat'inden çıkarılır,
+        cihazlara ayrıca PING atılmaz. Rölenin kendisi WebSocket ping'iyle izlenir.
+    Alt sınıf devices/connect/wait_retry'ı verir; connected ve queues sözlükleri
+    betiğin kendi bağlantı tablolarıdır.
+    """
+
+    # Alt sınıfın verdiği ayarlar (GUI'de ayarlar sözlüğünden okunan property'ler)
+    ack_mode = False              # cihaz config'inde "ack" yoksa
+    batch_window = 0.0            # saniye; 0 toplu gönderimi kapatır
+    heartbeat_interval = 5.0      # cihazların kendi heartbeat aralığı
+
+    def __init__(self, url: str, connected: Dict[str, bool], queues: Dict[str, CommandQueue]):
+        self.url = url
+        self.connected = connected
+        self.queues = queues
+        self.ws = None
+        self.ready: OrderedDict = OrderedDict()   # komutu bekleyen kuyruklar (nickname veya RELAY_KEY)
+        self.wakeup = asyncio.Event()
+        self.broadcast = self.new_queue()
+        self.routes: Dict[str, List[str]] = {}   # device_id -> nickname'ler
+        self.last_seen: Dict[str, float] = {}    # nickname -> cihazdan son mesaj (loop.time())
+        self.stats = {"sent": 0, "received": 0, "broadcasts": 0, "echoes": 0}
+
+    def devices(self) -> Dict[str, Dict[str, Any]]:
+        """Kayıtlı cihazlar: nickname -> {"device_id", "ack", "batch", ...}"""
+        raise NotImplementedError
+
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    def new_queue(self) -> CommandQueue:
+        return CommandQueue()
+
+    def device_online(self, nickname: str) -> None:
+        """Cihaz (yeniden) görüldü; alt sınıf bekleyen durumu senkronlar"""
+
+    async def connect(self):
+        raise NotImplementedError
+
+    def connect_failed(self, error: Exception) -> None:
+        pass
+
+    async def wait_retry(self, uptime: Optional[float]) -> None:
+        raise NotImplementedError
+
+    async def send_commands(self, ws, label: str, prefix: str, queue: CommandQueue,
+                            items: List[Tuple[str, asyncio.Future]], ack: bool) -> Tuple[int, Optional[Exception]]:
+        return await send_commands(ws, label, prefix, queue, items, ack)
+
+    def route(self, device_id: str) -> List[str]:
+        devices = self.devices()
+        nicknames = [n for n in self.routes.get(device_id, []) if n in devices]
+        if not nicknames:
+            self.routes = {}
+            for nickname, info in devices.items():
+                self.routes.setdefault(info["device_id"], []).append(nickname)
+            nicknames = self.routes.get(device_id, [])
+        return nicknames
+
+    def put(self, nickname: str, command: str) -> Optional[asyncio.Future]:
+        if self.ws is None or not self.connected.get(nickname, False):
+            return None
+        queue = self.queues.get(nickname)
+        if queue is None:
+            queue = self.queues[nickname] = self.new_queue()
+        receipt = queue.put(command)
+        self.ready[nickname] = None
+        self.wakeup.set()
+        return receipt
+
+    def put_broadcast(self, command: str) -> Optional[asyncio.Future]:
+        if self.ws is None:
+            return None
+        self.stats["broadcasts"] += 1
+        receipt = self.broadcast.put(command)
+        self.ready[RELAY_KEY] = None
+        self.wakeup.set()
+        return receipt
+
+    def seen(self, device_id: str) -> List[str]:
+        now = asyncio.get_running_loop().time()
+        nicknames = self.route(device_id)
+        for nickname in nicknames:
+            self.last_seen[nickname] = now
+            if not self.connected.get(nickname, False):
+                self.connected[nickname] = True
+                logger.info(f"✅ [{nickname}] Röle üzerinden görüldü")
+                self.device_online(nickname)
+        return nicknames
+
+    def set_offline(self, nickname: str) -> None:
+        self.connected[nickname] = False
+        queue = self.queues.get(nickname)
+        dropped = queue.clear() if queue is not None else 0
+        if dropped:
+            logger.warning(f"⚠️ [{nickname}] Cihaz görünmüyor, {dropped} komut atıldı")
+
+    async def reader(self, ws) -> None:
+        async for message in ws:
+            self.stats["received"] += 1
+            if not isinstance(message, str):
+                continue
+            parts = message.split()
+            if len(parts) >= 2 and parts[0] in ("PING", "PONG"):
+                self.seen(parts[1])
+            elif len(parts) >= 3 and parts[0] == "ACK" and parts[2].isdigit():
+                nicknames = self.seen(parts[1])
+                for seq in (int(part) for part in parts[2:] if part.isdigit()):
+                    for nickname in nicknames:
+                        queue = self.queues.get(nickname)
+                        if queue is not None and seq in queue.inflight:
+                            queue.acknowledge(seq)
+                            break
+            else:
+                self.stats["echoes"] += 1   # kendi komutlarımız veya başka kontrolcüler
+
+    async def writer(self, ws) -> None:
+        while True:
+            await self.wakeup.wait()
+            window = self.batch_window
+            if window > 0:
+                await asyncio.sleep(window)   # aynı pencerede sıraya girenler birlikte gider
+            self.wakeup.clear()
+            devices = self.devices()
+            while self.ready:
+                nickname, _ = self.ready.popitem(last=False)
+                if nickname == RELAY_KEY:
+                    queue, ack, prefix, batching = self.broadcast, False, "", False
+                else:
+                    info = devices.get(nickname)
+                    queue = self.queues.get(nickname)
+                    if info is None or queue is None:
+                        continue
+                    ack, prefix = info.get("ack", self.ack_mode), info["device_id"] + " "
+                    # Yayın öneksiz gider, zarfa konamaz; cihaz kuyrukları toplu gidebilir
+                    batching = window > 0 and info.get("batch", True)
+                items = queue.pop_batch(BATCH_MAX_COMMANDS if batching else 1)
+                if not items:
+                    continue
+                sent, error = await self.send_commands(ws, nickname if prefix else "hepsi", prefix, queue, items, ack)
+                self.stats["sent"] += sent
+                if error is not None:
+                    logger.error(f"❌ Röleye gönderme hatası: {error}")
+                    return
+                if len(queue):
+                    self.ready[nickname] = None   # sıranın sonuna: cihazlar arasında adil dağılım
+
+    async def presence(self) -> None:
+        """Kendi heartbeat'i RELAY_PRESENCE_MISSES aralık boyunca görülmeyen cihaz çevrimdışıdır"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = loop.time()
+            timeout = RELAY_PRESENCE_MISSES * self.heartbeat_interval
+            for nickname in list(self.devices()):
+                if not self.connected.get(nickname, False):
+                    continue
+                seen = self.last_seen.get(nickname)
+                if seen is None or now - seen > timeout:
+                    logger.warning(f"⚠️ [{nickname}] Röle üzerinden heartbeat gelmiyor")
+                    self.set_offline(nickname)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self.enabled():
+            connected_at = None
+            try:
+                ws = await self.connect()
+                connected_at = loop.time()
+                async with ws:
+                    self.ws = ws
+                    logger.info(f"✅ Röleye bağlandı: {self.url} ({len(self.devices())} cihaz)")
+                    jobs = {asyncio.create_task(self.reader(ws)),
+                            asyncio.create_task(self.writer(ws)),
+                            asyncio.create_task(self.presence())}
+                    try:
+                        await asyncio.wait(jobs, return_when=asyncio.FIRST_COMPLETED)
+                        logger.warning("⚠️ Röle bağlantısı kapandı")
+                    finally:
+                        for job in jobs:
+                            job.cancel()
+            except Exception as e:
+                logger.error(f"❌ Röle bağlantı hatası: {e}")
+                self.connect_failed(e)
+
+            self.ws = None
+            self.ready.clear()
+            self.broadcast.clear()
+            for nickname in list(self.devices()):
+                self.set_offline(nickname)
+            uptime = loop.time() - connected_at if connected_at is not None else None
+            await self.wait_retry(uptime)
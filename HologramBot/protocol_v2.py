@@ -0,0 +1,231 @@
+# protocol_v2.py - İsteğe bağlı ikili komut protokolü (v2): sayısal opcode, tipli parametre, istek no
+
+"""
+Anlaşma (bağlantı başında, metin):
+    kontrolcü -> "<device_id> HELLO 2"
+    cihaz     -> "HELLO <device_id> 2"        (v2 bilmeyen cihaz yanıt vermez -> metin protokolü)
+
+Çerçeve (ikili WebSocket mesajı, little-endian):
+    başlık (6 bayt) = magic "HC\\x02" | opcode u8 | istek no u16
+    + parametre (opcode'a göre):
+        f -> float32          (rpm, light)
+        i -> int32            (phase)
+        s -> u16 uzunluk + UTF-8 (model, video)
+        (yok)                 (+, -, reset, stop_video)
+    İstek no 0 ise onay beklenmez; değilse cihaz aynı numarayla ACK çerçevesi döner:
+    magic | OP_ACK | istek no
+    (bir mesajda art arda birden fazla ACK çerçevesi olabilir)
+Toplu çerçeve (aynı anda sıraya giren komutlar tek mesajda):
+    magic | OP_BATCH | adet u16 + her komut için (u16 uzunluk + çerçeve)
+Mesaj (her iki yönde): "<device_id> " + çerçeve. Aynı IP'deki holoserv/relay
+her mesajı tüm ekranlara yayınlar; önek olmadan bir ekranın komutu hepsinde
+çalışır, ACK'i de başka ekranın komutunu onaylardı. Poz kareleri de aynı öneki
+taşır ("<device_id> " + "ASP1...", pose_stream.py); önekten sonraki magic ayırır.
+Tabloda olmayan komutlar v2 bağlantıda da metin olarak gönderilir.
+
+Karşılaştırma:  python protocol_v2.py --bench
+"""
+
+import argparse
+import struct
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+PROTOCOL_VERSION = 2
+PROTOCOL_MAGIC = b"HC\x02"
+FRAME_HEADER = struct.Struct("<3sBH")
+OP_ACK = 0x80
+OP_BATCH = 0x81
+
+# komut adı -> (opcode, parametre tipi)
+COMMANDS: Dict[str, Tuple[int, str]] = {
+    "+": (0x01, ""),
+    "-": (0x02, ""),
+    "reset": (0x03, ""),
+    "phase": (0x04, "i"),
+    "model": (0x05, "s"),
+    "rpm": (0x06, "f"),
+    "light": (0x07, "f"),
+    "video": (0x08, "s"),
+    "stop_video": (0x09, ""),
+}
+OPCODES: Dict[int, Tuple[str, str]] = {op: (name, kind) for name, (op, kind) in COMMANDS.items()}
+
+_FLOAT = struct.Struct("<f")
+_INT = struct.Struct("<i")
+_STR_LEN = struct.Struct("<H")
+
+Value = Union[None, float, int, str]
+
+
+def hello(device_id: str) -> str:
+    return f"{device_id} HELLO {PROTOCOL_VERSION}"
+
+
+def parse_hello(message: str) -> Optional[Tuple[str, int]]:
+    """"HELLO <device_id> <sürüm>" -> (device_id, sürüm)"""
+    parts = message.split()
+    if len(parts) == 3 and parts[0] == "HELLO" and parts[2].isdigit():
+        return parts[1], int(parts[2])
+    return None
+
+
+def encode(name: str, value: Value = None, request_id: int = 0) -> bytes:
+    """Tipli değerden çerçeve (bilinmeyen komut veya uymayan değer: KeyError/struct.error)"""
+    opcode, kind = COMMANDS[name]
+    header = FRAME_HEADER.pack(PROTOCOL_MAGIC, opcode, request_id & 0xFFFF)
+    if kind == "f":
+        return header + _FLOAT.pack(value)
+    if kind == "i":
+        return header + _INT.pack(value)
+    if kind == "s":
+        raw = value.encode("utf-8")
+        return header + _STR_LEN.pack(len(raw)) + raw
+    return header
+
+
+def encode_command(command: str, request_id: int = 0) -> Optional[bytes]:
+    """Metin komutunu v2 çerçevesine çevir; karşılığı yoksa (veya parametre uymuyorsa) None"""
+    name, _, arg = command.partition(" ")
+    spec = COMMANDS.get(name)
+    if spec is None:
+        return None
+    kind = spec[1]
+    try:
+        value = float(arg) if kind == "f" else int(arg) if kind == "i" else arg if kind == "s" else None
+        return encode(name, value, request_id)
+    except (ValueError, struct.error):
+        return None
+
+
+def is_frame(frame: bytes) -> bool:
+    return frame[:len(PROTOCOL_MAGIC)] == PROTOCOL_MAGIC
+
+
+def decode_frame(frame: bytes) -> Tuple[int, int, Value]:
+    """(opcode, istek no, parametre)"""
+    magic, opcode, request_id = FRAME_HEADER.unpack_from(frame)
+    if magic != PROTOCOL_MAGIC:
+        raise ValueError("Geçersiz v2 çerçevesi")
+    offset = FRAME_HEADER.size
+    kind = OPCODES.get(opcode, ("", ""))[1]
+    if kind == "f":
+        return opcode, request_id, _FLOAT.unpack_from(frame, offset)[0]
+    if kind == "i":
+        return opcode, request_id, _INT.unpack_from(frame, offset)[0]
+    if kind == "s":
+        (length,) = _STR_LEN.unpack_from(frame, offset)
+        start = offset + _STR_LEN.size
+        return opcode, request_id, bytes(frame[start:start + length]).decode("utf-8")
+    return opcode, request_id, None
+
+
+def address(device_id: str, frame: bytes) -> bytes:
+    """Çerçeveyi "<device_id> " önekiyle mesaja çevir"""
+    return device_id.encode("utf-8") + b" " + frame
+
+
+def split_address(message: bytes) -> Tuple[str, bytes]:
+    """"<device_id> " + çerçeve -> (device_id, çerçeve); önek yoksa ("", mesaj)"""
+    if is_frame(message):
+        return "", bytes(message)
+    device_id, space, frame = bytes(message).partition(b" ")
+    if not space:
+        return "", bytes(message)
+    return device_id.decode("utf-8", "replace"), frame
+
+
+def encode_ack(request_id: int) -> bytes:
+    return FRAME_HEADER.pack(PROTOCOL_MAGIC, OP_ACK, request_id & 0xFFFF)
+
+
+def decode_acks(message: bytes, device_id: str) -> List[int]:
+    """Cihazdan gelen mesajdaki art arda ACK çerçevelerinin istek numaraları
+
+    Başka cihazın (veya öneksiz) mesajı boş liste döner.
+    """
+    owner, frame = split_address(message)
+    if owner != device_id:
+        return []
+    request_ids = []
+    for offset in range(0, len(frame) - FRAME_HEADER.size + 1, FRAME_HEADER.size):
+        magic, opcode, request_id = FRAME_HEADER.unpack_from(frame, offset)
+        if magic != PROTOCOL_MAGIC or opcode != OP_ACK:
+            break
+        request_ids.append(request_id)
+    return request_ids
+
+
+def encode_batch(frames: List[bytes]) -> bytes:
+    """Çerçeveleri tek mesajda topla (istek no alanı adet olarak kullanılır)"""
+    parts = [FRAME_HEADER.pack(PROTOCOL_MAGIC, OP_BATCH, len(frames))]
+    for frame in frames:
+        parts.append(_STR_LEN.pack(len(frame)))
+        parts.append(frame)
+    return b"".join(parts)
+
+
+def decode_batch(frame: bytes) -> List[bytes]:
+    _, opcode, count = FRAME_HEADER.unpack_from(frame)
+    if opcode != OP_BATCH:
+        return [bytes(frame)]
+    frames, offset = [], FRAME_HEADER.size
+    for _ in range(count):
+        (length,) = _STR_LEN.unpack_from(frame, offset)
+        offset += _STR_LEN.size
+        frames.append(bytes(frame[offset:offset + length]))
+        offset += length
+    return frames
+
+
+# ===== KARŞILAŞTIRMA =====
+def _parse_text(message: str, device_id: str) -> Tuple[str, Value]:
+    """Cihazın metin yolu (websocket.gd + holo.gd): önek kontrolü, komut adı, sayı çevirimi"""
+    content = message[len(device_id) + 1:] if message.startswith(device_id + " ") else message
+    name, _, arg = content.partition(" ")
+    kind = COMMANDS.get(name, (0, "s"))[1]
+    if kind == "f":
+        return name, float(arg)
+    if kind == "i":
+        return name, int(arg)
+    return name, arg or None
+
+
+def bench(iterations: int) -> None:
+    """Boyut ve mesaj başına süre: metin / v2 tipli değerden / v2 metinden (ikisi de öneki dahil)"""
+    device_id = "DEVICE_192_168_1_100"
+    samples = [("rpm", 45.5), ("light", 2.0), ("phase", 90), ("reset", None),
+               ("model", "https://cdn.example.com/models/sign_merhaba.glb"),
+               ("video", "https://cdn.example.com/v/a.mp4")]
+    print(f"{'komut':<8}{'metin B':>8}{'v2 B':>6}{'metin kodla':>13}{'v2 kodla':>10}{'v2 metinden':>13}"
+          f"{'metin çöz':>11}{'v2 çöz':>8}   (ns/mesaj)")
+    for name, value in samples:
+        command = name if value is None else f"{name} {value}"
+        text = f"{device_id} {command}"
+        message = address(device_id, encode(name, value, 1))
+
+        timings = []
+        for job in (lambda: f"{device_id} {command}".encode("utf-8"),
+                    lambda: address(device_id, encode(name, value, 1)),
+                    lambda: address(device_id, encode_command(command, 1)),
+                    lambda: _parse_text(text, device_id),
+                    lambda: decode_frame(split_address(message)[1])):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                job()
+            timings.append((time.perf_counter() - start) * 1e9 / iterations)
+
+        print(f"{name:<8}{len(text.encode('utf-8')):>8}{len(message):>6}" +
+              "".join(f"{t:>{w}.0f}" for t, w in zip(timings, (13, 10, 13, 11, 8))))
+    print(f"ACK: metin {len(f'ACK {device_id} 1')} B, v2 {len(address(device_id, encode_ack(1)))} B")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Protokol v2 ile metin protokolünün karşılaştırması")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.iterations)
+    else:
+        parser.print_help()
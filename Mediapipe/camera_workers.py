@@ -0,0 +1,284 @@
+# camera_workers.py - Çoklu kamera: kamera başına yakalama + Hands süreçleri
+
+import heapq
+import itertools
+import multiprocessing as mp_proc
+import queue
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from frame_ring import FrameRing
+from gestures import detect_gesture
+
+# Worker'ların ana sürece gönderdiği olay türleri
+EVENT_GESTURE = "gesture"
+EVENT_LANDMARKS = "landmarks"
+EVENT_STATS = "stats"
+EVENT_ERROR = "error"
+
+DEFAULT_FRAME_SIZE = (1280, 720)
+PREVIEW_SIZE = (400, 250)
+STATS_INTERVAL = 1.0
+
+
+class CameraEvent(NamedTuple):
+    """Worker -> ana süreç olayı (zaman damgasına göre sıralanır)"""
+    timestamp: float
+    camera: int
+    kind: str
+    payload: Any
+
+
+class HandFrame(NamedTuple):
+    """Bir karenin tanıma sonucu; kare değil sadece küçük diziler taşınır"""
+    seq: int
+    landmarks: np.ndarray          # (H, 21, 3) float32, normalize
+    handedness: Tuple[str, ...]
+    gestures: Tuple[str, ...]
+
+
+def _put_nowait(q, item) -> bool:
+    """Kuyruk doluysa bekleme, öğeyi düşür"""
+    try:
+        q.put_nowait(item)
+        return True
+    except queue.Full:
+        return False
+
+
+def capture_worker(camera: int, source: Any, ring_name: str, event_queue, stop_event, settings: Dict[str, Any]):
+    """Kameradan okuyup kareleri (aynalanmış, RGB) paylaşımlı halkaya yazar"""
+    cv2.setNumThreads(1)
+    ring = FrameRing.attach(ring_name)
+    height, width = ring.shape[:2]
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        _put_nowait(event_queue, CameraEvent(time.time(), camera, EVENT_ERROR, f"Kamera açılamadı: {source}"))
+        ring.close()
+        return
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    scratch = np.empty(ring.shape, dtype=np.uint8)
+    try:
+        while not stop_event.is_set():
+            ret, frame = cap.read()
+            t_capture = time.time()
+            if not ret:
+                _put_nowait(event_queue, CameraEvent(t_capture, camera, EVENT_ERROR, "Kare okunamadı"))
+                break
+
+            if frame.shape[:2] != (height, width):
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+            # Aynalama + RGB dönüşümü doğrudan paylaşımlı slota yazılır
+            seq, slot = ring.begin_write()
+            cv2.flip(frame, 1, dst=scratch)
+            cv2.cvtColor(scratch, cv2.COLOR_BGR2RGB, dst=slot)
+            ring.commit(seq, t_capture)
+            del slot
+    finally:
+        cap.release()
+        ring.close()
+
+
+def inference_worker(camera: int, ring_name: str, event_queue, stop_event, settings: Dict[str, Any]):
+    """Halkadaki en son kareyi kopyasız okuyup Hands çalıştırır, sadece landmark'ları geri yollar"""
+    import mediapipe as mp
+
+    cv2.setNumThreads(1)
+    ring = FrameRing.attach(ring_name)
+    mp_hands = mp.solutions.hands
+
+    last_seq = 0
+    last_gestures: Dict[str, str] = {}
+    frames = 0
+    skipped = 0
+    torn = 0
+    dropped_events = 0
+    latency_sum = 0.0
+    window_start = time.time()
+    window_seq = ring.write_seq
+
+    try:
+        with mp_hands.Hands(model_complexity=settings.get("model_complexity", 0),
+                            min_detection_confidence=settings.get("min_detection_confidence", 0.7),
+                            min_tracking_confidence=settings.get("min_tracking_confidence", 0.7)) as hands:
+            while not stop_event.is_set():
+                latest = ring.latest()
+                if latest is None or latest[0] == last_seq:
+                    time.sleep(0.002)
+                    continue
+
+                seq, t_capture, view = latest
+                results = hands.process(view)
+                del view
+                # Yazar bu sırada slotun üzerine yazdıysa sonuç güvenilmez
+                if not ring.is_valid(seq):
+                    torn += 1
+                    last_seq = seq
+                    continue
+
+                if last_seq:
+                    skipped += max(seq - last_seq - 1, 0)
+                last_seq = seq
+
+                landmarks = np.zeros((0, 21, 3), dtype=np.float32)
+                handedness: List[str] = []
+                gestures: List[str] = []
+                if results.multi_hand_landmarks:
+                    landmarks = np.array(
+                        [[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in results.multi_hand_landmarks],
+                        dtype=np.float32
+                    )
+                    for idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
+                        hand_info = results.multi_handedness[idx].classification[0].label
+                        gesture = detect_gesture(hand_landmarks, hand_info)
+                        handedness.append(hand_info)
+                        gestures.append(gesture)
+
+                        if gesture != last_gestures.get(hand_info) and gesture != "none":
+                            event = CameraEvent(t_capture, camera, EVENT_GESTURE, (hand_info, gesture))
+                            if not _put_nowait(event_queue, event):
+                                dropped_events += 1
+                            last_gestures[hand_info] = gesture
+
+                hand_frame = HandFrame(seq, landmarks, tuple(handedness), tuple(gestures))
+                _put_nowait(event_queue, CameraEvent(t_capture, camera, EVENT_LANDMARKS, hand_frame))
+
+                t_done = time.time()
+                frames += 1
+                latency_sum += t_done - t_capture
+
+                # Kamera başına FPS / gecikme sayaçları
+                elapsed = t_done - window_start
+                if elapsed >= STATS_INTERVAL:
+                    stats = {
+                        "fps": frames / elapsed,
+                        "capture_fps": (seq - window_seq) / elapsed,
+                        "latency_ms": latency_sum / frames * 1000.0,
+                        "skipped_frames": skipped,
+                        "torn_frames": torn,
+                        "dropped_events": dropped_events,
+                    }
+                    _put_nowait(event_queue, CameraEvent(t_done, camera, EVENT_STATS, stats))
+                    frames, latency_sum, window_start, window_seq = 0, 0.0, t_done, seq
+    finally:
+        ring.close()
+
+
+class MultiCameraManager:
+    """Kamera süreçlerini yönetir ve olaylarını tek, zaman sıralı akışta birleştirir
+
+    Her kamera için: yakalama süreci -> FrameRing (paylaşımlı bellek) -> Hands süreci.
+    Kareler süreçler arasında hiç kopyalanmaz/pickle edilmez; önizleme de halkadan okunur.
+    """
+
+    def __init__(self, sources: List[Any], settings: Optional[Dict[str, Any]] = None,
+                 reorder_window: float = 0.05, queue_size: int = 256):
+        self.sources = list(sources)
+        self.settings = settings or {}
+        # Farklı kameralardan gelen olaylar bu süre kadar bekletilip sıralanır
+        self.reorder_window = reorder_window
+        self.queue_size = queue_size
+        self.ctx = mp_proc.get_context("spawn")
+
+        self.processes: List[Any] = []
+        self.event_queues: List[Any] = []
+        self.rings: List[FrameRing] = []
+        self.stop_event = None
+        self.stats: Dict[int, Dict[str, Any]] = {}
+        self.errors: Dict[int, str] = {}
+        self.latest_hands: Dict[int, HandFrame] = {}
+        # Her HandFrame için çağrılır: callback(kamera, zaman, hand_frame)
+        self.landmark_callback: Optional[Callable[[int, float, HandFrame], None]] = None
+        self._pending: List[Any] = []
+        self._seq = itertools.count()
+
+    @property
+    def is_running(self) -> bool:
+        return any(p.is_alive() for p in self.processes)
+
+    def start(self):
+        """Her kamera için halka + yakalama ve tanıma süreçlerini başlat"""
+        self.stop_event = self.ctx.Event()
+        width, height = self.settings.get("frame_size", DEFAULT_FRAME_SIZE)
+        slots = self.settings.get("ring_slots", 6)
+
+        for camera, source in enumerate(self.sources):
+            ring = FrameRing.create((height, width, 3), slots=slots)
+            # Kamera başına ayrı kuyruk: gürültülü bir kamera diğerlerinin olaylarını geciktirmez
+            event_queue = self.ctx.Queue(maxsize=self.queue_size)
+            procs = [
+                self.ctx.Process(target=capture_worker, name=f"capture-{camera}", daemon=True,
+                                 args=(camera, source, ring.name, event_queue, self.stop_event, self.settings)),
+                self.ctx.Process(target=inference_worker, name=f"hands-{camera}", daemon=True,
+                                 args=(camera, ring.name, event_queue, self.stop_event, self.settings)),
+            ]
+            for proc in procs:
+                proc.start()
+            self.processes.extend(procs)
+            self.rings.append(ring)
+            self.event_queues.append(event_queue)
+            self.stats[camera] = {"fps": 0.0, "capture_fps": 0.0, "latency_ms": 0.0, "dropped_events": 0}
+
+    def stop(self, timeout: float = 2.0):
+        """Süreçleri durdur, halkaları sil"""
+        if self.stop_event is not None:
+            self.stop_event.set()
+        for proc in self.processes:
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+        for ring in self.rings:
+            ring.close()
+        self.processes.clear()
+        self.rings.clear()
+        self.event_queues.clear()
+        self._pending.clear()
+        self.latest_hands.clear()
+
+    def poll(self, max_per_camera: int = 64) -> List[CameraEvent]:
+        """Bekleyen olayları topla ve zaman sırasına göre hazır olanları döndür (bloklamaz)"""
+        # Round-robin boşaltma: her kameradan en fazla max_per_camera olay
+        for q in self.event_queues:
+            for _ in range(max_per_camera):
+                try:
+                    event = q.get_nowait()
+                except queue.Empty:
+                    break
+                if event.kind == EVENT_STATS:
+                    self.stats[event.camera] = event.payload
+                    continue
+                if event.kind == EVENT_LANDMARKS:
+                    self.latest_hands[event.camera] = event.payload
+                    if self.landmark_callback is not None:
+                        self.landmark_callback(event.camera, event.timestamp, event.payload)
+                    continue
+                if event.kind == EVENT_ERROR:
+                    self.errors[event.camera] = event.payload
+                heapq.heappush(self._pending, (event.timestamp, next(self._seq), event))
+
+        # Pencereden eski olaylar artık sıralı kabul edilir
+        ready = []
+        cutoff = time.time() - self.reorder_window
+        while self._pending and self._pending[0][0] <= cutoff:
+            ready.append(heapq.heappop(self._pending)[2])
+        return ready
+
+    def latest_frame(self, camera: int) -> Optional[Tuple[int, float, np.ndarray]]:
+        """Kameranın en son karesi: (seq, zaman, kopyasız görünüm) - görünüm üzerine çizmeyin"""
+        if 0 <= camera < len(self.rings):
+            return self.rings[camera].latest()
+        return None
+
+    def latest_preview(self, camera: int, size: Tuple[int, int] = PREVIEW_SIZE) -> Optional[np.ndarray]:
+        """Önizleme için küçültülmüş kopya (üzerine çizilebilir)"""
+        latest = self.latest_frame(camera)
+        if latest is None:
+            return None
+        return cv2.resize(latest[2], size, interpolation=cv2.INTER_AREA)
@@ -0,0 +1,290 @@
+# dataset_capture.py - Eğitim verisi toplama: kamera hızında etiketli landmark + (isteğe bağlı) JPEG kaydı
+
+"""
+Kullanım:
+    python dataset_capture.py --labels A,B,C,Ç --camera 0 --jpeg
+    python dataset_capture.py --fit datasets/capture_20260101_120000   # harf şablonlarını çıkar
+
+Tuşlar: etiket sırasıyla 1..9, 0, q, w, e, ... | BOŞLUK = etiketsiz | ESC = bitir
+
+Oturum klasörü:
+    landmarks.bin   sadece ekleme yapılan kayıt dizisi (RECORD_DTYPE), np.fromfile ile okunur
+    labels.jsonl    etiket zaman çizelgesi: {"frame", "t", "label"}
+    frames/         (--jpeg) 00000042.jpg
+    summary.json    kare/düşme sayaçları
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from fingerspelling import TURKISH_ALPHABET, TemplateClassifier, letter_features
+
+DATASETS_DIR = "datasets"
+HOTKEYS = "1234567890qwertyuiopasdfghjklzxcvbnm"
+NO_LABEL = 0xFFFF
+MAX_HANDS = 2
+
+# Kare başına sabit boyutlu kayıt: dosya kesilse bile önceki kayıtlar okunabilir
+RECORD_DTYPE = np.dtype([
+    ("frame", "<u4"),
+    ("t", "<f8"),
+    ("label", "<u2"),
+    ("hands", "u1"),
+    ("handedness", "u1"),          # i. bit 1 ise i. el "Right"
+    ("landmarks", "<f4", (MAX_HANDS, 21, 3)),
+])
+
+
+def load_landmarks(session_dir: str) -> np.ndarray:
+    return np.fromfile(os.path.join(session_dir, "landmarks.bin"), dtype=RECORD_DTYPE)
+
+
+def load_labels(session_dir: str) -> List[str]:
+    with open(os.path.join(session_dir, "summary.json"), "r", encoding="utf-8") as f:
+        return json.load(f)["labels"]
+
+
+class DatasetCapture:
+    """Yakalama thread'i sadece okur ve dağıtır; hiçbir zaman disk veya kodlama beklemez
+
+    - Tanıma (Hands) tek thread'de sınırlı kuyruktan sırayla çalışır; yetişemezse kare düşer.
+    - JPEG kodlama + yazma thread havuzunda; uçuştaki iş sınırı dolunca kare düşer.
+    Her düşme türü ayrı sayılır ve özetlenir; kamera sürücüsünün atladığı kareler de
+    kare aralığından tahmin edilir.
+    """
+
+    def __init__(self, source: Any, labels: List[str], base_dir: Optional[str] = None,
+                 save_jpeg: bool = False, jpeg_quality: int = 90, jpeg_workers: int = 4,
+                 queue_size: int = 8, max_inflight: int = 32):
+        if base_dir is None:
+            base_dir = os.path.join(DATASETS_DIR, datetime.now().strftime("capture_%Y%m%d_%H%M%S"))
+        self.base_dir = base_dir
+        self.source = source
+        self.labels = list(labels)
+        self.save_jpeg = save_jpeg
+        self.jpeg_quality = jpeg_quality
+        os.makedirs(os.path.join(base_dir, "frames") if save_jpeg else base_dir, exist_ok=True)
+
+        self.current_label = NO_LABEL
+        self.latest_frame = None
+        self._stop = threading.Event()
+        self._infer_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._pool = ThreadPoolExecutor(max_workers=jpeg_workers, thread_name_prefix="jpeg") if save_jpeg else None
+        self._inflight = threading.BoundedSemaphore(max_inflight)
+        self._threads: List[threading.Thread] = []
+        self._timeline = open(os.path.join(base_dir, "labels.jsonl"), "a", encoding="utf-8")
+        self._timeline_lock = threading.Lock()
+
+        self.stats = {
+            "frames_captured": 0,
+            "camera_gaps": 0,            # kamera tarafında atlandığı tahmin edilen kareler
+            "landmarks_written": 0,
+            "landmarks_dropped": 0,      # tanıma yetişemedi
+            "jpeg_written": 0,
+            "jpeg_dropped": 0,           # kodlama havuzu dolu
+            "jpeg_errors": 0,
+        }
+        self.camera_fps = 0.0
+
+    def start(self):
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            raise OSError(f"Kamera açılamadı: {self.source}")
+        self.camera_fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        for target, name in ((self._capture_loop, "capture"), (self._inference_loop, "hands")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> Dict[str, Any]:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        self.cap.release()
+        self._timeline.close()
+        summary = dict(self.stats, labels=self.labels, camera_fps=self.camera_fps, jpeg=self.save_jpeg)
+        with open(os.path.join(self.base_dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return summary
+
+    def set_label(self, index: int):
+        """Etiket zaman çizelgesine geçiş ekle (NO_LABEL = etiketsiz)"""
+        if index == self.current_label:
+            return
+        self.current_label = index
+        entry = {"frame": self.stats["frames_captured"], "t": round(time.time(), 4),
+                 "label": self.labels[index] if index != NO_LABEL else None}
+        with self._timeline_lock:
+            self._timeline.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._timeline.flush()
+
+    # --- YAKALAMA THREAD ---
+    def _capture_loop(self):
+        period = 1.0 / self.camera_fps
+        last_t = None
+        index = 0
+        while not self._stop.is_set():
+            ret, frame = self.cap.read()
+            t = time.time()
+            if not ret:
+                break
+            if last_t is not None:
+                # Beklenen aralığın 1.5 katından uzun boşluk = kamera kare atladı
+                gap = round((t - last_t) / period) - 1
+                if gap > 0 and t - last_t > 1.5 * period:
+                    self.stats["camera_gaps"] += gap
+            last_t = t
+            label = self.current_label
+            self.latest_frame = frame
+            self.stats["frames_captured"] += 1
+
+            try:
+                self._infer_queue.put_nowait((index, t, label, frame))
+            except queue.Full:
+                self.stats["landmarks_dropped"] += 1
+
+            if self._pool is not None:
+                if self._inflight.acquire(blocking=False):
+                    self._pool.submit(self._encode_jpeg, index, frame)
+                else:
+                    self.stats["jpeg_dropped"] += 1
+            index += 1
+
+    # --- JPEG HAVUZU ---
+    def _encode_jpeg(self, index: int, frame):
+        try:
+            ok, buf = cv2.imencode(".jpg", cv2.flip(frame, 1), [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                self.stats["jpeg_errors"] += 1
+                return
+            with open(os.path.join(self.base_dir, "frames", f"{index:08d}.jpg"), "wb") as f:
+                f.write(buf.tobytes())
+            self.stats["jpeg_written"] += 1
+        except OSError:
+            self.stats["jpeg_errors"] += 1
+        finally:
+            self._inflight.release()
+
+    # --- TANIMA THREAD ---
+    def _inference_loop(self):
+        import mediapipe as mp
+
+        record = np.zeros(1, dtype=RECORD_DTYPE)
+        with open(os.path.join(self.base_dir, "landmarks.bin"), "ab") as out, \
+                mp.solutions.hands.Hands(model_complexity=0, max_num_hands=MAX_HANDS,
+                                         min_detection_confidence=0.7, min_tracking_confidence=0.7) as hands:
+            # Durdurulunca kuyrukta kalanlar da yazılır
+            while not (self._stop.is_set() and self._infer_queue.empty()):
+                try:
+                    item = self._infer_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                index, t, label, frame = item
+                rgb = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+                results = hands.process(rgb)
+
+                record.fill(0)
+                record["frame"], record["t"], record["label"] = index, t, label
+                if results.multi_hand_landmarks:
+                    bits = 0
+                    for i, hand in enumerate(results.multi_hand_landmarks[:MAX_HANDS]):
+                        record["landmarks"][0, i] = [(lm.x, lm.y, lm.z) for lm in hand.landmark]
+                        if results.multi_handedness[i].classification[0].label == "Right":
+                            bits |= 1 << i
+                    record["hands"] = min(len(results.multi_hand_landmarks), MAX_HANDS)
+                    record["handedness"] = bits
+                out.write(record.tobytes())
+                self.stats["landmarks_written"] += 1
+
+
+def fit_templates(session_dirs: List[str], out_path: str):
+    """Kayıtlardaki etiketli, tek elli karelerden parmak alfabesi şablonları çıkar"""
+    features, names = [], []
+    for session_dir in session_dirs:
+        labels = load_labels(session_dir)
+        records = load_landmarks(session_dir)
+        records = records[(records["label"] != NO_LABEL) & (records["hands"] > 0)]
+        for rec in records:
+            hand = "Right" if rec["handedness"] & 1 else "Left"
+            features.append(letter_features(rec["landmarks"][0], hand))
+            names.append(labels[rec["label"]])
+    if not features:
+        raise ValueError("Etiketli kare bulunamadı")
+    TemplateClassifier.fit(np.stack(features), names).save(out_path)
+    print(f"{len(features)} kareden {len(set(names))} harf şablonu: {out_path}")
+
+
+def run_capture(args):
+    labels = [l.strip() for l in args.labels.split(",") if l.strip()]
+    if len(labels) > len(HOTKEYS):
+        raise SystemExit(f"En fazla {len(HOTKEYS)} etiket")
+    source = int(args.camera) if args.camera.isdigit() else args.camera
+    capture = DatasetCapture(source, labels, args.output, save_jpeg=args.jpeg,
+                             jpeg_quality=args.quality, jpeg_workers=args.workers)
+    capture.start()
+    print(f"Kayıt: {capture.base_dir}")
+    for key, label in zip(HOTKEYS, labels):
+        print(f"  [{key}] {label}")
+
+    # Önizleme ve tuşlar ana thread'de; yakalama hızını etkilemez
+    while True:
+        frame = capture.latest_frame
+        if frame is not None:
+            view = cv2.flip(frame, 1)
+            st = capture.stats
+            label = labels[capture.current_label] if capture.current_label != NO_LABEL else "-"
+            lines = [
+                f"Etiket: {label}",
+                f"Kare: {st['frames_captured']}  Kamera atlama: {st['camera_gaps']}",
+                f"Landmark: {st['landmarks_written']}  Dusen: {st['landmarks_dropped']}",
+            ]
+            if args.jpeg:
+                lines.append(f"JPEG: {st['jpeg_written']}  Dusen: {st['jpeg_dropped']}")
+            for i, line in enumerate(lines):
+                cv2.putText(view, line, (10, 30 + 28 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+            cv2.imshow("Ando-Sign Veri Toplama", view)
+        key = cv2.waitKey(15) & 0xFF
+        if key == 27:
+            break
+        if key == ord(" "):
+            capture.set_label(NO_LABEL)
+        elif key != 0xFF and chr(key) in HOTKEYS[:len(labels)]:
+            capture.set_label(HOTKEYS.index(chr(key)))
+
+    summary = capture.stop()
+    cv2.destroyAllWindows()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ando-Sign etiketli veri toplama")
+    parser.add_argument("--labels", default=",".join(TURKISH_ALPHABET))
+    parser.add_argument("--camera", default="0")
+    parser.add_argument("--output", default=None, help="oturum klasörü (varsayılan: datasets/capture_<zaman>)")
+    parser.add_argument("--jpeg", action="store_true", help="ham kareleri JPEG olarak da kaydet")
+    parser.add_argument("--quality", type=int, default=90)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--fit", nargs="+", metavar="OTURUM", help="kayıtlardan harf şablonu çıkar")
+    parser.add_argument("--templates", default="letter_templates.npz")
+    args = parser.parse_args()
+
+    if args.fit:
+        fit_templates(args.fit, args.templates)
+    else:
+        run_capture(args)
+
+
+if __name__ == "__main__":
+    main()
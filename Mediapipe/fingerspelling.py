@@ -0,0 +1,244 @@
+# fingerspelling.py - Türk işaret dili parmak alfabesi: kare başına harf skorları + ışın araması ile kelime çözme
+
+"""
+Akış:
+    landmarks (21, 3) --letter_features--> özellik (60,)
+                      --TemplateClassifier--> harf log-olasılıkları (L + 1, son sütun = "boşluk")
+                      --FingerspellingDecoder.step--> anlık kısmi hipotez / biten kelime
+
+Şablon dosyası (.npz): labels (L,) str, templates (L, 60) float32
+(örneğin veri toplama kayıtlarından TemplateClassifier.fit ile üretilir).
+"""
+
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+TURKISH_ALPHABET = tuple("ABCÇDEFGĞHIİJKLMNOÖPRSŞTUÜVYZ")
+NEG_INF = -1e9
+
+
+def letter_features(landmarks: np.ndarray, hand_label: str = "Right") -> np.ndarray:
+    """Bileğe göre ötelenmiş, avuç boyuna göre ölçeklenmiş 20 nokta (60,)
+
+    Sol el x ekseninde aynalanır, böylece tek şablon iki el için de çalışır.
+    """
+    pts = np.asarray(landmarks, dtype=np.float32).reshape(21, 3)
+    rel = pts[1:] - pts[0]
+    scale = float(np.linalg.norm(rel[8, :2])) or 1.0   # bilek -> orta parmak kökü (9)
+    rel = rel / scale
+    if hand_label == "Left":
+        rel[:, 0] = -rel[:, 0]
+    return rel.reshape(-1)
+
+
+class TemplateClassifier:
+    """Harf şablonlarına uzaklıktan log-olasılık üreten en yakın-şablon sınıflandırıcı
+
+    Hiçbir şablona yeterince yakın olmayan karelerde "boşluk" sınıfı baskın çıkar.
+    """
+
+    def __init__(self, labels: Sequence[str], templates: np.ndarray, temperature: float = 0.05,
+                 blank_distance: float = 0.6):
+        self.labels = tuple(labels)
+        self.templates = np.asarray(templates, dtype=np.float32)
+        self.temperature = temperature
+        self.blank_distance = blank_distance
+        self._blank_logit = -blank_distance / temperature
+        self._no_hand = np.full(len(self.labels) + 1, NEG_INF, dtype=np.float32)
+        self._no_hand[-1] = 0.0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "TemplateClassifier":
+        data = np.load(path, allow_pickle=False)
+        return cls([str(l) for l in data["labels"]], data["templates"], **kwargs)
+
+    @classmethod
+    def fit(cls, features: np.ndarray, labels: Sequence[str], **kwargs) -> "TemplateClassifier":
+        """Etiketli özelliklerden sınıf ortalaması şablonları çıkar"""
+        features = np.asarray(features, dtype=np.float32)
+        labels = np.asarray(labels)
+        names = [l for l in TURKISH_ALPHABET if l in set(labels.tolist())]
+        names += sorted(set(labels.tolist()) - set(names))
+        templates = np.stack([features[labels == name].mean(axis=0) for name in names])
+        return cls(names, templates, **kwargs)
+
+    def save(self, path: str):
+        np.savez(path, labels=np.array(self.labels), templates=self.templates)
+
+    def log_probs(self, features: Optional[np.ndarray]) -> np.ndarray:
+        """(L + 1,) log-olasılık; el yoksa (features=None) kesin boşluk"""
+        if features is None:
+            return self._no_hand
+        d2 = np.mean((self.templates - features) ** 2, axis=1)
+        logits = np.empty(len(self.labels) + 1, dtype=np.float32)
+        logits[:-1] = -np.sqrt(d2) / self.temperature
+        logits[-1] = self._blank_logit
+        logits -= logits.max()
+        return logits - np.log(np.exp(logits).sum())
+
+
+class DecoderOutput(NamedTuple):
+    partial: str              # şu anki en iyi hipotez (bitmemiş kelime)
+    word: Optional[str]       # bu karede tamamlanan kelime (yoksa None)
+    elapsed_ms: float
+
+
+class FingerspellingDecoder:
+    """Harf süresi ve tekrar modelli, vektörel ışın araması (Viterbi yeniden birleştirme ile)
+
+    Durumlar: L harf + 1 boşluk. Her hipotez (önek, durum, süre, skor) taşır.
+      - Bir harf en az min_frames kare tutulmadan başka duruma geçilemez (titreme yutulur).
+      - Aynı harfin tekrarı ("LL") ya araya boşluk girerek ya da harfi uzun tutarak
+        modellenir: repeat_frames'ten sonra kalmanın kare başına hold_penalty bedeli
+        vardır, bu bedel repeat_penalty'yi aşınca yeni bir harf başlar.
+      - Boşluk word_gap kare sürerse en iyi önek kelime olarak yayınlanır ve ışın sıfırlanır.
+    Aynı (önek, durum, süre) anahtarlı adaylardan sadece en iyisi tutulur.
+    """
+
+    def __init__(self, labels: Sequence[str], beam_width: int = 16, min_frames: int = 4,
+                 repeat_frames: int = 18, word_gap: int = 12, switch_penalty: float = -2.0,
+                 repeat_penalty: float = -4.0, hold_penalty: float = -0.25, beam_threshold: float = 30.0):
+        self.labels = tuple(labels)
+        self.n_states = len(self.labels) + 1
+        self.blank = self.n_states - 1
+        self.beam_width = beam_width
+        self.min_frames = min_frames
+        self.repeat_frames = repeat_frames
+        self.word_gap = word_gap
+        self.switch_penalty = switch_penalty
+        self.repeat_penalty = repeat_penalty
+        self.hold_penalty = hold_penalty
+        self.beam_threshold = beam_threshold
+        # Süre sayacı bu değerde doyar (daha uzunu davranışı değiştirmez)
+        self.max_duration = max(repeat_frames, word_gap, min_frames)
+
+        # Önek ağacı: id -> (ebeveyn id, harf indeksi); 0 = boş önek
+        self._children: Dict[Tuple[int, int], int] = {}
+        self._nodes: List[Tuple[int, int]] = [(-1, -1)]
+        self._text_cache: Dict[int, str] = {0: ""}
+        # Ağaç bu boyu aşınca ışının artık kullanmadığı dallar budanır
+        self._prune_base = 8 * beam_width
+        self._prune_at = self._prune_base
+        self._state_ids = np.arange(self.n_states)
+        self.reset()
+
+    def reset(self):
+        self.prefix = np.zeros(1, dtype=np.int64)
+        self.state = np.full(1, self.blank, dtype=np.int64)
+        self.duration = np.zeros(1, dtype=np.int64)
+        self.score = np.zeros(1, dtype=np.float32)
+        self._children.clear()
+        del self._nodes[1:]
+        self._text_cache = {0: ""}
+        self._prune_at = self._prune_base
+
+    def _prune(self):
+        """Işındaki öneklerden ve atalarından başka düğümleri at, id'leri sıkıştır
+
+        Ebeveyn id'si her zaman çocuğundan küçüktür, bu yüzden sıralı tek geçiş yeter.
+        """
+        live = set()
+        for node in np.unique(self.prefix).tolist():
+            while node > 0 and node not in live:
+                live.add(node)
+                node = self._nodes[node][0]
+        remap = {0: 0}
+        nodes: List[Tuple[int, int]] = [(-1, -1)]
+        for old in sorted(live):
+            parent, letter = self._nodes[old]
+            remap[old] = len(nodes)
+            nodes.append((remap[parent], letter))
+        self._nodes = nodes
+        self._children = {key: node for node, key in enumerate(nodes) if node}
+        self._text_cache = {remap[k]: v for k, v in self._text_cache.items() if k in remap}
+        self.prefix = np.array([remap[p] for p in self.prefix.tolist()], dtype=np.int64)
+        # Eşiği canlı boyla büyüt: budama kare başına amortize sabit maliyet kalır
+        self._prune_at = max(self._prune_base, 2 * len(nodes))
+
+    def _child(self, prefix: int, letter: int) -> int:
+        key = (prefix, letter)
+        node = self._children.get(key)
+        if node is None:
+            node = len(self._nodes)
+            self._nodes.append(key)
+            self._children[key] = node
+        return node
+
+    def text(self, prefix: int) -> str:
+        cached = self._text_cache.get(prefix)
+        if cached is None:
+            parent, letter = self._nodes[prefix]
+            cached = self.text(parent) + self.labels[letter]
+            self._text_cache[prefix] = cached
+        return cached
+
+    def _hypothesis_text(self, i: int) -> str:
+        """Önek + (yeterince tutulduysa) şu anki harf"""
+        text = self.text(int(self.prefix[i]))
+        s = int(self.state[i])
+        if s != self.blank and self.duration[i] + 1 >= self.min_frames:
+            text += self.labels[s]
+        return text
+
+    def step(self, log_probs: np.ndarray) -> DecoderOutput:
+        """Bir karenin (L + 1,) log-olasılıklarıyla ışını ilerlet"""
+        t0 = time.perf_counter()
+        emit = np.asarray(log_probs, dtype=np.float32)
+        S, D = self.n_states, self.max_duration
+        state, dur, score, prefix = self.state, self.duration, self.score, self.prefix
+        is_letter = state != self.blank
+        held = dur + 1                        # bu duruma kadar tutulan kare sayısı
+
+        # 1) Aynı durumda kal
+        stay_score = score + emit[state] + np.where(is_letter & (held >= self.repeat_frames), self.hold_penalty, 0.0)
+        stay_dur = np.minimum(dur + 1, D - 1)
+
+        # 2) Başka duruma geç (B, S): harf min_frames tutulmadıysa geçiş yok
+        can_leave = ~is_letter | (held >= self.min_frames)
+        switch = score[:, None] + self.switch_penalty + emit[None, :]
+        same = state[:, None] == self._state_ids[None, :]
+        # Aynı harfe doğrudan geçiş = tekrar; sadece uzun tutuşta izinli
+        repeat_ok = is_letter & (held >= self.repeat_frames)
+        switch = np.where(same, np.where(repeat_ok[:, None], switch - self.switch_penalty + self.repeat_penalty,
+                                         NEG_INF), switch)
+        switch[~can_leave] = NEG_INF
+        # Harften çıkan hipotez o harfi öneke işler (ışın başına tek sözlük araması)
+        leave_prefix = np.array([self._child(int(p), int(s)) if l and c else int(p)
+                                 for p, s, l, c in zip(prefix, state, is_letter, can_leave)], dtype=np.int64)
+
+        B = len(score)
+        cand_score = np.concatenate([stay_score, switch.reshape(-1)])
+        cand_state = np.concatenate([state, np.tile(self._state_ids, B)])
+        cand_dur = np.concatenate([stay_dur, np.zeros(B * S, dtype=np.int64)])
+        cand_prefix = np.concatenate([prefix, np.repeat(leave_prefix, S)])
+
+        # Geçersiz ve eşik altı adayları at
+        best = cand_score.max()
+        keep = cand_score > best - self.beam_threshold
+        cand_score, cand_state, cand_dur, cand_prefix = (
+            cand_score[keep], cand_state[keep], cand_dur[keep], cand_prefix[keep])
+
+        # Viterbi yeniden birleştirme: aynı (önek, durum, süre) -> en iyi skor
+        key = (cand_prefix * S + cand_state) * D + cand_dur
+        order = np.lexsort((-cand_score, key))
+        _, first = np.unique(key[order], return_index=True)
+        idx = order[first]
+        if len(idx) > self.beam_width:
+            idx = idx[np.argpartition(-cand_score[idx], self.beam_width - 1)[:self.beam_width]]
+        idx = idx[np.argsort(-cand_score[idx])]
+
+        self.score = cand_score[idx] - cand_score[idx[0]]   # sayısal kayma olmasın
+        self.state, self.duration, self.prefix = cand_state[idx], cand_dur[idx], cand_prefix[idx]
+
+        # Uzun boşluk: kelime bitti
+        word = None
+        if (self.state[0] == self.blank and self.duration[0] + 1 >= self.word_gap
+                and self.prefix[0] != 0):
+            word = self.text(int(self.prefix[0]))
+            self.reset()
+        elif len(self._nodes) > self._prune_at:
+            self._prune()
+        partial = "" if word is not None else self._hypothesis_text(0)
+        return DecoderOutput(partial, word, (time.perf_counter() - t0) * 1000.0)
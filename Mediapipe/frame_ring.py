@@ -0,0 +1,116 @@
+# frame_ring.py - Süreçler arası paylaşımlı bellek kare halkası (tek yazar, çok okur)
+
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Başlık: [son yazılan seq, slot sayısı, yükseklik, genişlik, kanal]
+HEADER_FIELDS = 5
+WRITING = -1
+
+
+class FrameRing:
+    """multiprocessing.shared_memory üzerinde sıra numaralı kare halkası
+
+    Yakalama süreci kareleri doğrudan slotlara yazar; okuyucular NumPy
+    görünümleriyle kopyasız okur. Her slotun seq değeri, okuma bittikten
+    sonra kontrol edilerek yazarın üzerine yazdığı (yırtık) kareler atılır.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: Tuple[int, int, int], slots: int, owner: bool):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.owner = owner
+
+        buf = shm.buf
+        offset = 0
+        self._header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += HEADER_FIELDS * 8
+        self._slot_seq = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += slots * 8
+        self._slot_ts = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=offset)
+        offset += slots * 8
+        self._frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=buf, offset=offset)
+
+    @staticmethod
+    def nbytes(shape: Tuple[int, int, int], slots: int) -> int:
+        return HEADER_FIELDS * 8 + slots * 16 + slots * int(np.prod(shape))
+
+    @classmethod
+    def create(cls, shape: Tuple[int, int, int], slots: int = 6, name: Optional[str] = None) -> "FrameRing":
+        """Yeni halka oluştur (sahibi kapatırken siler)"""
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls.nbytes(shape, slots))
+        ring = cls(shm, shape, slots, owner=True)
+        ring._header[:] = (0, slots) + tuple(shape)
+        ring._slot_seq[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameRing":
+        """Var olan halkaya bağlan (worker süreçleri), boyutlar başlıktan okunur"""
+        # Worker'lar oluşturan sürecin çocukları: resource_tracker ortak, silme işi sahibinde
+        shm = shared_memory.SharedMemory(name=name)
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        slots, shape = int(header[1]), tuple(int(v) for v in header[2:])
+        del header
+        return cls(shm, shape, slots, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def write_seq(self) -> int:
+        return int(self._header[0])
+
+    # --- YAZAR ---
+    def begin_write(self) -> Tuple[int, np.ndarray]:
+        """Sıradaki slotu yazmaya aç, (seq, slot görünümü) döndür"""
+        seq = int(self._header[0]) + 1
+        slot = seq % self.slots
+        self._slot_seq[slot] = WRITING
+        return seq, self._frames[slot]
+
+    def commit(self, seq: int, timestamp: float):
+        """Yazılan slotu yayınla"""
+        slot = seq % self.slots
+        self._slot_ts[slot] = timestamp
+        self._slot_seq[slot] = seq
+        self._header[0] = seq
+
+    def write(self, frame: np.ndarray, timestamp: float) -> int:
+        seq, view = self.begin_write()
+        np.copyto(view, frame)
+        self.commit(seq, timestamp)
+        return seq
+
+    # --- OKUYUCU ---
+    def latest(self) -> Optional[Tuple[int, float, np.ndarray]]:
+        """En son tamamlanmış kare: (seq, zaman damgası, kopyasız görünüm)"""
+        seq = int(self._header[0])
+        if seq <= 0:
+            return None
+        slot = seq % self.slots
+        timestamp = float(self._slot_ts[slot])
+        if self._slot_seq[slot] != seq:
+            return None
+        return seq, timestamp, self._frames[slot]
+
+    def is_valid(self, seq: int) -> bool:
+        """Okunan slot hâlâ aynı kareyi mi tutuyor? (okuma bittikten sonra çağır)"""
+        return int(self._slot_seq[seq % self.slots]) == seq
+
+    def close(self):
+        # shm.close() dışa aktarılmış görünümler varken BufferError verir
+        self._header = self._slot_seq = self._slot_ts = self._frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
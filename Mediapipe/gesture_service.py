@@ -0,0 +1,223 @@
+# gesture_service.py - Yerel işaret olay servisi (WebSocket): JSON olaylar + ikili landmark akışı
+
+"""
+Abonelik: bağlandıktan sonra istemci isteğe bağlı olarak şunu gönderir:
+    {"subscribe": ["gestures", "landmarks"]}      (varsayılan: sadece "gestures")
+
+İşaret olayı (metin):
+    {"type": "gesture", "camera": 0, "hand": "Left", "gesture": "win (✌️)", "t": 1700000000.123}
+
+Landmark karesi (ikili, little-endian):
+    başlık (20 bayt) = magic "ASL1" | sürüm u8 | kamera u8 | el sayısı u8 | ayrılmış u8 | seq u32 | zaman f64
+    el sayısı bayt   = el yönü (0 = Left, 1 = Right)
+    veri             = float16 (el sayısı, 21, 3) normalize x, y, z
+"""
+
+import asyncio
+import json
+import struct
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import websockets
+
+LANDMARK_MAGIC = b"ASL1"
+LANDMARK_VERSION = 1
+LANDMARK_HEADER = struct.Struct("<4sBBBBId")
+HANDEDNESS_CODES = {"Left": 0, "Right": 1}
+
+TOPIC_GESTURES = "gestures"
+TOPIC_LANDMARKS = "landmarks"
+
+
+def encode_landmarks(camera: int, seq: int, timestamp: float, landmarks: np.ndarray,
+                     handedness: Sequence[str]) -> bytes:
+    """(H, 21, 3) landmark dizisini sabit başlıklı float16 ikili kareye paketle"""
+    count = len(handedness)
+    header = LANDMARK_HEADER.pack(LANDMARK_MAGIC, LANDMARK_VERSION, camera & 0xFF, count, 0,
+                                  seq & 0xFFFFFFFF, timestamp)
+    hands = bytes(HANDEDNESS_CODES.get(h, 255) for h in handedness)
+    return header + hands + np.asarray(landmarks, dtype="<f2").reshape(count, 21, 3).tobytes()
+
+
+def decode_landmarks(data: bytes) -> Tuple[int, int, float, np.ndarray, Tuple[int, ...]]:
+    """encode_landmarks tersi: (kamera, seq, zaman, landmarks, el yönleri)"""
+    magic, version, camera, count, _, seq, timestamp = LANDMARK_HEADER.unpack_from(data)
+    if magic != LANDMARK_MAGIC or version != LANDMARK_VERSION:
+        raise ValueError("Geçersiz landmark karesi")
+    offset = LANDMARK_HEADER.size
+    hands = tuple(data[offset:offset + count])
+    landmarks = np.frombuffer(data, dtype="<f2", count=count * 63, offset=offset + count).reshape(count, 21, 3)
+    return camera, seq, timestamp, landmarks, hands
+
+
+class _Subscriber:
+    """Abone başına sınırlı kuyruk: yavaş istemci sadece kendi mesajlarını kaybeder"""
+
+    def __init__(self, ws, queue_size: int):
+        self.ws = ws
+        self.topics: Set[str] = {TOPIC_GESTURES}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+
+class GestureEventService:
+    """Tanıma sonuçlarını diğer süreçlere yayınlayan yerel WebSocket servisi"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, queue_size: int = 64,
+                 debounce: float = 0.25):
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        # Bir işaret bu kadar süre sabit kalmadan yayınlanmaz
+        self.debounce = debounce
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._server = None
+        self._ready = threading.Event()
+        self._subscribers: Set[_Subscriber] = set()
+        self._landmark_subscribers = 0
+
+        # (kamera, el) -> [aday işaret, aday başlangıcı, son yayınlanan]
+        self._debounce_state: Dict[Tuple[int, str], list] = {}
+        self.stats = {"events_published": 0, "landmark_frames": 0, "messages_dropped": 0}
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def wants_landmarks(self) -> bool:
+        """Landmark aboneleri yoksa üretici taraf paketleme yapmasın"""
+        return self._landmark_subscribers > 0
+
+    def start(self):
+        """Servisi kendi event loop thread'inde başlat"""
+        if self.is_running:
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="gesture-service", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+        if self._server is None:
+            raise OSError(f"Servis başlatılamadı: {self.host}:{self.port}")
+
+    def stop(self):
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._shutdown)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # --- ÜRETİCİ (tanıma thread'i) ---
+    def update_gesture(self, hand: str, gesture: str, camera: int = 0, timestamp: Optional[float] = None):
+        """Her karede çağrılır; işaret debounce süresince sabit kalınca bir kez yayınlanır"""
+        now = timestamp or time.time()
+        key = (camera, hand)
+        state = self._debounce_state.get(key)
+        if state is None:
+            self._debounce_state[key] = [gesture, now, None]
+            return
+        if gesture != state[0]:
+            state[0], state[1] = gesture, now
+            return
+        if gesture != state[2] and gesture != "none" and now - state[1] >= self.debounce:
+            state[2] = gesture
+            self.publish_event({"type": "gesture", "camera": camera, "hand": hand,
+                                "gesture": gesture, "t": round(now, 3)})
+
+    def publish_event(self, event: Dict[str, Any]):
+        if not self._subscribers:
+            return
+        message = json.dumps(event, ensure_ascii=False)
+        self.stats["events_published"] += 1
+        self._dispatch(TOPIC_GESTURES, message)
+
+    def publish_landmarks(self, landmarks: np.ndarray, handedness: Sequence[str], seq: int,
+                          camera: int = 0, timestamp: Optional[float] = None):
+        """Kamera hızında ham landmark akışı (sadece abone varken paketlenir)"""
+        if not self.wants_landmarks:
+            return
+        frame = encode_landmarks(camera, seq, timestamp or time.time(), landmarks, handedness)
+        self.stats["landmark_frames"] += 1
+        self._dispatch(TOPIC_LANDMARKS, frame)
+
+    def _dispatch(self, topic: str, message):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._fanout, topic, message)
+
+    # --- EVENT LOOP ---
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self._server = self.loop.run_until_complete(self._start_server())
+        except OSError:
+            self._server = None
+            self.loop.close()
+            self.loop = None
+            self._ready.set()
+            return
+        self._ready.set()
+        self.loop.run_forever()
+        self.loop.close()
+        self.loop = None
+
+    async def _start_server(self):
+        return await websockets.serve(self._handler, self.host, self.port)
+
+    def _shutdown(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for sub in list(self._subscribers):
+            asyncio.ensure_future(sub.ws.close())
+        self.loop.call_later(0.2, self.loop.stop)
+
+    def _fanout(self, topic: str, message):
+        """Mesajı ilgili abonelerin kuyruklarına koy; dolu kuyrukta en eskisini at"""
+        for sub in self._subscribers:
+            if topic not in sub.topics:
+                continue
+            if sub.queue.full():
+                sub.queue.get_nowait()
+                sub.dropped += 1
+                self.stats["messages_dropped"] += 1
+            sub.queue.put_nowait(message)
+
+    async def _handler(self, ws):
+        sub = _Subscriber(ws, self.queue_size)
+        self._subscribers.add(sub)
+        sender = asyncio.ensure_future(self._sender(sub))
+        try:
+            async for raw in ws:
+                try:
+                    request = json.loads(raw)
+                except (TypeError, ValueError):
+                    continue
+                topics = request.get("subscribe") if isinstance(request, dict) else None
+                if isinstance(topics, list):
+                    self._set_topics(sub, {t for t in topics if t in (TOPIC_GESTURES, TOPIC_LANDMARKS)})
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            sender.cancel()
+            self._set_topics(sub, set())
+            self._subscribers.discard(sub)
+
+    def _set_topics(self, sub: _Subscriber, topics: Set[str]):
+        had = TOPIC_LANDMARKS in sub.topics
+        has = TOPIC_LANDMARKS in topics
+        self._landmark_subscribers += int(has) - int(had)
+        sub.topics = topics
+
+    async def _sender(self, sub: _Subscriber):
+        try:
+            while True:
+                message = await sub.queue.get()
+                await sub.ws.send(message)
+        except (websockets.exceptions.ConnectionClosed, asyncio.CancelledError):
+            pass
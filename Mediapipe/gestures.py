@@ -0,0 +1,41 @@
+# gestures.py - Parmak durumlarından işaret tanıma (GUI ve worker süreçleri ortak kullanır)
+
+# MediaPipe Parmak Uçları: Baş(4), İşaret(8), Orta(12), Yüzük(16), Serçe(20)
+TIPS = [4, 8, 12, 16, 20]
+
+# İşaret Eşleştirme (👊👌👍👎👇👆👉👈)
+GESTURE_MAP = {
+    (0, 0, 0, 0, 0): "Yumruk (👊)",
+    (1, 1, 1, 1, 1): "open palm (✋)",
+    (0, 1, 0, 0, 0): "POINTS (👆)",
+    (1, 0, 0, 0, 0): "cool (👍)",
+    (0, 1, 1, 0, 0): "win (✌️)",
+    (1, 1, 0, 0, 1): "okey  (👌)",
+    (0, 0, 0, 0, 1): "wants to speak. (☝️)"
+}
+
+
+def finger_states(hand_landmarks, hand_label):
+    """Beş parmağın açık(1)/kapalı(0) durumunu döndür"""
+    fingers = []
+
+    # 1. Baş Parmak Kontrolü (X ekseni)
+    # Sağ/Sol el aynalandığı için x koordinatı el etiketine göre kontrol edilir
+    if hand_label == "Right":
+        fingers.append(1 if hand_landmarks.landmark[TIPS[0]].x < hand_landmarks.landmark[TIPS[0] - 1].x else 0)
+    else:
+        fingers.append(1 if hand_landmarks.landmark[TIPS[0]].x > hand_landmarks.landmark[TIPS[0] - 1].x else 0)
+
+    # 2. Diğer 4 Parmak (Y ekseni - Yukarı/Aşağı)
+    for i in range(1, 5):
+        if hand_landmarks.landmark[TIPS[i]].y < hand_landmarks.landmark[TIPS[i] - 2].y:
+            fingers.append(1) # Açık
+        else:
+            fingers.append(0) # Kapalı
+
+    return tuple(fingers)
+
+
+def detect_gesture(hand_landmarks, hand_label):
+    """Landmark'lardan işaret adını bul, eşleşme yoksa "none" """
+    return GESTURE_MAP.get(finger_states(hand_landmarks, hand_label), "none")
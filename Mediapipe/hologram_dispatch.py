@@ -0,0 +1,335 @@
+# hologram_dispatch.py - Tanınan işaretleri doğrudan hologram cihazlarına komut olarak gönderir
+
+"""
+Eşleme dosyası (varsayılan: gesture_dispatch.json):
+    {
+      "devices_config": "../HologramBot/bot_config.json",   # "devices" + "shortcuts" buradan okunur
+      "port": 8080,
+      "min_interval_ms": 150,
+      "repeat_window_ms": 1500,
+      "gestures": {
+        "win (✌️)": "deneme1",          # kısayol adı   -> "model <url>"
+        "Yumruk (👊)": "stop_video",     # cihaz komutu  -> olduğu gibi
+        "open palm (✋)": "rpm 450"
+      }
+    }
+
+Cihaza giden çerçeve bot.py'deki send_command_to_device ile aynıdır: "<device_id> <komut>".
+Canlı avatar modunda aynı bağlantı üzerinden 30 Hz ikili poz kareleri de gider (bkz. pose_stream.py).
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import websockets
+
+from pose_stream import FLAG_KEYFRAME, PoseEncoder
+
+DEFAULT_PORT = 8080
+POSE_RATE = 30.0
+# Cihaz tarafında (holo.gd) anlamı olan komutlar
+DEVICE_COMMANDS = ("model", "rpm", "phase", "light", "reset", "video", "stop_video")
+LATENCY_TARGET_MS = 100.0
+
+
+def resolve_command(action: str, shortcuts: Dict[str, Any]) -> Optional[str]:
+    """Eşleme değerini cihaz komutuna çevir: kısayol, URL veya doğrudan komut"""
+    action = action.strip()
+    if not action:
+        return None
+    shortcut = shortcuts.get(action.lower())
+    if shortcut:
+        return f"model {shortcut['url']}"
+    if action.startswith(("http://", "https://")):
+        return f"model {action}"
+    if action.split(" ", 1)[0] in DEVICE_COMMANDS:
+        return action
+    return None
+
+
+def load_dispatch_config(path: str) -> Dict[str, Any]:
+    """Eşleme dosyasını oku; cihaz ve kısayolları devices_config'ten ekle"""
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    devices = dict(config.get("devices", {}))
+    shortcuts = dict(config.get("shortcuts", {}))
+    devices_config = config.get("devices_config")
+    if devices_config:
+        if not os.path.isabs(devices_config):
+            devices_config = os.path.join(os.path.dirname(os.path.abspath(path)), devices_config)
+        with open(devices_config, "r", encoding="utf-8") as f:
+            shared = json.load(f)
+        devices = {**shared.get("devices", {}), **devices}
+        shortcuts = {**shared.get("shortcuts", {}), **shortcuts}
+
+    commands = {}
+    for gesture, action in config.get("gestures", {}).items():
+        command = resolve_command(action, shortcuts)
+        if command is None:
+            raise ValueError(f"Bilinmeyen eşleme: {gesture} -> {action}")
+        commands[gesture] = command
+
+    config["devices"] = devices
+    config["shortcuts"] = shortcuts
+    config["commands"] = commands
+    return config
+
+
+class _DeviceLink:
+    """Cihaz başına kalıcı bağlantı + tek bekleyen komut (en yenisi kazanır)"""
+
+    def __init__(self, nickname: str, device_id: str, ip: str):
+        self.nickname = nickname
+        self.device_id = device_id
+        self.ip = ip
+        self.ws = None
+        self.wakeup = asyncio.Event()
+        self.pending: Optional[Tuple[str, float]] = None
+        self.last_command: Optional[str] = None
+        self.last_sent = 0.0
+        self.task: Optional[asyncio.Task] = None
+        self.prefix = (device_id + " ").encode("utf-8")
+        self.pose_wakeup = asyncio.Event()
+        self.pending_pose: Optional[Tuple[np.ndarray, Tuple[str, ...], float]] = None
+        self.pose_encoder = PoseEncoder()
+
+
+class HologramDispatcher:
+    """İşaret -> hologram komutu; kendi event loop thread'inde çalışır
+
+    Tanıma thread'i dispatch() ile sadece bir iş bırakır ve beklemez.
+    Titreşimin cihazı boğmaması için cihaz başına:
+      - birleştirme: gönderim beklerken gelen yeni komut eskisinin yerini alır,
+      - hız sınırı: iki gönderim arası en az min_interval,
+      - tekrar bastırma: son gönderilenle aynı komut repeat_window içinde yollanmaz.
+    Gecikme, kare yakalama anından komutun sokete yazılmasına kadar ölçülür.
+    """
+
+    def __init__(self, devices: Dict[str, Dict[str, Any]], commands: Dict[str, str],
+                 port: int = DEFAULT_PORT, min_interval: float = 0.15, repeat_window: float = 1.5,
+                 latency_window: int = 256, pose_rate: float = POSE_RATE):
+        self.devices = devices
+        self.commands = commands
+        self.port = port
+        self.min_interval = min_interval
+        self.repeat_window = repeat_window
+        self.pose_interval = 1.0 / pose_rate
+        # Canlı avatar modu: açıkken update_pose() kareleri cihazlara akıtılır
+        self.stream_poses = False
+        self._had_hands = False
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._links: Dict[str, _DeviceLink] = {}
+        # (kamera, el) -> son görülen işaret
+        self._last_gesture: Dict[Tuple[int, str], str] = {}
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+
+        self.stats = {
+            "dispatched": 0,
+            "sent": 0,
+            "coalesced": 0,
+            "suppressed": 0,
+            "send_errors": 0,
+            "over_target": 0,
+            "pose_frames": 0,
+            "pose_keyframes": 0,
+            "pose_bytes": 0,
+            "pose_coalesced": 0,
+        }
+
+    @classmethod
+    def from_config(cls, path: str) -> "HologramDispatcher":
+        config = load_dispatch_config(path)
+        return cls(config["devices"], config["commands"],
+                   port=config.get("port", DEFAULT_PORT),
+                   min_interval=config.get("min_interval_ms", 150) / 1000.0,
+                   repeat_window=config.get("repeat_window_ms", 1500) / 1000.0,
+                   pose_rate=config.get("pose_rate", POSE_RATE))
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="hologram-dispatch", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+
+    def stop(self):
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._shutdown)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # --- ÜRETİCİ (tanıma thread'i) ---
+    def update_gesture(self, hand: str, gesture: str, camera: int = 0, t_capture: Optional[float] = None):
+        """Her karede çağrılabilir; sadece işaret değişince ve eşlemesi varsa komut üretir"""
+        key = (camera, hand)
+        if self._last_gesture.get(key) == gesture:
+            return
+        self._last_gesture[key] = gesture
+        command = self.commands.get(gesture)
+        if command is not None:
+            self.dispatch(command, t_capture or time.time())
+
+    def dispatch(self, command: str, t_capture: float):
+        """Komutu tüm cihazlara bırak (bloklamaz)"""
+        if self.loop is None:
+            return
+        self.stats["dispatched"] += 1
+        self.loop.call_soon_threadsafe(self._enqueue, command, t_capture)
+
+    def update_pose(self, landmarks: np.ndarray, handedness: Sequence[str], t_capture: Optional[float] = None):
+        """Kamera hızında çağrılır; cihazlara en fazla pose_rate Hz ile en son poz gider"""
+        if not self.stream_poses or self.loop is None:
+            return
+        has_hands = len(handedness) > 0
+        # El kaybolunca tek bir boş kare gider (cihaz eli gizler), sonra susar
+        if not has_hands and not self._had_hands:
+            return
+        self._had_hands = has_hands
+        pose = (landmarks, tuple(handedness), t_capture or time.time())
+        self.loop.call_soon_threadsafe(self._enqueue_pose, pose)
+
+    def latency_summary(self) -> Dict[str, float]:
+        """Yakalama -> gönderim gecikmesi (ms): son, p50, p95, en kötü"""
+        if not self._latencies:
+            return {}
+        values = np.fromiter(self._latencies, dtype=np.float64)
+        p50, p95 = np.percentile(values, (50, 95))
+        return {"last": float(values[-1]), "p50": float(p50), "p95": float(p95), "max": float(values.max())}
+
+    def connected_devices(self) -> List[str]:
+        return [link.nickname for link in self._links.values() if link.ws is not None]
+
+    # --- EVENT LOOP ---
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        for nickname, info in self.devices.items():
+            link = _DeviceLink(nickname, info["device_id"], info["ip"])
+            link.task = self.loop.create_task(self._device_loop(link))
+            self._links[nickname] = link
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+        self.loop.close()
+        self.loop = None
+
+    def _shutdown(self):
+        for link in self._links.values():
+            if link.ws is not None:
+                asyncio.ensure_future(link.ws.close())
+        self.loop.call_later(0.2, self._cancel_and_stop)
+
+    def _cancel_and_stop(self):
+        for link in self._links.values():
+            if link.task is not None:
+                link.task.cancel()
+        self.loop.call_later(0.05, self.loop.stop)
+
+    def _enqueue(self, command: str, t_capture: float):
+        for link in self._links.values():
+            if link.pending is not None:
+                self.stats["coalesced"] += 1
+            link.pending = (command, t_capture)
+            link.wakeup.set()
+
+    def _enqueue_pose(self, pose):
+        for link in self._links.values():
+            if link.ws is None:
+                continue
+            if link.pending_pose is not None:
+                self.stats["pose_coalesced"] += 1
+            link.pending_pose = pose
+            link.pose_wakeup.set()
+
+    async def _device_loop(self, link: _DeviceLink):
+        """Bağlantıyı açık tut, bekleyen komutu hız sınırına uyarak gönder"""
+        uri = f"ws://{link.ip}:{self.port}/ws"
+        backoff = 1
+        try:
+            while True:
+                try:
+                    async with websockets.connect(uri, open_timeout=5) as ws:
+                        link.ws = ws
+                        backoff = 1
+                        # Yeni bağlantıda alıcının anahtar karesi yok
+                        link.pose_encoder.reset()
+                        pose_task = asyncio.ensure_future(self._send_poses(link, ws))
+                        try:
+                            await self._send_pending(link, ws)
+                        finally:
+                            pose_task.cancel()
+                except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException):
+                    self.stats["send_errors"] += 1
+                finally:
+                    link.ws = None
+                    link.pending_pose = None
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10)
+        except asyncio.CancelledError:
+            pass
+
+    async def _send_pending(self, link: _DeviceLink, ws):
+        while True:
+            await link.wakeup.wait()
+            # Hız sınırı: beklerken gelen komutlar pending'i günceller
+            wait = link.last_sent + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            link.wakeup.clear()
+            if link.pending is None:
+                continue
+            command, t_capture = link.pending
+            link.pending = None
+
+            now = time.monotonic()
+            if command == link.last_command and now - link.last_sent < self.repeat_window:
+                self.stats["suppressed"] += 1
+                continue
+
+            await ws.send(f"{link.device_id} {command}")
+            latency_ms = (time.time() - t_capture) * 1000.0
+            link.last_command, link.last_sent = command, time.monotonic()
+            self._latencies.append(latency_ms)
+            self.stats["sent"] += 1
+            if latency_ms > LATENCY_TARGET_MS:
+                self.stats["over_target"] += 1
+
+    async def _send_poses(self, link: _DeviceLink, ws):
+        """Canlı avatar akışı: pose_interval'da bir, sadece en son poz kodlanıp gönderilir"""
+        last_sent = 0.0
+        while True:
+            await link.pose_wakeup.wait()
+            wait = last_sent + self.pose_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            link.pose_wakeup.clear()
+            if link.pending_pose is None:
+                continue
+            landmarks, handedness, t_capture = link.pending_pose
+            link.pending_pose = None
+
+            frame = link.pose_encoder.encode(landmarks, handedness, t_capture)
+            try:
+                await ws.send(link.prefix + frame)
+            except websockets.exceptions.ConnectionClosed:
+                return
+            last_sent = time.monotonic()
+            self.stats["pose_frames"] += 1
+            self.stats["pose_bytes"] += len(frame)
+            if frame[4] & FLAG_KEYFRAME:
+                self.stats["pose_keyframes"] += 1
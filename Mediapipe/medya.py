@@ -1,13 +1,40 @@
 import customtkinter as ctk
 import cv2
 import threading
+import time
 from PIL import Image
 from customtkinter import CTkImage
 import mediapipe as mp
+import os
+from overlay import OverlayRenderer
+from gestures import detect_gesture
+from camera_workers import MultiCameraManager, EVENT_GESTURE, EVENT_ERROR
+from session_recorder import SessionRecorder
+from mjpeg_preview import MJPEGPreviewServer
+from gesture_service import GestureEventService
+from hologram_dispatch import HologramDispatcher
+from fingerspelling import FingerspellingDecoder, TemplateClassifier, letter_features
+import numpy as np
 
 # MediaPipe Konfigürasyonu
 mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
+
+# Headless kutularda çizimi tamamen kapatmak için: ANDO_OVERLAY=0
+OVERLAY_ENABLED = os.getenv("ANDO_OVERLAY", "1") != "0"
+
+# Uzaktan izleme (MJPEG): http://<kiosk>:8090/
+PREVIEW_HOST = os.getenv("ANDO_PREVIEW_HOST", "0.0.0.0")
+PREVIEW_PORT = int(os.getenv("ANDO_PREVIEW_PORT", "8090"))
+
+# Diğer süreçler için işaret olay servisi (WebSocket): ws://127.0.0.1:8765
+EVENT_HOST = os.getenv("ANDO_EVENT_HOST", "127.0.0.1")
+EVENT_PORT = int(os.getenv("ANDO_EVENT_PORT", "8765"))
+
+# Parmak alfabesi harf şablonları (bkz. fingerspelling.py)
+LETTER_TEMPLATES = os.getenv("ANDO_LETTER_TEMPLATES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "letter_templates.npz"))
+
+# İşaret -> hologram komutu eşlemesi (bkz. hologram_dispatch.py)
+DISPATCH_CONFIG = os.getenv("ANDO_DISPATCH_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "gesture_dispatch.json"))
 
 class AndoSignApp(ctk.CTk):
     def __init__(self):
@@ -19,6 +46,13 @@ class AndoSignApp(ctk.CTk):
         
         self.is_running = False
         self.cap = None
+        self.multi_cam = None
+        self.recorder = None
+        self.preview_server = MJPEGPreviewServer(PREVIEW_HOST, PREVIEW_PORT)
+        self.event_service = GestureEventService(EVENT_HOST, EVENT_PORT)
+        self.dispatcher = None
+        self.speller = None
+        self.frame_seq = 0
 
         # --- ARAYÜZ ---
         self.grid_columnconfigure(1, weight=1)
@@ -33,6 +67,63 @@ class AndoSignApp(ctk.CTk):
         self.btn_stop = ctk.CTkButton(self.sidebar, text="DURDUR", command=self.stop_camera, fg_color="#e74c3c", state="disabled")
         self.btn_stop.pack(pady=10, padx=10)
 
+        # --- OTURUM KAYDI ---
+        self.record_var = ctk.BooleanVar(value=False)
+        self.record_switch = ctk.CTkSwitch(self.sidebar, text="Oturumu Kaydet", variable=self.record_var, command=self.toggle_recording)
+        self.record_switch.pack(pady=10, padx=10)
+
+        # --- UZAKTAN İZLEME ---
+        self.remote_var = ctk.BooleanVar(value=False)
+        self.remote_switch = ctk.CTkSwitch(self.sidebar, text="Uzaktan İzleme", variable=self.remote_var, command=self.toggle_remote_preview)
+        self.remote_switch.pack(pady=10, padx=10)
+
+        # --- OLAY SERVİSİ ---
+        self.service_var = ctk.BooleanVar(value=False)
+        self.service_switch = ctk.CTkSwitch(self.sidebar, text="Olay Servisi", variable=self.service_var, command=self.toggle_event_service)
+        self.service_switch.pack(pady=10, padx=10)
+
+        # --- HOLOGRAM KOMUTLARI ---
+        self.dispatch_var = ctk.BooleanVar(value=False)
+        self.dispatch_switch = ctk.CTkSwitch(self.sidebar, text="Hologram Kontrolü", variable=self.dispatch_var, command=self.toggle_dispatch)
+        self.dispatch_switch.pack(pady=10, padx=10)
+        # Canlı avatar: GLB indirmek yerine el iskeleti 30 Hz akıtılır
+        self.pose_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(self.sidebar, text="Canlı El Akışı", variable=self.pose_var, command=self.toggle_pose_stream).pack(pady=2, padx=10)
+        self.dispatch_label = ctk.CTkLabel(self.sidebar, text="", justify="left", font=("Consolas", 11))
+        self.dispatch_label.pack(pady=2, padx=10)
+
+        # --- PARMAK ALFABESİ ---
+        self.spell_var = ctk.BooleanVar(value=False)
+        self.spell_switch = ctk.CTkSwitch(self.sidebar, text="Parmak Alfabesi", variable=self.spell_var, command=self.toggle_speller)
+        self.spell_switch.pack(pady=10, padx=10)
+        self.spell_label = ctk.CTkLabel(self.sidebar, text="", font=("Consolas", 16))
+        self.spell_label.pack(pady=2, padx=10)
+
+        # --- ÇOKLU KAMERA ---
+        # Virgülle ayrılmış kamera indeksleri, örn: "0,1,2" (tek kamera = eski mod)
+        ctk.CTkLabel(self.sidebar, text="Kameralar").pack(pady=(20, 5), padx=10)
+        self.camera_entry = ctk.CTkEntry(self.sidebar, width=150, placeholder_text="0,1,2")
+        self.camera_entry.insert(0, "0")
+        self.camera_entry.pack(pady=2, padx=10)
+
+        self.preview_camera = ctk.StringVar(value="0")
+        self.preview_menu = ctk.CTkOptionMenu(self.sidebar, values=["0"], variable=self.preview_camera, width=150)
+        self.preview_menu.pack(pady=2, padx=10)
+        self.cam_stats_label = ctk.CTkLabel(self.sidebar, text="", justify="left", font=("Consolas", 11))
+        self.cam_stats_label.pack(pady=5, padx=10)
+
+        # --- ÇİZİM KATMANLARI ---
+        self.overlay = OverlayRenderer(mp_hands.HAND_CONNECTIONS)
+        self.overlay.set_all(OVERLAY_ENABLED)
+
+        ctk.CTkLabel(self.sidebar, text="Çizim Katmanları").pack(pady=(20, 5), padx=10)
+        self.layer_vars = {}
+        for name, text in (("skeleton", "İskelet"), ("points", "Eklemler"), ("labels", "Etiketler")):
+            var = ctk.BooleanVar(value=self.overlay.layers[name])
+            ctk.CTkCheckBox(self.sidebar, text=text, variable=var,
+                            command=lambda n=name, v=var: self.overlay.set_layer(n, v.get())).pack(pady=2, padx=10, anchor="w")
+            self.layer_vars[name] = var
+
         self.video_label = ctk.CTkLabel(self, text="Kamera Bekleniyor...", fg_color="#1a1a1a", corner_radius=15)
         self.video_label.grid(row=0, column=1, padx=20, pady=20, sticky="nsew")
 
@@ -47,62 +138,221 @@ class AndoSignApp(ctk.CTk):
 
     # --- MANTIK MOTORU: İŞARET TANIMA ---
     def detect_gesture(self, hand_landmarks, hand_label):
-        # MediaPipe Parmak Uçları: Baş(4), İşaret(8), Orta(12), Yüzük(16), Serçe(20)
-        tips = [4, 8, 12, 16, 20]
-        fingers = []
-
-        # 1. Baş Parmak Kontrolü (X ekseni)
-        # Sağ/Sol el aynalandığı için x koordinatı el etiketine göre kontrol edilir
-        if hand_label == "Right":
-            fingers.append(1 if hand_landmarks.landmark[tips[0]].x < hand_landmarks.landmark[tips[0] - 1].x else 0)
+        # Kurallar gestures.py içinde (çoklu kamera worker'ları da aynısını kullanır)
+        return detect_gesture(hand_landmarks, hand_label)
+
+    def toggle_recording(self):
+        if self.record_var.get():
+            self.recorder = SessionRecorder()
+            self.recorder.start()
+            self.log(f"Kayıt başladı: {self.recorder.video_path}")
+        elif self.recorder:
+            recorder, self.recorder = self.recorder, None
+            stats = recorder.stop()
+            self.log(f"Kayıt bitti: {stats['frames_written']} kare yazıldı, {stats['frames_dropped']} kare düştü")
+
+    def toggle_remote_preview(self):
+        if self.remote_var.get():
+            try:
+                self.preview_server.start()
+                self.log(f"Önizleme yayını: http://{PREVIEW_HOST}:{PREVIEW_PORT}/")
+            except OSError as e:
+                self.remote_var.set(False)
+                self.log(f"Önizleme sunucusu başlatılamadı: {e}")
+        else:
+            self.preview_server.stop()
+            self.log("Önizleme yayını durduruldu")
+
+    def toggle_event_service(self):
+        if self.service_var.get():
+            try:
+                self.event_service.start()
+                self.log(f"Olay servisi: ws://{EVENT_HOST}:{EVENT_PORT}")
+            except OSError as e:
+                self.service_var.set(False)
+                self.log(f"Olay servisi başlatılamadı: {e}")
+        else:
+            self.event_service.stop()
+            self.log("Olay servisi durduruldu")
+
+    def toggle_speller(self):
+        if self.spell_var.get():
+            try:
+                classifier = TemplateClassifier.from_file(LETTER_TEMPLATES)
+            except (OSError, KeyError, ValueError) as e:
+                self.spell_var.set(False)
+                self.log(f"Harf şablonları yüklenemedi: {e}")
+                return
+            self.speller = (classifier, FingerspellingDecoder(classifier.labels))
+            self.log(f"Parmak alfabesi: {len(classifier.labels)} harf")
         else:
-            fingers.append(1 if hand_landmarks.landmark[tips[0]].x > hand_landmarks.landmark[tips[0] - 1].x else 0)
+            self.speller = None
+            self.spell_label.configure(text="")
+
+    def feed_speller(self, landmarks, hand_label):
+        # Her karede çağrılır (el yoksa landmarks=None): harf skorları -> ışın araması
+        speller = self.speller
+        if not speller:
+            return
+        classifier, decoder = speller
+        features = None if landmarks is None else letter_features(landmarks, hand_label)
+        out = decoder.step(classifier.log_probs(features))
+        if out.word:
+            self.after(0, lambda w=out.word: self.log(f"KELİME: {w}"))
+        self.after(0, lambda p=out.partial: self.spell_label.configure(text=p))
+
+    def toggle_dispatch(self):
+        if self.dispatch_var.get():
+            try:
+                self.dispatcher = HologramDispatcher.from_config(DISPATCH_CONFIG)
+            except (OSError, ValueError, KeyError) as e:
+                self.dispatch_var.set(False)
+                self.log(f"Hologram eşlemesi yüklenemedi: {e}")
+                return
+            self.dispatcher.stream_poses = self.pose_var.get()
+            self.dispatcher.start()
+            self.log(f"Hologram kontrolü: {len(self.dispatcher.commands)} işaret, {len(self.dispatcher.devices)} cihaz")
+            self.after(1000, self.update_dispatch_stats)
+        elif self.dispatcher:
+            dispatcher, self.dispatcher = self.dispatcher, None
+            dispatcher.stop()
+            self.dispatch_label.configure(text="")
+            self.log(f"Hologram kontrolü durduruldu: {dispatcher.stats['sent']} komut gönderildi")
+
+    def toggle_pose_stream(self):
+        if self.dispatcher:
+            self.dispatcher.stream_poses = self.pose_var.get()
+
+    def update_dispatch_stats(self):
+        dispatcher = self.dispatcher
+        if not dispatcher:
+            return
+        lat = dispatcher.latency_summary()
+        text = f"Bağlı: {len(dispatcher.connected_devices())}/{len(dispatcher.devices)}"
+        if lat:
+            text += f"\np50 {lat['p50']:5.1f} ms\np95 {lat['p95']:5.1f} ms"
+        if dispatcher.stream_poses:
+            st = dispatcher.stats
+            text += f"\nPoz: {st['pose_frames']} kare, {st['pose_bytes'] // max(st['pose_frames'], 1)} B/kare"
+        self.dispatch_label.configure(text=text)
+        self.after(1000, self.update_dispatch_stats)
 
-        # 2. Diğer 4 Parmak (Y ekseni - Yukarı/Aşağı)
-        for i in range(1, 5):
-            if hand_landmarks.landmark[tips[i]].y < hand_landmarks.landmark[tips[i] - 2].y:
-                fingers.append(1) # Açık
+    def on_hand_frame(self, camera, timestamp, hand_frame):
+        # Çoklu kamera: worker'dan gelen her karenin sonucu servise aktarılır
+        dispatcher = self.dispatcher
+        if dispatcher:
+            # Sıralama penceresini beklemeden: gecikme bütçesi yakalamadan itibaren sayılır
+            for hand_info, gesture in zip(hand_frame.handedness, hand_frame.gestures):
+                dispatcher.update_gesture(hand_info, gesture, camera, timestamp)
+            # Canlı el akışı önizlenen kameradan
+            if camera == int(self.preview_camera.get()):
+                dispatcher.update_pose(hand_frame.landmarks, hand_frame.handedness, timestamp)
+        if self.speller and camera == int(self.preview_camera.get()):
+            if len(hand_frame.handedness):
+                self.feed_speller(hand_frame.landmarks[0], hand_frame.handedness[0])
             else:
-                fingers.append(0) # Kapalı
-
-        # 3. İşaret Eşleştirme (👊👌👍👎👇👆👉👈)
-        gesture_map = {
-            (0, 0, 0, 0, 0): "Yumruk (👊)",
-            (1, 1, 1, 1, 1): "open palm (✋)",
-            (0, 1, 0, 0, 0): "POINTS (👆)",
-            (1, 0, 0, 0, 0): "cool (👍)",
-            (0, 1, 1, 0, 0): "win (✌️)",
-            (1, 1, 0, 0, 1): "okey  (👌)",
-            (0, 0, 0, 0, 1): "wants to speak. (☝️)"
-        }
-        
-        return gesture_map.get(tuple(fingers), "none")
+                self.feed_speller(None, "")
+        if not self.event_service.is_running:
+            return
+        for hand_info, gesture in zip(hand_frame.handedness, hand_frame.gestures):
+            self.event_service.update_gesture(hand_info, gesture, camera, timestamp)
+        if len(hand_frame.handedness):
+            self.event_service.publish_landmarks(hand_frame.landmarks, hand_frame.handedness,
+                                                 hand_frame.seq, camera, timestamp)
+
+    def parse_cameras(self):
+        cameras = []
+        for part in self.camera_entry.get().split(","):
+            part = part.strip()
+            if part:
+                cameras.append(int(part) if part.isdigit() else part)
+        return cameras or [0]
 
     def start_camera(self):
         if not self.is_running:
+            cameras = self.parse_cameras()
             self.is_running = True
-            self.cap = cv2.VideoCapture(0)
             self.btn_start.configure(state="disabled")
             self.btn_stop.configure(state="normal")
-            threading.Thread(target=self.video_loop, daemon=True).start()
+
+            if len(cameras) > 1:
+                # Her kamera: yakalama süreci -> paylaşımlı bellek halkası -> Hands süreci
+                self.multi_cam = MultiCameraManager(cameras)
+                self.multi_cam.landmark_callback = self.on_hand_frame
+                self.multi_cam.start()
+                self.preview_menu.configure(values=[str(i) for i in range(len(cameras))])
+                self.log(f"{len(cameras)} kamera başlatıldı: {cameras}")
+                self.after(30, self.poll_multi_camera)
+            else:
+                self.cap = cv2.VideoCapture(cameras[0])
+                threading.Thread(target=self.video_loop, daemon=True).start()
 
     def stop_camera(self):
         self.is_running = False
         if self.cap: self.cap.release()
+        if self.multi_cam:
+            self.multi_cam.stop()
+            self.multi_cam = None
+        if self.recorder:
+            # Kare gelmeyecek: kaydı kapat (mp4 sonlandırılır, özet loglanır)
+            self.record_var.set(False)
+            self.toggle_recording()
+        self.frame_seq = 0
         self.btn_start.configure(state="normal")
         self.btn_stop.configure(state="disabled")
 
+    def poll_multi_camera(self):
+        # Ana (Tk) thread'de çalışır, worker olaylarını zaman sırasıyla işler
+        if not self.is_running or not self.multi_cam:
+            return
+
+        for event in self.multi_cam.poll():
+            if event.kind == EVENT_GESTURE:
+                hand_info, gesture = event.payload
+                self.log(f"[Kamera {event.camera}] {hand_info} EL: {gesture}")
+                if self.recorder:
+                    self.recorder.log_gesture(gesture, hand_info, event.camera, event.timestamp)
+            elif event.kind == EVENT_ERROR:
+                self.log(f"[Kamera {event.camera}] HATA: {event.payload}")
+
+        lines = []
+        for camera, st in sorted(self.multi_cam.stats.items()):
+            lines.append(f"K{camera}: {st['fps']:4.1f}/{st['capture_fps']:4.1f} fps {st['latency_ms']:5.1f} ms")
+        self.cam_stats_label.configure(text="\n".join(lines))
+
+        camera = int(self.preview_camera.get())
+        frame = self.multi_cam.latest_preview(camera)
+        if frame is not None:
+            # Karenin kendisi halkadan okunur; worker'dan sadece landmark dizileri gelir
+            hand_frame = self.multi_cam.latest_hands.get(camera)
+            if hand_frame is not None and self.overlay.enabled:
+                colors = [(0, 255, 0) if h == "Left" else (255, 0, 0) for h in hand_frame.handedness]
+                labels = [(f"{h}: {g}", c) for h, g, c in zip(hand_frame.handedness, hand_frame.gestures, colors)]
+                self.overlay.draw(frame, list(hand_frame.landmarks[:, :, :2]), labels)
+            if self.recorder:
+                self.recorder.write_frame(frame)
+            self.preview_server.publish(frame)
+            img_pil = Image.fromarray(frame)
+            ctk_img = CTkImage(light_image=img_pil, dark_image=img_pil, size=(800, 500))
+            self.video_label.configure(image=ctk_img)
+            self.video_label.image = ctk_img
+
+        self.after(30, self.poll_multi_camera)
+
     def video_loop(self):
         with mp_hands.Hands(model_complexity=0, min_detection_confidence=0.7, min_tracking_confidence=0.7) as hands:
             while self.is_running:
                 ret, frame = self.cap.read()
                 if not ret: break
+                t_capture = time.time()
+                self.frame_seq += 1
 
                 frame = cv2.flip(frame, 1)
                 rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 results = hands.process(rgb_frame)
 
                 if results.multi_hand_landmarks:
+                    hand_arrays, hand_labels = [], []
                     for idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
                         hand_info = results.multi_handedness[idx].classification[0].label
                         
@@ -111,19 +361,56 @@ class AndoSignApp(ctk.CTk):
                         
                         # İŞARETİ TANI
                         gesture = self.detect_gesture(hand_landmarks, hand_info)
+                        if self.event_service.is_running:
+                            self.event_service.update_gesture(hand_info, gesture, timestamp=t_capture)
+                        dispatcher = self.dispatcher
+                        if dispatcher:
+                            dispatcher.update_gesture(hand_info, gesture, t_capture=t_capture)
                         
-                        # İskeleti Çiz
-                        mp_drawing.draw_landmarks(rgb_frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                        
-                        # Ekrana Yazdır
-                        h, w, _ = rgb_frame.shape
-                        cx, cy = int(hand_landmarks.landmark[0].x * w), int(hand_landmarks.landmark[0].y * h)
-                        cv2.putText(rgb_frame, f"{hand_info}: {gesture}", (cx, cy - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+                        # Çizim için topla (tüm eller tek seferde çizilir)
+                        if self.overlay.enabled:
+                            hand_arrays.append(OverlayRenderer.landmarks_to_array(hand_landmarks))
+                            hand_labels.append((f"{hand_info}: {gesture}", color))
 
                         # Log Paneline Sadece Değişim Olduğunda Yaz
                         if gesture != self.last_gesture and gesture != "none":
                             self.after(0, lambda g=gesture, h=hand_info: self.log(f"{h} EL: {g}"))
                             self.last_gesture = gesture
+                            recorder = self.recorder
+                            if recorder:
+                                recorder.log_gesture(gesture, hand_info)
+
+                    # İskelet + Etiketler
+                    self.overlay.draw(rgb_frame, hand_arrays, hand_labels)
+
+                    # Parmak alfabesi: ilk elin harf skorları
+                    if self.speller:
+                        first = results.multi_hand_landmarks[0]
+                        self.feed_speller(np.array([(lm.x, lm.y, lm.z) for lm in first.landmark], dtype=np.float32),
+                                          results.multi_handedness[0].classification[0].label)
+
+                    # Ham landmark akışı (sadece abone varsa paketlenir)
+                    dispatcher = self.dispatcher
+                    streaming = dispatcher is not None and dispatcher.stream_poses
+                    if self.event_service.wants_landmarks or streaming:
+                        landmarks = np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark]
+                                              for hand in results.multi_hand_landmarks], dtype=np.float32)
+                        handedness = [h.classification[0].label for h in results.multi_handedness]
+                        self.event_service.publish_landmarks(landmarks, handedness, self.frame_seq, timestamp=t_capture)
+                        if streaming:
+                            dispatcher.update_pose(landmarks, handedness, t_capture)
+                else:
+                    # El yok: cihazdaki avatar eli gizlensin, harf çözücü boşluk görsün
+                    if self.dispatcher:
+                        self.dispatcher.update_pose(np.zeros((0, 21, 3), dtype=np.float32), [], t_capture)
+                    self.feed_speller(None, "")
+
+                # Kayıt açıksa kuyruğa bırak (disk yavaşsa kare düşer, döngü beklemez)
+                recorder = self.recorder
+                if recorder:
+                    recorder.write_frame(rgb_frame)
+                # İzleyici yoksa maliyeti sıfır
+                self.preview_server.publish(rgb_frame)
 
                 img_pil = Image.fromarray(rgb_frame)
                 ctk_img = CTkImage(light_image=img_pil, dark_image=img_pil, size=(800, 500))
@@ -131,6 +418,12 @@ class AndoSignApp(ctk.CTk):
                 self.video_label.image = ctk_img
 
     def on_closing(self):
+        if self.recorder:
+            self.recorder.stop()
+        self.preview_server.stop()
+        self.event_service.stop()
+        if self.dispatcher:
+            self.dispatcher.stop()
         self.stop_camera()
         self.destroy()
 
@@ -0,0 +1,188 @@
+# mjpeg_preview.py - Uzaktan izleme için MJPEG önizleme sunucusu
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+import cv2
+
+BOUNDARY = "frame"
+
+INDEX_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Ando-Sign 3D Önizleme</title></head>
+<body style="background:#1a1a1a;margin:0;display:flex;justify-content:center;align-items:center;height:100vh">
+<img src="/stream" style="max-width:100%;max-height:100%">
+</body></html>
+"""
+
+
+class MJPEGPreviewServer:
+    """İşaretlenmiş kareleri MJPEG olarak yayınlayan küçük HTTP sunucusu
+
+    - İzleyici yoksa publish() hiçbir şey yapmaz (kodlama maliyeti sıfır).
+    - Her kare en fazla bir kez JPEG'e kodlanır, tüm izleyiciler aynı baytları alır.
+    - Kalite ve kare hızı izleyici sayısına göre düşürülür.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8090, quality: int = 80,
+                 max_fps: float = 15.0, min_quality: int = 40, min_fps: float = 5.0):
+        self.host = host
+        self.port = port
+        self.quality = quality
+        self.max_fps = max_fps
+        self.min_quality = min_quality
+        self.min_fps = min_fps
+
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._server_thread: Optional[threading.Thread] = None
+        self._encoder_thread: Optional[threading.Thread] = None
+        self._running = threading.Event()
+
+        self._lock = threading.Lock()
+        self._raw_ready = threading.Event()
+        self._raw_frame = None
+        self._jpeg_cond = threading.Condition()
+        self._jpeg: Optional[bytes] = None
+        self._jpeg_seq = 0
+        self._viewers = 0
+
+        self.stats = {"frames_encoded": 0, "frames_published": 0, "bytes_sent": 0}
+
+    @property
+    def viewer_count(self) -> int:
+        return self._viewers
+
+    @property
+    def is_running(self) -> bool:
+        return self._running.is_set()
+
+    def start(self):
+        if self.is_running:
+            return
+        handler = type("PreviewHandler", (_PreviewHandler,), {"preview": self})
+        self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self._httpd.daemon_threads = True
+        self._running.set()
+        self._server_thread = threading.Thread(target=self._httpd.serve_forever, name="mjpeg-http", daemon=True)
+        self._server_thread.start()
+        self._encoder_thread = threading.Thread(target=self._encode_loop, name="mjpeg-encoder", daemon=True)
+        self._encoder_thread.start()
+
+    def stop(self):
+        self._running.clear()
+        self._raw_ready.set()
+        with self._jpeg_cond:
+            self._jpeg_cond.notify_all()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def publish(self, frame_rgb):
+        """Tanıma döngüsünden son kareyi bildir (kopyalamaz, kodlamaz)"""
+        if not self._viewers:
+            return
+        with self._lock:
+            self._raw_frame = frame_rgb
+        self._raw_ready.set()
+        self.stats["frames_published"] += 1
+
+    def current_settings(self) -> Tuple[int, float]:
+        """İzleyici sayısına göre (JPEG kalitesi, kare hızı)"""
+        extra = max(self._viewers - 1, 0)
+        quality = max(self.min_quality, self.quality - 10 * extra)
+        fps = max(self.min_fps, self.max_fps / (1.0 + 0.5 * extra))
+        return quality, fps
+
+    # --- KODLAYICI THREAD ---
+    def _encode_loop(self):
+        last_encode = 0.0
+        while self._running.is_set():
+            if not self._raw_ready.wait(timeout=0.5):
+                continue
+            quality, fps = self.current_settings()
+            wait = 1.0 / fps - (time.monotonic() - last_encode)
+            if wait > 0:
+                time.sleep(wait)
+
+            self._raw_ready.clear()
+            with self._lock:
+                frame, self._raw_frame = self._raw_frame, None
+            if frame is None or not self._viewers:
+                continue
+
+            bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+            ok, buf = cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            last_encode = time.monotonic()
+            if not ok:
+                continue
+
+            with self._jpeg_cond:
+                self._jpeg = buf.tobytes()
+                self._jpeg_seq += 1
+                self._jpeg_cond.notify_all()
+            self.stats["frames_encoded"] += 1
+
+    def wait_for_jpeg(self, last_seq: int, timeout: float = 1.0) -> Tuple[int, Optional[bytes]]:
+        """last_seq'ten yeni bir JPEG gelene kadar bekle"""
+        with self._jpeg_cond:
+            self._jpeg_cond.wait_for(lambda: self._jpeg_seq != last_seq or not self._running.is_set(), timeout)
+            return self._jpeg_seq, self._jpeg
+
+    def _viewer_joined(self):
+        with self._lock:
+            self._viewers += 1
+
+    def _viewer_left(self):
+        with self._lock:
+            self._viewers -= 1
+            if not self._viewers:
+                # Son izleyici gitti: eski kareyi bırak
+                self._raw_frame = None
+                with self._jpeg_cond:
+                    self._jpeg = None
+
+
+class _PreviewHandler(BaseHTTPRequestHandler):
+    preview: MJPEGPreviewServer = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path in ("/", "/index.html"):
+            body = INDEX_HTML.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/stream":
+            self._stream()
+        else:
+            self.send_error(404)
+
+    def _stream(self):
+        preview = self.preview
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        preview._viewer_joined()
+        seq = 0
+        try:
+            while preview.is_running:
+                seq, jpeg = preview.wait_for_jpeg(seq)
+                if jpeg is None:
+                    continue
+                header = f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n"
+                self.wfile.write(header.encode("ascii"))
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+                preview.stats["bytes_sent"] += len(jpeg)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            preview._viewer_left()
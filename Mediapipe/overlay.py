@@ -0,0 +1,117 @@
+# overlay.py - Toplu iskelet/etiket çizimi (draw_landmarks yerine)
+
+import cv2
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# mp_drawing varsayılanlarına yakın renkler (RGB kare üzerine çiziliyor)
+CONNECTION_COLOR = (224, 224, 224)
+POINT_COLOR = (0, 0, 255)
+
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_SCALE = 0.7
+LABEL_THICKNESS = 2
+
+
+class OverlayRenderer:
+    """Tüm ellerin iskeletini ve etiketlerini tek geçişte çizen katman"""
+
+    LAYERS = ("skeleton", "points", "labels")
+
+    def __init__(self, connections: Iterable[Tuple[int, int]], skeleton: bool = True,
+                 points: bool = True, labels: bool = True, max_sprites: int = 64):
+        # Bağlantı listesi bir kez (C, 2) indeks dizisine çevrilir
+        self.connections = np.array(sorted(connections), dtype=np.intp)
+        self.layers: Dict[str, bool] = {"skeleton": skeleton, "points": points, "labels": labels}
+        self.max_sprites = max_sprites
+        self._sprites: Dict[Tuple[str, Tuple[int, int, int]], Tuple[np.ndarray, np.ndarray, int]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """En az bir katman açık mı?"""
+        return any(self.layers.values())
+
+    def set_layer(self, name: str, enabled: bool):
+        """Bir katmanı aç/kapat"""
+        if name not in self.layers:
+            raise ValueError(f"Bilinmeyen katman: {name}")
+        self.layers[name] = bool(enabled)
+
+    def set_all(self, enabled: bool):
+        """Tüm katmanları aç/kapat (headless kutular için)"""
+        for name in self.layers:
+            self.layers[name] = bool(enabled)
+
+    @staticmethod
+    def landmarks_to_array(hand_landmarks) -> np.ndarray:
+        """MediaPipe landmark listesini (21, 2) normalize diziye çevir"""
+        return np.array([(lm.x, lm.y) for lm in hand_landmarks.landmark], dtype=np.float32)
+
+    def draw(self, frame: np.ndarray, hands: List[np.ndarray],
+             labels: Optional[List[Tuple[str, Tuple[int, int, int]]]] = None) -> np.ndarray:
+        """Tüm elleri kareye çiz
+
+        hands: her el için (21, 2) normalize koordinat dizisi
+        labels: her el için (metin, renk) ya da None
+        """
+        if not hands or not self.enabled:
+            return frame
+
+        h, w = frame.shape[:2]
+        # (H, 21, 2) normalize -> piksel, tek seferde
+        pts = np.rint(np.stack(hands) * (w, h)).astype(np.int32)
+
+        if self.layers["skeleton"] and len(self.connections):
+            # (H, C, 2, 2) -> (H*C, 2, 2): tüm bağlantılar tek polylines çağrısında
+            segments = np.ascontiguousarray(pts[:, self.connections].reshape(-1, 2, 2))
+            cv2.polylines(frame, segments, False, CONNECTION_COLOR, 2)
+
+        if self.layers["points"]:
+            # Sıfır uzunluklu kalın çizgi = yuvarlak nokta
+            dots = np.repeat(pts.reshape(-1, 1, 2), 2, axis=1)
+            cv2.polylines(frame, dots, False, POINT_COLOR, 5)
+
+        if self.layers["labels"] and labels:
+            for hand_pts, label in zip(pts, labels):
+                if label is None:
+                    continue
+                text, color = label
+                cx, cy = hand_pts[0]
+                self._blit_label(frame, text, color, int(cx), int(cy) - 30)
+
+        return frame
+
+    def _get_sprite(self, text: str, color: Tuple[int, int, int]) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Etiket görüntüsünü önbellekten al, yoksa bir kez üret"""
+        key = (text, tuple(color))
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            return sprite
+
+        (tw, th), baseline = cv2.getTextSize(text, LABEL_FONT, LABEL_SCALE, LABEL_THICKNESS)
+        img = np.zeros((th + baseline, tw, 3), dtype=np.uint8)
+        cv2.putText(img, text, (0, th), LABEL_FONT, LABEL_SCALE, color, LABEL_THICKNESS)
+        mask = img.any(axis=2)
+        # th: putText (x, y) noktası yazının sol-alt köşesi, blit sırasında hizalamak için
+        sprite = (img, mask, th)
+
+        if len(self._sprites) >= self.max_sprites:
+            self._sprites.pop(next(iter(self._sprites)))
+        self._sprites[key] = sprite
+        return sprite
+
+    def _blit_label(self, frame: np.ndarray, text: str, color: Tuple[int, int, int], x: int, y: int):
+        """Önbellekteki etiketi maske ile kareye kopyala (kenarlarda kırpılır)"""
+        img, mask, th = self._get_sprite(text, color)
+        fh, fw = frame.shape[:2]
+        sh, sw = mask.shape
+
+        top, left = y - th, x
+        y0, x0 = max(top, 0), max(left, 0)
+        y1, x1 = min(top + sh, fh), min(left + sw, fw)
+        if y0 >= y1 or x0 >= x1:
+            return
+
+        sub_mask = mask[y0 - top:y1 - top, x0 - left:x1 - left]
+        roi = frame[y0:y1, x0:x1]
+        roi[sub_mask] = img[y0 - top:y1 - top, x0 - left:x1 - left][sub_mask]
@@ -0,0 +1,125 @@
+# pose_stream.py - Canlı avatar modu: 21 noktalı el iskeletinin 16 bit nicemlenmiş, anahtar kareye göre fark kodlaması
+
+"""
+Cihaza giden ikili WebSocket çerçevesi:  "<device_id> " + poz karesi
+(metin komutlarıyla aynı önek; cihaz kendi id'si ile başlamayanları yok sayar)
+
+Poz karesi (little-endian):
+    başlık (16 bayt) = magic "ASP1" | bayraklar u8 | el sayısı u8 | el yönü bitleri u8 | ayrılmış u8
+                       | seq u16 | anahtar kare seq u16 | zaman ms u32
+    veri             = bayraklara göre (el sayısı, 21, 3):
+        KEYFRAME  -> int16 nicemlenmiş koordinatlar
+        DELTA8    -> int8  fark (anahtar kareye göre)
+        (ikisi de yoksa) int16 fark (anahtar kareye göre)
+
+Nicemleme: q = round((v - ofset) * 32767), ofset = (0.5, 0.5, 0.0)
+    -> x, y için [-0.5, 1.5] aralığı, ~3e-5 çözünürlük.
+El yönü bitleri: i. bit 1 ise i. el "Right".
+İki el için anahtar kare 268, küçük hareketli fark karesi 142 bayttır.
+"""
+
+import struct
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+POSE_MAGIC = b"ASP1"
+POSE_HEADER = struct.Struct("<4sBBBBHHI")
+FLAG_KEYFRAME = 0x01
+FLAG_DELTA8 = 0x02
+
+QUANT_SCALE = 32767.0
+QUANT_OFFSET = np.array([0.5, 0.5, 0.0], dtype=np.float32)
+MAX_HANDS = 8
+
+
+def quantize(landmarks: np.ndarray) -> np.ndarray:
+    """(H, 21, 3) float -> int16"""
+    q = np.rint((np.asarray(landmarks, dtype=np.float32) - QUANT_OFFSET) * QUANT_SCALE)
+    return np.clip(q, -32767, 32767).astype(np.int16)
+
+
+def dequantize(q: np.ndarray) -> np.ndarray:
+    return q.astype(np.float32) / QUANT_SCALE + QUANT_OFFSET
+
+
+def handedness_bits(handedness: Sequence[str]) -> int:
+    bits = 0
+    for i, hand in enumerate(handedness):
+        if hand == "Right":
+            bits |= 1 << i
+    return bits
+
+
+class PoseEncoder:
+    """Tek bir alıcı (cihaz bağlantısı) için poz kodlayıcı
+
+    Fark kareleri bir önceki kareye değil anahtar kareye göre kodlanır:
+    arada bir kare atlanırsa (en yenisi kazanır) alıcı bozulmaz.
+    Anahtar kare; aralık dolunca, el sayısı/yönü değişince veya fark int16'ya
+    sığmayınca gönderilir. Yeni bağlantıda reset() ile anahtar kare zorlanır.
+    """
+
+    def __init__(self, keyframe_interval: int = 30):
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self._key: Optional[np.ndarray] = None
+        self._key_seq = 0
+        self._key_hands = 0
+
+    def reset(self):
+        self._key = None
+
+    def encode(self, landmarks: np.ndarray, handedness: Sequence[str], timestamp: float) -> bytes:
+        count = min(len(handedness), MAX_HANDS)
+        q = quantize(np.asarray(landmarks).reshape(-1, 21, 3)[:count])
+        hands = handedness_bits(handedness[:count])
+        self.seq = (self.seq + 1) & 0xFFFF
+
+        flags = 0
+        payload = None
+        key = self._key
+        if (key is not None and key.shape == q.shape and hands == self._key_hands
+                and (self.seq - self._key_seq) & 0xFFFF < self.keyframe_interval):
+            delta = q.astype(np.int32) - key
+            peak = int(np.abs(delta).max()) if delta.size else 0
+            if peak <= 127:
+                flags = FLAG_DELTA8
+                payload = delta.astype("<i1").tobytes()
+            elif peak <= 32767:
+                payload = delta.astype("<i2").tobytes()
+
+        if payload is None:
+            flags = FLAG_KEYFRAME
+            self._key, self._key_seq, self._key_hands = q.astype(np.int32), self.seq, hands
+            payload = q.astype("<i2").tobytes()
+
+        header = POSE_HEADER.pack(POSE_MAGIC, flags, count, hands, 0, self.seq, self._key_seq,
+                                  int(timestamp * 1000.0) & 0xFFFFFFFF)
+        return header + payload
+
+
+class PoseDecoder:
+    """PoseEncoder tersi (test ve Python istemcileri için)"""
+
+    def __init__(self):
+        self._key: Optional[np.ndarray] = None
+        self._key_seq = -1
+
+    def decode(self, data: bytes) -> Optional[Tuple[int, int, np.ndarray, Tuple[str, ...]]]:
+        """(seq, zaman ms, landmarks (H, 21, 3), el yönleri); anahtar karesi eksikse None"""
+        magic, flags, count, hands, _, seq, key_seq, t_ms = POSE_HEADER.unpack_from(data)
+        if magic != POSE_MAGIC:
+            raise ValueError("Geçersiz poz karesi")
+        offset = POSE_HEADER.size
+        values = count * 63
+        if flags & FLAG_KEYFRAME:
+            q = np.frombuffer(data, dtype="<i2", count=values, offset=offset).astype(np.int32)
+            self._key, self._key_seq = q, key_seq
+        else:
+            if self._key is None or self._key_seq != key_seq or self._key.size != values:
+                return None
+            dtype = "<i1" if flags & FLAG_DELTA8 else "<i2"
+            q = self._key + np.frombuffer(data, dtype=dtype, count=values, offset=offset)
+        handedness = tuple("Right" if hands >> i & 1 else "Left" for i in range(count))
+        return seq, t_ms, dequantize(q.reshape(count, 21, 3)), handedness
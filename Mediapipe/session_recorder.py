@@ -0,0 +1,137 @@
+# session_recorder.py - Oturum kaydı: işaretlenmiş kareler video dosyasına, işaret log'u yan dosyaya
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import cv2
+
+RECORDINGS_DIR = "recordings"
+
+
+class SessionRecorder:
+    """Kodlama ve disk yazımını arka plan thread'inde yapan oturum kaydedici
+
+    Tanıma döngüsü asla beklemez: kare kuyruğu doluysa (disk yavaş) kare
+    düşürülür ve sayılır. İşaret olayları küçük olduğu için ayrı, sınırsız
+    kuyruktan yazılır ve düşürülmez.
+    """
+
+    def __init__(self, base_path: Optional[str] = None, fps: float = 30.0,
+                 queue_size: int = 64, fourcc: str = "mp4v"):
+        if base_path is None:
+            os.makedirs(RECORDINGS_DIR, exist_ok=True)
+            base_path = os.path.join(RECORDINGS_DIR, datetime.now().strftime("session_%Y%m%d_%H%M%S"))
+        self.video_path = base_path + ".mp4"
+        self.log_path = base_path + ".jsonl"
+        self.fps = fps
+        self.fourcc = fourcc
+
+        self._frames: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._events: "queue.SimpleQueue[Dict[str, Any]]" = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._writer = None
+        self._frame_size = None
+
+        self.started_at: Optional[float] = None
+        self.stats = {
+            "frames_queued": 0,
+            "frames_written": 0,
+            "frames_dropped": 0,
+            "events_written": 0,
+        }
+
+    @property
+    def is_recording(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Yazıcı thread'ini başlat"""
+        if self.is_recording:
+            return
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> Dict[str, Any]:
+        """Kuyrukta kalanları yaz, dosyaları kapat ve istatistikleri döndür"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        return dict(self.stats)
+
+    def write_frame(self, frame_rgb) -> bool:
+        """İşaretlenmiş RGB kareyi kuyruğa koy (bloklamaz)
+
+        Kare referansla saklanır; çağıran taraf sonradan üzerine yazmamalı.
+        """
+        if not self.is_recording:
+            return False
+        try:
+            self._frames.put_nowait(frame_rgb)
+            self.stats["frames_queued"] += 1
+            return True
+        except queue.Full:
+            self.stats["frames_dropped"] += 1
+            return False
+
+    def log_gesture(self, gesture: str, hand: str = "", camera: Optional[int] = None,
+                    timestamp: Optional[float] = None):
+        """Yan dosyaya işaret olayı ekle"""
+        if not self.is_recording:
+            return
+        event = {"t": round(timestamp or time.time(), 3), "hand": hand, "gesture": gesture}
+        if camera is not None:
+            event["camera"] = camera
+        self._events.put(event)
+
+    # --- YAZICI THREAD ---
+    def _run(self):
+        with open(self.log_path, "w", encoding="utf-8") as log_file:
+            try:
+                while not (self._stop.is_set() and self._frames.empty()):
+                    try:
+                        frame = self._frames.get(timeout=0.1)
+                        self._write_video_frame(frame)
+                    except queue.Empty:
+                        pass
+                    self._flush_events(log_file)
+            finally:
+                self._flush_events(log_file)
+                summary = dict(self.stats, started_at=self.started_at, stopped_at=time.time(),
+                               video=os.path.basename(self.video_path))
+                log_file.write(json.dumps({"summary": summary}, ensure_ascii=False) + "\n")
+                if self._writer is not None:
+                    self._writer.release()
+                    self._writer = None
+
+    def _write_video_frame(self, frame_rgb):
+        h, w = frame_rgb.shape[:2]
+        if self._writer is None:
+            self._frame_size = (w, h)
+            self._writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*self.fourcc),
+                                           self.fps, self._frame_size)
+        elif (w, h) != self._frame_size:
+            frame_rgb = cv2.resize(frame_rgb, self._frame_size)
+        self._writer.write(cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR))
+        self.stats["frames_written"] += 1
+
+    def _flush_events(self, log_file):
+        wrote = False
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+            log_file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self.stats["events_written"] += 1
+            wrote = True
+        if wrote:
+            log_file.flush()
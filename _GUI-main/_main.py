@@ -12,13 +12,21 @@ import json
 import os
 import threading
 import socket
-import platform
-import subprocess
+import ipaddress
+import random
+import re
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 import logging
+import sys
 from pathlib import Path
 
+# Bot ile ortak cihaz katmanı: HologramBot/device_link.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "HologramBot"))
+from device_link import (BATCH_MAX_COMMANDS, RELAY_KEY, CommandQueue, DeliveryResult, DeviceState, RelayLink,
+                         send_commands)
+from protocol_v2 import PROTOCOL_VERSION, decode_acks, hello, parse_hello
+
 # Yeni kütüphaneler
 try:
     from deep_translator import GoogleTranslator
@@ -66,6 +74,16 @@ class HologramConfig:
             "reconnect_delay": 3,
             "heartbeat_interval": 5,
             "default_ip_range": "192.168.1",
+            "scan_concurrency": 256,
+            "scan_connect_timeout": 0.5,
+            "announce_port": 8089,
+            "ack_mode": False,
+            "ack_timeout": 2.0,
+            "pong_timeout": 2.0,
+            "max_missed_pongs": 3,
+            "relay_url": "",
+            "protocol_v2": False,
+            "batch_window_ms": 0,
             "translation_source": "auto",
             "translation_target": "tr",
             "mic_timeout": 5,
@@ -347,190 +365,255 @@ class TranslationModule:
             }
 
 
-class WebSocketManager:
-    """WebSocket bağlantı yöneticisi"""
+# ===== GİDEN KOMUT KUYRUĞU =====
+# Kuyruk kuralları, makbuzlar, gönderim ve röle bağlantısı HologramBot/device_link.py'de (bot.py ile ortak).
+# İkili protokol (v2) HologramBot/protocol_v2.py: bağlanınca "<id> HELLO 2" gönderilir,
+# cihaz "HELLO <id> 2" dönmezse metin protokolü sürer.
+
+class ConnectionHealth:
+    """Bir bağlantının PING/PONG durumu (okuyucu görev doldurur, heartbeat döngüsü okur)"""
     
-    def __init__(self, config: HologramConfig):
-        self.config = config
-        self.connections: Dict[str, websockets.WebSocketClientProtocol] = {}
-        self.connected: Dict[str, bool] = {}
-        self.tasks: Dict[str, asyncio.Task] = {}
-        self.loop: Optional[asyncio.AbstractEventLoop] = None
-        self.stats = {
-            "messages_sent": 0,
-            "devices_discovered": 0,
-            "uptime_start": datetime.now()
-        }
+    def __init__(self):
+        self.pong = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.ping_sent_at: Optional[float] = None
+        self.protocol = 1                        # HELLO cevabıyla anlaşılan sürüm
+        self.rtt_ms: Optional[float] = None
+        self.srtt_ms: Optional[float] = None
+        self.missed = 0
+        self.dead_connections = 0
+    
+    def reset(self):
+        self.pong = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.protocol = 1
+        self.ping_sent_at = None
+        self.missed = 0
+    
+    def on_pong(self):
+        if self.ping_sent_at is None:
+            return
+        self.rtt_ms = (asyncio.get_running_loop().time() - self.ping_sent_at) * 1000.0
+        self.srtt_ms = self.rtt_ms if self.srtt_ms is None else self.srtt_ms + (self.rtt_ms - self.srtt_ms) / 8
+        self.ping_sent_at = None
+        self.missed = 0
+        self.pong.set()
+    
+    def summary(self) -> str:
+        if self.rtt_ms is None:
+            return "RTT ölçülmedi"
+        text = f"RTT {self.rtt_ms:.0f} ms (ort. {self.srtt_ms:.0f})"
+        if self.missed:
+            text += f" · {self.missed} PONG kaçtı"
+        if self.protocol >= 2:
+            text += f" · protokol v{self.protocol}"
+        return text
+
+class GuiRelayLink(RelayLink):
+    """device_link.RelayLink'in GUI tarafı: ayarlar sözlüğü, yöneticinin tabloları ve backoff"""
     
-    def start_loop(self):
-        """Asyncio event loop'u başlat"""
-        def run_loop():
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
-            self.loop.run_forever()
-        
-        thread = threading.Thread(target=run_loop, daemon=True)
-        thread.start()
-        
-        import time
-        time.sleep(0.1)
+    def __init__(self, manager: "WebSocketManager"):
+        self.manager = manager
+        self.step = 0
+        super().__init__(manager.config.settings["relay_url"], manager.connected, manager.queues)
     
-    def run_coroutine(self, coro):
-        """Coroutine'i event loop'ta çalıştır"""
-        if self.loop:
-            return asyncio.run_coroutine_threadsafe(coro, self.loop)
-        return None
+    @property
+    def ack_mode(self) -> bool:
+        return self.manager.config.settings["ack_mode"]
     
-    async def scan_network(self, ip_range: str) -> List[Dict[str, Any]]:
-        """Ağdaki cihazları tara"""
-        logger.info(f"🔍 Network scan started: {ip_range}.x")
-        
-        async def ping_ip(i: int) -> Optional[str]:
-            ip = f"{ip_range}.{i}"
-            try:
-                param = '-n' if platform.system().lower() == 'windows' else '-c'
-                command = ['ping', param, '1', '-w', '100', ip]
-                result = await asyncio.create_subprocess_exec(
-                    *command,
-                    stdout=asyncio.subprocess.DEVNULL,
-                    stderr=asyncio.subprocess.DEVNULL
-                )
-                await asyncio.wait_for(result.wait(), timeout=1.0)
-                if result.returncode == 0:
-                    return ip
-            except (asyncio.TimeoutError, Exception):
-                pass
-            return None
-        
-        ping_tasks = [ping_ip(i) for i in range(1, 255)]
-        ping_results = await asyncio.gather(*ping_tasks)
-        active_ips = [ip for ip in ping_results if ip is not None]
-        
-        logger.info(f"📡 {len(active_ips)} aktif IP bulundu")
-        
-        ws_tasks = [self.check_device(ip) for ip in active_ips]
-        ws_results = await asyncio.gather(*ws_tasks)
-        found_devices = [device for device in ws_results if device["found"]]
-        
-        logger.info(f"✅ {len(found_devices)} hologram cihazı bulundu")
-        self.stats["devices_discovered"] += len(found_devices)
-        
-        return found_devices
+    @property
+    def batch_window(self) -> float:
+        return self.manager.config.settings["batch_window_ms"] / 1000.0
     
-    async def check_device(self, ip: str) -> Dict[str, Any]:
-        """Bir IP'de hologram cihazı olup olmadığını kontrol et"""
-        port = self.config.settings["default_port"]
-        try:
-            ws_url = f"ws://{ip}:{port}/ws"
-            async with asyncio.timeout(self.config.settings["scan_timeout"]):
-                ws = await websockets.connect(ws_url)
-                try:
-                    await ws.send("PING")
-                    async with asyncio.timeout(2):
-                        response = await ws.recv()
-                    
-                    await ws.send("GET_ID")
-                    try:
-                        async with asyncio.timeout(1):
-                            id_response = await ws.recv()
-                            device_id = id_response.strip()
-                    except asyncio.TimeoutError:
-                        device_id = f"DEVICE_{ip.replace('.', '_')}"
-                    
-                    await ws.close()
-                    return {"ip": ip, "device_id": device_id, "found": True}
-                except Exception as e:
-                    logger.debug(f"Device check failed for {ip}: {e}")
-                    await ws.close()
-                    return {"ip": ip, "found": False}
-        except Exception as e:
-            logger.debug(f"Connection failed for {ip}: {e}")
-            return {"ip": ip, "found": False}
+    @property
+    def heartbeat_interval(self) -> float:
+        return self.manager.config.settings["heartbeat_interval"]
     
-    async def connect_device(self, nickname: str):
-        """Bir cihaza bağlan ve heartbeat başlat"""
-        device_info = self.config.devices.get(nickname)
-        if not device_info:
-            return
-        
-        port = self.config.settings["default_port"]
-        device_id = device_info["device_id"]
-        websocket_url = f"ws://{device_info['ip']}:{port}/ws"
-        reconnect_delay = self.config.settings["reconnect_delay"]
-        max_reconnect_delay = 30
-        
-        while nickname in self.config.devices:
-            try:
-                async with websockets.connect(websocket_url, ping_interval=None) as ws:
-                    self.connections[nickname] = ws
-                    self.connected[nickname] = True
-                    reconnect_delay = self.config.settings["reconnect_delay"]
-                    
-                    logger.info(f"✅ [{nickname}] Bağlandı: {device_info['ip']}")
-                    
-                    try:
-                        while self.connected.get(nickname, False):
-                            await ws.send(f"PING {device_id}")
-                            logger.debug(f"[{nickname}] PING gönderildi")
-                            await asyncio.sleep(self.config.settings["heartbeat_interval"])
-                            
-                    except websockets.exceptions.ConnectionClosed:
-                        logger.warning(f"⚠️ [{nickname}] Bağlantı kapandı")
-                    except Exception as e:
-                        logger.error(f"❌ [{nickname}] Heartbeat hatası: {e}")
-                        
-            except Exception as e:
-                logger.error(f"❌ [{nickname}] Bağlantı hatası: {e}")
+    def devices(self) -> Dict[str, Dict[str, Any]]:
+        return self.manager.config.devices
+    
+    def enabled(self) -> bool:
+        return bool(self.manager.config.settings["relay_url"])
+    
+    def new_queue(self) -> CommandQueue:
+        return CommandQueue(ack_timeout=self.manager.config.settings["ack_timeout"])
+    
+    def device_online(self, nickname: str):
+        self.manager.resync_device(nickname, lambda command: self.put(nickname, command))
+    
+    async def connect(self):
+        settings = self.manager.config.settings
+        self.url = settings["relay_url"]
+        return await websockets.connect(
+            self.url, ping_interval=settings["heartbeat_interval"],
+            ping_timeout=settings["pong_timeout"] * settings["max_missed_pongs"], close_timeout=1
+        )
+    
+    async def wait_retry(self, uptime: Optional[float]):
+        """Full jitter; uzun süre ayakta kalan bağlantıdan sonra baştan"""
+        if uptime is not None and uptime >= 30:
+            self.step = 0
+        delay = random.uniform(0, min(30, self.manager.config.settings["reconnect_delay"] * 2 ** self.step))
+        self.step = min(self.step + 1, 16)
+        logger.info(f"🔄 Röleye {delay:.1f}s sonra yeniden bağlanılacak...")
+        await asyncio.sleep(delay)
+    
+    async def send_commands(self, ws, label: str, prefix: str, queue: CommandQueue,
+                            items: List[Tuple[str, asyncio.Future]], ack: bool,
+                            binary: bool = False) -> Tuple[int, Optional[Exception]]:
+        """Ortak gönderim (device_link.send_commands) + GUI istatistiği"""
+        sent, error = await send_commands(ws, label, prefix, queue, items, ack, binary)
+        self.stats["messages_sent"] += sent
+        return sent, error
+    
+    async def command_sender(self, nickname: str, ws, queue: CommandQueue, health: ConnectionHealth):
+        """Kuyruktaki komutları sırayla gönder; yavaş cihaz sadece kendi kuyruğunu bekletir
+        
+        Toplu gönderim açıksa (batch_window_ms > 0) ilk komuttan sonra pencere kadar
+        beklenir; "Tümünü Sıfırla" gibi art arda gelen komutlar tek çerçevede gider.
+        """
+        device_id = self.config.devices[nickname]["device_id"]
+        while True:
+            await queue.wakeup.wait()
+            info = self.config.devices.get(nickname, {})
+            window = self.config.settings["batch_window_ms"] / 1000.0
+            batching = window > 0 and info.get("batch", True)
+            if batching and len(queue) < BATCH_MAX_COMMANDS:
+                await asyncio.sleep(window)
+            items = queue.pop_batch(BATCH_MAX_COMMANDS if batching else 1)
+            if not items:
+                continue
+            _, error = await self.send_commands(ws, nickname, f"{device_id} ", queue, items,
+                                                info.get("ack", self.config.settings["ack_mode"]),
+                                                health.protocol >= 2)
+            if error is not None:
+                logger.error(f"❌ [{nickname}] Gönderme hatası: {error}")
                 self.connected[nickname] = False
-                
-                logger.info(f"🔄 [{nickname}] {reconnect_delay}s sonra yeniden bağlanılacak...")
-                await asyncio.sleep(reconnect_delay)
-                reconnect_delay = min(reconnect_delay * 2, max_reconnect_delay)
-        
+                return
+    
+    async def connection_reader(self, nickname: str, ws, queue: CommandQueue, health: ConnectionHealth):
+        """Cihazdan gelen her mesajı oku: ACK onayları, PONG (RTT) ve HELLO (protokol) eşleşir"""
+        device_id = self.config.devices[nickname]["device_id"]
+        try:
+            async for message in ws:
+                if not isinstance(message, str):
+                    for request_id in decode_acks(message, device_id):
+                        queue.acknowledge_request(request_id)
+                    continue
+                parts = message.split()
+                if not parts:
+                    continue
+                if parts[0] == "PONG" and (len(parts) == 1 or parts[1] == device_id):
+                    health.on_pong()
+                elif parts[0] == "ACK" and len(parts) >= 3 and parts[1] == device_id:
+                    # Toplu gönderimde cihaz birden fazla sıra numarasını tek mesajda onaylar
+                    for part in parts[2:]:
+                        if part.isdigit():
+                            queue.acknowledge(int(part))
+                elif parts[0] == "HELLO":
+                    reply = parse_hello(message)
+                    if reply is not None and reply[0] == device_id:
+                        health.protocol = min(reply[1], PROTOCOL_VERSION)
+                        logger.info(f"🔤 [{nickname}] Protokol v{health.protocol}")
+        except websockets.exceptions.ConnectionClosed:
+            pass
         self.connected[nickname] = False
-        if nickname in self.connections:
-            del self.connections[nickname]
-        logger.info(f"🔌 [{nickname}] Bağlantı sonlandırıldı")
+        health.closed.set()
+        health.pong.set()
     
-    async def send_command(self, nickname: str, command: str) -> bool:
-        """Bir cihaza komut gönder"""
+    def record_command(self, nickname: str, command: str, receipt: Optional[asyncio.Future]):
+        self.states.setdefault(nickname, DeviceState()).record(command, receipt)
+    
+    def resync_device(self, nickname: str, put):
+        """Yeniden bağlanan cihaza sadece farklı kalan alanları gönder"""
+        state = self.states.get(nickname)
+        commands = state.pending() if state is not None else []
+        if not commands:
+            return
+        state.resyncs += 1
+        state.replayed += len(commands)
+        logger.info(f"🔁 [{nickname}] Durum senkronlanıyor: {' · '.join(commands)}")
+        for command in commands:
+            state.record(command, put(command))
+    
+    async def send_command(self, nickname: str, command: str) -> Optional[asyncio.Future]:
+        """Bir cihazın kuyruğuna komut ekle; makbuzu döner (bağlı değilse None)
+        
+        Bağlı olmasa da istenen durum kaydedilir, bağlanınca gönderilir.
+        """
         device_info = self.config.devices.get(nickname)
         if not device_info:
-            return False
+            return None
+        
+        if self.config.settings["relay_url"]:
+            receipt = self.relay.put(nickname, command) if self.relay is not None else None
+            if receipt is None:
+                logger.warning(f"⚠️ [{nickname}] Röle üzerinden görünmüyor")
+            self.record_command(nickname, command, receipt)
+            return receipt
         
         ws = self.connections.get(nickname)
         if not ws or not self.connected.get(nickname, False):
             logger.warning(f"⚠️ [{nickname}] Bağlı değil")
-            return False
+            self.record_command(nickname, command, None)
+            return None
         
-        try:
-            message = f"{device_info['device_id']} {command}"
-            await ws.send(message)
-            logger.info(f"📤 [{nickname}] Komut gönderildi: {command}")
-            self.stats["messages_sent"] += 1
-            return True
-        except Exception as e:
-            logger.error(f"❌ [{nickname}] Gönderme hatası: {e}")
-            self.connected[nickname] = False
-            return False
+        receipt = self.queues[nickname].put(command)
+        self.record_command(nickname, command, receipt)
+        return receipt
     
-    async def send_command_all(self, command: str) -> tuple[int, int]:
-        """Tüm cihazlara komut gönder"""
-        if not self.config.devices:
-            return 0, 0
+    async def send_command_all(self, command: str) -> DeliveryResult:
+        """Tüm cihazlara komut gönder ve teslim sonuçlarını bekle"""
+        total = len(self.config.devices)
+        ack_default = self.config.settings["ack_mode"]
+        # Röle modunda herkese tek öneksiz mesaj (cihaz başına onay istenmiyorsa)
+        if self.relay is not None and self.config.settings["relay_url"] and \
+                not any(info.get("ack", ack_default) for info in self.config.devices.values()):
+            online = sum(1 for nickname in self.config.devices if self.connected.get(nickname, False))
+            receipt = self.relay.put_broadcast(command) if online else None
+            for nickname in self.config.devices:
+                # Yayını sadece çevrimiçi cihazlar alır; diğerleri bağlanınca senkronlanır
+                self.record_command(nickname, command, receipt if self.connected.get(nickname, False) else None)
+            if receipt is None:
+                return DeliveryResult(total, 0, 0, 0, 0, 0)
+            await asyncio.wait({receipt}, timeout=self.config.settings["ack_timeout"] + 1.0)
+            delivered = online if receipt.done() and receipt.result() == "sent" else 0
+            return DeliveryResult(total=total, queued=online, sent=delivered, acked=0,
+                                  unconfirmed=0, failed=online - delivered)
         
         tasks = []
         for nickname in self.config.devices.keys():
             tasks.append(self.send_command(nickname, command))
         
-        results = await asyncio.gather(*tasks)
-        success_count = sum(1 for r in results if r)
-        total_count = len(self.config.devices)
-        
-        return success_count, total_count
+        receipts = [r for r in await asyncio.gather(*tasks) if r is not None]
+        if receipts:
+            await asyncio.wait(receipts, timeout=self.config.settings["ack_timeout"] + 1.0)
+        outcomes = [r.result() if r.done() else "unconfirmed" for r in receipts]
+        
+        return DeliveryResult(
+            total=len(self.config.devices),
+            queued=len(receipts),
+            sent=outcomes.count("sent"),
+            acked=outcomes.count("acked"),
+            unconfirmed=outcomes.count("unconfirmed"),
+            failed=outcomes.count("dropped") + outcomes.count("error"),
+        )
+    
+    @staticmethod
+    def format_delivery(result: DeliveryResult) -> str:
+        """Teslim satırı; onaylı cihaz varsa onay/onaysız sayıları ayrıca"""
+        text = f"📡 Gönderildi: {result.sent + result.acked}/{result.total} cihaz"
+        if result.acked or result.unconfirmed:
+            text += f"\n✅ Onaylandı: {result.acked} · ⏳ Onaysız: {result.unconfirmed}"
+        if result.failed:
+            text += f"\n⚠️ İletilemedi: {result.failed}"
+        return text
     
     def connect_device_sync(self, nickname: str):
-        """Senkron şekilde cihaza bağlan"""
+        """Senkron şekilde cihaza bağlan (röle modunda tek röle bağlantısı yeterli)"""
+        if self.config.settings["relay_url"]:
+            self.start_relay()
+            return
         if self.loop:
             task = asyncio.run_coroutine_threadsafe(
                 self.connect_device(nickname), 
@@ -1302,7 +1385,7 @@ class HologramGUI:
             font=ctk.CTkFont(size=18, weight="bold")
         ).pack(anchor="w")
         
-        port = self.config.settings["default_port"]
+        port = self.ws_manager.device_port(info)
         ctk.CTkLabel(
             info_frame,
             text=f"📡 IP: {info['ip']}:{port}\n🆔 ID: {info['device_id']}\n📅 Eklenme: {info.get('added_at', 'Bilinmiyor')[:10]}",
@@ -1310,6 +1393,41 @@ class HologramGUI:
             justify="left"
         ).pack(anchor="w", pady=5)
         
+        health = self.ws_manager.health.get(nickname)
+        if health is not None:
+            ctk.CTkLabel(
+                info_frame,
+                text=f"📶 {health.summary()}",
+                font=ctk.CTkFont(size=11),
+                text_color="gray"
+            ).pack(anchor="w")
+        
+        state = self.ws_manager.states.get(nickname)
+        if state is not None and state.desired:
+            ctk.CTkLabel(
+                info_frame,
+                text=f"🎛️ {state.summary()}",
+                font=ctk.CTkFont(size=11),
+                text_color="gray"
+            ).pack(anchor="w")
+        
+        queue = self.ws_manager.queues.get(nickname)
+        if queue is not None and info.get("ack", self.config.settings["ack_mode"]):
+            q = queue.stats
+            ctk.CTkLabel(
+                info_frame,
+                text=f"✅ {q['acked']} onaylı · ⏳ {q['unacked']} onaysız · {queue.latency.summary()}",
+                font=ctk.CTkFont(size=11),
+                text_color="gray"
+            ).pack(anchor="w")
+        if queue is not None and queue.stats["frames"] < queue.stats["sent"]:
+            ctk.CTkLabel(
+                info_frame,
+                text=f"📦 {queue.stats['sent']} komut · {queue.stats['frames']} çerçeve",
+                font=ctk.CTkFont(size=11),
+                text_color="gray"
+            ).pack(anchor="w")
+
         btn_frame = ctk.CTkFrame(card)
         btn_frame.pack(side="right", padx=10, pady=10)
         
@@ -1360,7 +1478,7 @@ class HologramGUI:
         id_entry.pack(pady=5)
         
         ctk.CTkLabel(dialog, text="IP Adresi:").pack(pady=5)
-        ip_entry = ctk.CTkEntry(dialog, width=300, placeholder_text="örn: 192.168.1.100")
+        ip_entry = ctk.CTkEntry(dialog, width=300, placeholder_text="örn: 192.168.1.100 veya 192.168.1.100:8081")
         ip_entry.pack(pady=5)
         
         error_label = ctk.CTkLabel(dialog, text="", text_color="red")
@@ -1379,9 +1497,16 @@ class HologramGUI:
                 error_label.configure(text="❌ Bu takma ad zaten kullanılıyor!")
                 return
             
+            # Port verilmezse duyurulan port, o da yoksa varsayılan port
+            ip, _, port = ip.partition(":")
+            if port and not port.isdigit():
+                error_label.configure(text="❌ Geçersiz port!")
+                return
+            
             self.config.devices[nickname] = {
                 "device_id": device_id,
                 "ip": ip,
+                "port": int(port) if port else self.ws_manager.announced_port(ip),
                 "added_at": datetime.now().isoformat()
             }
             self.config.save_config()
@@ -1422,6 +1547,7 @@ class HologramGUI:
         
         def confirm():
             self.ws_manager.disconnect_device(nickname)
+            self.ws_manager.states.pop(nickname, None)
             del self.config.devices[nickname]
             self.config.save_config()
             self.refresh_devices_list()
@@ -1615,8 +1741,8 @@ class HologramGUI:
         
         def callback(fut):
             try:
-                success, total = fut.result()
-                self.log_command(f"✅ Komut: {command}\n📡 Gönderildi: {success}/{total} cihaz\n", log_panel)
+                result = fut.result()
+                self.log_command(f"✅ Komut: {command}\n{self.ws_manager.format_delivery(result)}\n", log_panel)
             except Exception as e:
                 self.log_command(f"❌ Hata: {e}\n", log_panel)
         
@@ -1807,8 +1933,8 @@ class HologramGUI:
         
         def callback(fut):
             try:
-                success, total = fut.result()
-                logger.info(f"✅ Kısayol '{keyword}' çalıştırıldı: {success}/{total}")
+                result = fut.result()
+                logger.info(f"✅ Kısayol '{keyword}' çalıştırıldı: {result.sent + result.acked}/{result.total}")
             except Exception as e:
                 logger.error(f"❌ Kısayol hatası: {e}")
         
@@ -1836,7 +1962,7 @@ class HologramGUI:
         settings_frame.grid(row=1, column=0, padx=20, pady=10, sticky="ew")
         
         ctk.CTkLabel(settings_frame, text="IP Aralığı:").pack(side="left", padx=10)
-        ip_range_entry = ctk.CTkEntry(settings_frame, width=200, placeholder_text="192.168.1")
+        ip_range_entry = ctk.CTkEntry(settings_frame, width=200, placeholder_text="192.168.1 / 10.0.0.0/22")
         ip_range_entry.insert(0, self.config.settings["default_ip_range"])
         ip_range_entry.pack(side="left", padx=10)
         
@@ -1849,6 +1975,14 @@ class HologramGUI:
         )
         scan_btn.pack(side="left", padx=10)
         
+        ctk.CTkButton(
+            settings_frame,
+            text="⚡ Hızlı Keşif",
+            command=lambda: self.start_scan(None, result_frame),
+            font=ctk.CTkFont(size=14),
+            width=130
+        ).pack(side="left", padx=10)
+        
         result_frame = ctk.CTkScrollableFrame(self.main_frame)
         result_frame.grid(row=2, column=0, padx=20, pady=10, sticky="nsew")
         self.main_frame.grid_rowconfigure(2, weight=1)
@@ -1860,14 +1994,15 @@ class HologramGUI:
             text_color="gray"
         ).pack(pady=50)
     
-    def start_scan(self, ip_range: str, result_frame):
-        """Ağ taramasını başlat"""
+    def start_scan(self, ip_range: Optional[str], result_frame):
+        """Ağ taramasını başlat (ip_range None = sadece pasif adaylar)"""
         for widget in result_frame.winfo_children():
             widget.destroy()
         
         loading = ctk.CTkLabel(
             result_frame,
-            text=f"🔍 {ip_range}.x ağı taranıyor...\nBu işlem birkaç dakika sürebilir.",
+            text=(f"🔍 {ip_range} taranıyor...\nBu işlem birkaç dakika sürebilir." if ip_range
+                  else "⚡ Duyuru yapan ve ARP tablosundaki cihazlar yoklanıyor..."),
             font=ctk.CTkFont(size=14)
         )
         loading.pack(pady=50)
@@ -1920,7 +2055,6 @@ class HologramGUI:
         info_frame = ctk.CTkFrame(card)
         info_frame.pack(side="left", fill="both", expand=True, padx=10, pady=10)
         
-        port = self.config.settings["default_port"]
         ctk.CTkLabel(
             info_frame,
             text=f"🌐 Cihaz Bulundu",
@@ -1929,7 +2063,7 @@ class HologramGUI:
         
         ctk.CTkLabel(
             info_frame,
-            text=f"📡 IP: {device['ip']}:{port}\n🆔 ID: {device['device_id']}",
+            text=f"📡 IP: {device['ip']}:{device['port']}\n🆔 ID: {device['device_id']}",
             font=ctk.CTkFont(size=12)
         ).pack(anchor="w", pady=5)
         
@@ -1943,6 +2077,7 @@ class HologramGUI:
             self.config.devices[nickname] = {
                 "device_id": device['device_id'],
                 "ip": device['ip'],
+                "port": device['port'],
                 "added_at": datetime.now().isoformat()
             }
             self.config.save_config()
@@ -2132,6 +2267,52 @@ class HologramGUI:
         
         ctk.CTkButton(ip_frame, text="💾 Kaydet", command=save_ip, width=80).pack(side="left", padx=5)
         
+        ack_frame = ctk.CTkFrame(network_frame)
+        ack_frame.pack(fill="x", padx=20, pady=5)
+        
+        ack_var = ctk.BooleanVar(value=self.config.settings["ack_mode"])
+        
+        def save_ack():
+            self.config.settings["ack_mode"] = ack_var.get()
+            self.config.save_settings()
+        
+        ctk.CTkSwitch(
+            ack_frame,
+            text="Onaylı gönderim (cihaz ACK döner, gecikme ölçülür)",
+            variable=ack_var,
+            command=save_ack
+        ).pack(side="left", padx=5)
+        
+        v2_var = ctk.BooleanVar(value=self.config.settings["protocol_v2"])
+        
+        def save_v2():
+            self.config.settings["protocol_v2"] = v2_var.get()
+            self.config.save_settings()
+        
+        ctk.CTkSwitch(
+            ack_frame,
+            text="İkili protokol v2 (yeni bağlantılarda)",
+            variable=v2_var,
+            command=save_v2
+        ).pack(side="left", padx=5)
+        
+        relay_frame = ctk.CTkFrame(network_frame)
+        relay_frame.pack(fill="x", padx=20, pady=5)
+        
+        ctk.CTkLabel(relay_frame, text="Röle Adresi (boş: doğrudan):").pack(side="left", padx=5)
+        relay_entry = ctk.CTkEntry(relay_frame, width=220, placeholder_text="ws://192.168.1.10:8080/ws")
+        relay_entry.insert(0, self.config.settings["relay_url"])
+        relay_entry.pack(side="left", padx=5)
+        
+        def save_relay():
+            self.config.settings["relay_url"] = relay_entry.get().strip()
+            self.config.save_settings()
+            self.ws_manager.stop_relay()
+            if self.config.settings["relay_url"]:
+                self.ws_manager.start_relay()
+        
+        ctk.CTkButton(relay_frame, text="💾 Kaydet", command=save_relay, width=80).pack(side="left", padx=5)
+        
         timeout_frame = ctk.CTkFrame(settings_frame)
         timeout_frame.pack(fill="x", padx=10, pady=10)
         
@@ -2179,6 +2360,20 @@ class HologramGUI:
         
         ctk.CTkButton(heartbeat_frame, text="💾 Kaydet", command=save_heartbeat, width=80).pack(side="left", padx=5)
         
+        batch_frame = ctk.CTkFrame(timeout_frame)
+        batch_frame.pack(fill="x", padx=20, pady=5)
+        
+        ctk.CTkLabel(batch_frame, text="Toplu Gönderim Penceresi (ms, 0: kapalı):").pack(side="left", padx=5)
+        batch_entry = ctk.CTkEntry(batch_frame, width=100)
+        batch_entry.insert(0, str(self.config.settings["batch_window_ms"]))
+        batch_entry.pack(side="left", padx=5)
+        
+        def save_batch():
+            self.config.settings["batch_window_ms"] = max(0.0, float(batch_entry.get()))
+            self.config.save_settings()
+        
+        ctk.CTkButton(batch_frame, text="💾 Kaydet", command=save_batch, width=80).pack(side="left", padx=5)
+        
         commands_frame = ctk.CTkFrame(settings_frame)
         commands_frame.pack(fill="x", padx=10, pady=10)
         
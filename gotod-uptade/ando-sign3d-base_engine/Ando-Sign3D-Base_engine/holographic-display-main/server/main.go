@@ -17,7 +17,13 @@ var upgrader = websocket.Upgrader{
 }
 
 var clients = make(map[*websocket.Conn]bool)
-var broadcast = make(chan []byte)
+var broadcast = make(chan frame)
+
+// frame keeps the websocket message type so binary pose frames stay binary
+type frame struct {
+	kind int
+	data []byte
+}
 
 type Message struct {
 	Username string `json:"username"`
@@ -80,14 +86,16 @@ func handleConnections(w http.ResponseWriter, r *http.Request) {
 	clients[conn] = true
 
 	for {
-		_, msg, err := conn.ReadMessage()
+		kind, msg, err := conn.ReadMessage()
 		if err != nil {
 			fmt.Println(err)
 			delete(clients, conn)
 			return
 		}
-		print(string(msg) + "\n")
-		broadcast <- msg
+		if kind == websocket.TextMessage {
+			print(string(msg) + "\n")
+		}
+		broadcast <- frame{kind, msg}
 	}
 }
 
@@ -96,7 +104,7 @@ func handleMessages() {
 		msg := <-broadcast
 
 		for client := range clients {
-			err := client.WriteMessage(websocket.TextMessage, msg)
+			err := client.WriteMessage(msg.kind, msg.data)
 			if err != nil {
 				fmt.Println(err)
 				client.Close()
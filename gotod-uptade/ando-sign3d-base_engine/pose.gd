@@ -0,0 +1,64 @@
+class_name HandPose
+extends Node
+
+# Canlı el akışı çözücü (Mediapipe/pose_stream.py ile aynı format)
+# hands_updated: [{"hand": "Left"/"Right", "points": PackedVector3Array(21)}, ...]
+# Noktalar MediaPipe'ın normalize koordinatlarıdır (x, y: 0..1, z: bilekten göreli derinlik)
+
+@export var ws: WS = null
+
+signal hands_updated(hands: Array)
+
+const MAGIC: String = "ASP1"
+const HEADER_SIZE: int = 16
+const FLAG_KEYFRAME: int = 1
+const FLAG_DELTA8: int = 2
+const QUANT_SCALE: float = 32767.0
+const QUANT_OFFSET: Vector3 = Vector3(0.5, 0.5, 0.0)
+
+var key: PackedInt32Array = PackedInt32Array()
+var key_seq: int = -1
+
+func _ready() -> void:
+	if ws != null:
+		ws.pose_received.connect(decode)
+
+func decode(data: PackedByteArray) -> void:
+	if data.size() < HEADER_SIZE or data.slice(0, 4).get_string_from_ascii() != MAGIC:
+		return
+	var flags: int = data.decode_u8(4)
+	var count: int = data.decode_u8(5)
+	var hand_bits: int = data.decode_u8(6)
+	var frame_key_seq: int = data.decode_u16(10)
+	var values: int = count * 63
+	var q: PackedInt32Array = PackedInt32Array()
+	q.resize(values)
+
+	if flags & FLAG_KEYFRAME:
+		if data.size() < HEADER_SIZE + values * 2:
+			return
+		for i in values:
+			q[i] = data.decode_s16(HEADER_SIZE + i * 2)
+		key = q
+		key_seq = frame_key_seq
+	else:
+		# Fark karesi: anahtar kare elimizde değilse bir sonrakini bekle
+		if key_seq != frame_key_seq or key.size() != values:
+			return
+		var delta8: bool = (flags & FLAG_DELTA8) != 0
+		var width: int = 1 if delta8 else 2
+		if data.size() < HEADER_SIZE + values * width:
+			return
+		for i in values:
+			var d: int = data.decode_s8(HEADER_SIZE + i) if delta8 else data.decode_s16(HEADER_SIZE + i * 2)
+			q[i] = key[i] + d
+
+	var hands: Array = []
+	for h in count:
+		var points: PackedVector3Array = PackedVector3Array()
+		points.resize(21)
+		for j in 21:
+			var base: int = (h * 21 + j) * 3
+			points[j] = Vector3(q[base], q[base + 1], q[base + 2]) / QUANT_SCALE + QUANT_OFFSET
+		hands.append({"hand": "Right" if (hand_bits >> h) & 1 else "Left", "points": points})
+	hands_updated.emit(hands)
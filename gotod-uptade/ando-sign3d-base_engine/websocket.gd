@@ -5,13 +5,33 @@ extends Node
 @export var config: Config = null 
 
 signal message_received(msg: String)
+# Canlı el akışı: "<id> " önekli ikili poz kareleri (bkz. pose.gd)
+signal pose_received(data: PackedByteArray)
 
 const heartbeatSeconds: int = 5
 
+# İkili komut protokolü v2 (bkz. HologramBot/protocol_v2.py): magic | opcode u8 | istek no u16 | parametre
+const PROTOCOL_VERSION: int = 2
+const V2_MAGIC: PackedByteArray = PackedByteArray([0x48, 0x43, 0x02])   # "HC\x02"
+const V2_HEADER: int = 6
+const V2_OP_ACK: int = 0x80
+const V2_OP_BATCH: int = 0x81
+# opcode -> [komut, parametre tipi] (f: float32, i: int32, s: u16 uzunluk + UTF-8)
+const V2_COMMANDS: Dictionary = {
+	0x01: ["+", ""], 0x02: ["-", ""], 0x03: ["reset", ""], 0x04: ["phase", "i"],
+	0x05: ["model", "s"], 0x06: ["rpm", "f"], 0x07: ["light", "f"],
+	0x08: ["video", "s"], 0x09: ["stop_video", ""],
+}
+
 var socket: WebSocketPeer = WebSocketPeer.new()
 var id: String = ""
 var heartbeat: SceneTreeTimer = null
+# Kendi heartbeat'imiz "PING <id> <n>": holoserv onu bize de yayınlar, sayaç sayesinde
+# kontrolcünün "PING <id>"siyle karışmaz ve kendimize PONG dönmeyiz
+var beat: int = 0
 var connected: bool = false
+# Röle (server-GUI/relay_server.py) cihazı bu kimliğe "REGISTER <id>" ile kaydeder
+var registered: bool = false
 
 func start(_id: String) -> void:
 	id = _id
@@ -34,8 +54,9 @@ func set_heartbeat_timer() -> void:
 	heartbeat.timeout.connect(on_heartbeat)
 
 func on_heartbeat() -> void:
-	print("PING " + id)
-	socket.send_text("PING " + id)
+	beat += 1
+	print("PING %s %d" % [id, beat])
+	socket.send_text("PING %s %d" % [id, beat])
 	set_heartbeat_timer()
 
 func _process(_delta: float) -> void:
@@ -46,17 +67,59 @@ func _process(_delta: float) -> void:
 	var state: WebSocketPeer.State = socket.get_ready_state()
 	
 	if state == WebSocketPeer.STATE_OPEN:
+		if not registered:
+			socket.send_text("REGISTER " + id)
+			registered = true
 		while socket.get_available_packet_count():
-			var message: String = socket.get_packet().get_string_from_utf8()
+			var packet: PackedByteArray = socket.get_packet()
+			if not socket.was_string_packet():
+				# İkili mesajlar "<id> " önekini taşır (sunucu diğer ekranlarınkini de yayınlar);
+				# önekten sonra v2 magic'i varsa komut, yoksa poz karesi
+				var prefix: PackedByteArray = (id + " ").to_utf8_buffer()
+				if packet.slice(0, prefix.size()) != prefix:
+					continue
+				var payload: PackedByteArray = packet.slice(prefix.size())
+				if payload.size() >= V2_HEADER and payload.slice(0, 3) == V2_MAGIC:
+					handle_v2_frame(payload)
+				else:
+					pose_received.emit(payload)
+				continue
+			
+			var message: String = packet.get_string_from_utf8()
 			print("Got data from server: ", message)
 			
-			# Herhangi bir mesaja cevap ver (pong)
-			if message.begins_with("PING"):
-				socket.send_text("PONG")
+			# PING'e cevap ver; kimlikli PONG, bot tarafında RTT eşleştirmesi için.
+			# Röle diğer cihazların ve kendi heartbeat'imizi ("PING <id> <n>") de yayınlar:
+			# sadece kontrolcünün "PING" / "PING <id>"sini yanıtla
+			if message == "PING" or message == "PING " + id:
+				socket.send_text("PONG " + id)
+				continue
+			
+			# Protokol anlaşması: "<id> HELLO <sürüm>" -> desteklenen en yüksek ortak sürüm
+			if message.begins_with(id + " HELLO "):
+				var version: int = mini(int(message.get_slice(" ", 2)), PROTOCOL_VERSION)
+				socket.send_text("HELLO %s %d" % [id, version])
+				continue
 			
 			if message.begins_with(id + " "):
 				var content: String = message.substr(id.length() + 1)
-				message_received.emit(content)
+				# Toplu gönderim: "<id> BATCH <adet>\n<satır>\n..." -> her satır ayrı komut
+				var lines: PackedStringArray = PackedStringArray([content])
+				if content.begins_with("BATCH "):
+					lines = content.split("\n")
+					lines.remove_at(0)
+				# Onaylı mod: "#<seq> <komut>" -> komutlar uygulanır, sonra tek "ACK <id> <seq>..."
+				var seqs: PackedStringArray = PackedStringArray()
+				for line in lines:
+					var command: String = line
+					if command.begins_with("#"):
+						var space: int = command.find(" ")
+						if space > 1:
+							seqs.append(command.substr(1, space - 1))
+							command = command.substr(space + 1)
+					message_received.emit(command)
+				if not seqs.is_empty():
+					socket.send_text("ACK %s %s" % [id, " ".join(seqs)])
 			else:
 				message_received.emit(message)
 	
@@ -67,4 +130,46 @@ func _process(_delta: float) -> void:
 		var code: int = socket.get_close_code()
 		print("WebSocket closed with code: %d. Clean: %s" % [code, code != -1])
 		connected = false
+		registered = false
 		connectws()
+
+# v2 mesajı (tek çerçeve veya toplu); istek no'lu komutların ACK'leri tek mesajda,
+# "<id> " önekiyle döner (kontrolcü başka ekranın ACK'ini kendi komutuna saymasın)
+func handle_v2_frame(packet: PackedByteArray) -> void:
+	var acks: PackedByteArray = PackedByteArray()
+	if packet.decode_u8(3) == V2_OP_BATCH:
+		var offset: int = V2_HEADER
+		for i in packet.decode_u16(4):
+			var length: int = packet.decode_u16(offset)
+			acks.append_array(apply_v2_command(packet.slice(offset + 2, offset + 2 + length)))
+			offset += 2 + length
+	else:
+		acks = apply_v2_command(packet)
+	if not acks.is_empty():
+		var reply: PackedByteArray = (id + " ").to_utf8_buffer()
+		reply.append_array(acks)
+		socket.send(reply)
+
+# v2 çerçevesini metin komutuna çevirip aynı yoldan uygula; istek no varsa ACK çerçevesini döner
+func apply_v2_command(packet: PackedByteArray) -> PackedByteArray:
+	var ack: PackedByteArray = PackedByteArray()
+	var opcode: int = packet.decode_u8(3)
+	var request_id: int = packet.decode_u16(4)
+	if not V2_COMMANDS.has(opcode):
+		return ack
+	var command: String = V2_COMMANDS[opcode][0]
+	match V2_COMMANDS[opcode][1]:
+		"f":
+			command += " " + str(packet.decode_float(V2_HEADER))
+		"i":
+			command += " " + str(packet.decode_s32(V2_HEADER))
+		"s":
+			var length: int = packet.decode_u16(V2_HEADER)
+			command += " " + packet.slice(V2_HEADER + 2, V2_HEADER + 2 + length).get_string_from_utf8()
+	message_received.emit(command)
+	if request_id != 0:
+		ack = V2_MAGIC.duplicate()
+		ack.resize(V2_HEADER)
+		ack.encode_u8(3, V2_OP_ACK)
+		ack.encode_u16(4, request_id)
+	return ack
@@ -0,0 +1,397 @@
+# relay_server.py - holoserv (server/main.go) yerine Python/asyncio röle sunucusu
+
+"""
+Kullanım:
+    python relay_server.py                                  # :8080, klasördeki index.html ve 3d/
+    python relay_server.py --root <holographic-display-main/server> --queue-size 64 --overflow disconnect
+
+main.go ile aynı uçlar: /ws (WebSocket), / (index.html), /3d/<dosya>, /filelist.
+Farklar:
+  - Cihaz bağlanınca "REGISTER <id>" gönderir ve o kimliğe kaydedilir; "<id> komut"
+    (metin veya ikili) ve kontrolcünün "PING <id>" heartbeat'i sadece o soketlere
+    gider. Kimliği bilinmeyen ve öneksiz mesajlar main.go'daki gibi herkese
+    yayınlanır (cihazlar öneke göre süzer). PING ile kayıt yapılmaz: doğrudan
+    moddaki bot/GUI de aynı "PING <id>"yi gönderir.
+  - Cihazlardan gelenler (PING/PONG/ACK...) sadece kontrolcülere (kimlik kaydetmemiş
+    istemciler: bot, GUI, web arayüzü) gider; cihazlar birbirinin heartbeat'ini almaz.
+  - Her istemcinin sınırlı gönderim kuyruğu vardır; yavaş istemci diğerlerini
+    bekletmez. Kuyruk dolunca en eski mesaj atılır (--overflow drop) veya
+    istemci düşürülür (--overflow disconnect).
+  - Her --stats-interval saniyede mesaj/sn ve kuyruk derinlikleri loglanır,
+    /metrics aynı bilgileri JSON döner.
+
+Federasyon (farklı alt ağlardaki röleler):
+    python relay_server.py --name salonA
+    python relay_server.py --name salonB --peer ws://10.0.1.5:8080/ws
+  --peer bir tarafta yeterlidir; bağlantı tek WebSocket'tir ve koparsa jitter'lı
+  backoff ile yeniden kurulur. Eşler birbirine yerel cihaz listelerini bildirir
+  (RELAY_DEVICES tam liste, RELAY_ADD / RELAY_DEL değişiklik). Kontrolcüden gelen
+  "<id> komut" yerelde yoksa sadece o cihazı bildiren eşe gider; öneksiz mesajlar
+  tüm eşlere bir kez gider. Cihaz trafiği eşlere "RELAY_UP <mesaj>" olarak
+  taşınır ve oradaki kontrolcülere ulaşır. Eşten gelen hiçbir şey başka eşe
+  aktarılmaz (döngü olmaz); her site yönetileceği sitelerle doğrudan eşleşmelidir.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import mimetypes
+import os
+import random
+import socket
+import time
+from typing import Dict, Optional, Set, Union
+
+import websockets
+from websockets.asyncio.server import ServerConnection
+from websockets.http11 import Request, Response
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("relay")
+logging.getLogger("websockets").setLevel(logging.WARNING)
+
+Message = Union[str, bytes]
+MAX_ID_LENGTH = 64   # ikili karelerde öneki ararken bakılan en fazla bayt
+PEER_MAX_DELAY = 30.0
+
+
+class Client:
+    """Bir WebSocket istemcisi ve onun sınırlı gönderim kuyruğu"""
+
+    def __init__(self, ws: ServerConnection, queue_size: int):
+        self.ws = ws
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.device_id: Optional[str] = None   # REGISTER ile kaydolan cihaz
+        self.peer_name: Optional[str] = None   # federasyon eşi; ikisi de None ise kontrolcü
+        self.closing = False
+        self.dropped = 0
+
+    @property
+    def name(self) -> str:
+        host = self.ws.remote_address[0] if self.ws.remote_address else "?"
+        if self.peer_name is not None:
+            return f"eş {self.peer_name}@{host}"
+        return f"{self.device_id or 'kontrolcü'}@{host}"
+
+    @property
+    def is_controller(self) -> bool:
+        return self.device_id is None and self.peer_name is None
+
+    async def writer(self, server: "RelayServer") -> None:
+        """Kuyruğu sokete boşalt; yavaş soket sadece kendi kuyruğunu bekletir"""
+        try:
+            while True:
+                message = await self.queue.get()
+                await self.ws.send(message)
+                server.stats["out"] += 1
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+
+class RelayServer:
+    def __init__(self, root: str, queue_size: int, overflow: str, name: str = ""):
+        self.root = os.path.abspath(root)
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.name = name or socket.gethostname()
+        self.clients: Set[Client] = set()
+        self.devices: Dict[str, Set[Client]] = {}
+        self.peers: Dict[str, Client] = {}      # eş adı (veya çevrilen adres) -> bağlantı
+        self.remote: Dict[str, Client] = {}     # eşlerin bildirdiği device_id -> eş
+        self.stats = {"in": 0, "out": 0, "routed": 0, "broadcast": 0, "to_controllers": 0,
+                      "forwarded": 0, "dropped": 0, "disconnected": 0}
+        self.rates = {"in_per_s": 0.0, "out_per_s": 0.0}
+
+    # ===== YÖNLENDİRME =====
+    def enqueue(self, client: Client, message: Message) -> None:
+        if client.closing:
+            return
+        if client.queue.full():
+            if self.overflow == "disconnect":
+                client.closing = True
+                self.stats["disconnected"] += 1
+                logger.warning(f"🐢 {client.name} yetişemiyor ({self.queue_size} mesaj birikti), düşürülüyor")
+                asyncio.create_task(client.ws.close(1013, "slow consumer"))
+                return
+            client.queue.get_nowait()   # en eskiyi at, en yeni kalsın
+            client.dropped += 1
+            self.stats["dropped"] += 1
+        client.queue.put_nowait(message)
+
+    @staticmethod
+    def target_id(message: Message) -> Optional[str]:
+        """'<id> ...' önekindeki kimlik (ikili pose karelerinde de); 'PING <id>' için <id>"""
+        if isinstance(message, str):
+            head, sep, rest = message.partition(" ")
+            if head == "PING":
+                # kontrolcü "PING <id>", cihazın kendi heartbeat'i "PING <id> <n>"
+                return rest.split(" ", 1)[0].strip() or None
+            return head if sep else None
+        space = message.find(b" ", 0, MAX_ID_LENGTH)
+        if space <= 0:
+            return None
+        try:
+            return message[:space].decode("ascii")
+        except UnicodeDecodeError:
+            return None
+
+    def register(self, client: Client, device_id: str) -> None:
+        if client.device_id == device_id:
+            return
+        self.unregister(client)
+        client.device_id = device_id
+        if device_id not in self.devices:
+            self.advertise(f"RELAY_ADD {device_id}")
+        self.devices.setdefault(device_id, set()).add(client)
+        logger.info(f"📟 Cihaz kaydoldu: {client.name}")
+
+    def unregister(self, client: Client) -> None:
+        if client.device_id is None:
+            return
+        sockets = self.devices.get(client.device_id)
+        if sockets is not None:
+            sockets.discard(client)
+            if not sockets:
+                del self.devices[client.device_id]
+                self.advertise(f"RELAY_DEL {client.device_id}")
+
+    def route(self, sender: Client, message: Message) -> None:
+        self.stats["in"] += 1
+        if sender.peer_name is not None:
+            self.from_peer(sender, message)
+            return
+        if isinstance(message, str):
+            if message.startswith("RELAY_HELLO "):
+                self.add_peer(sender, message.split(" ", 1)[1].strip())
+                return
+            if message.startswith("REGISTER "):
+                self.register(sender, message[9:].strip())
+                return
+
+        if sender.device_id is not None:
+            # Cihazdan: PING/PONG/ACK ve diğerleri sadece kontrolcülere (eşlerdekiler dahil)
+            self.to_controllers(message)
+            if isinstance(message, str):
+                self.advertise("RELAY_UP " + message)
+            return
+
+        self.deliver(sender, message, forward=True)
+
+    def to_controllers(self, message: Message) -> None:
+        self.stats["to_controllers"] += 1
+        for client in self.clients:
+            if client.is_controller:
+                self.enqueue(client, message)
+
+    def deliver(self, sender: Client, message: Message, forward: bool) -> None:
+        """Kontrolcü komutu: yerel cihaza, yoksa onu bildiren eşe, o da yoksa herkese"""
+        target = self.target_id(message) or ""
+        targets = self.devices.get(target)
+        if targets:
+            self.stats["routed"] += 1
+            for client in targets:
+                self.enqueue(client, message)
+            return
+
+        peer = self.remote.get(target) if forward else None
+        if peer is not None:
+            self.stats["forwarded"] += 1
+            self.enqueue(peer, message)
+            return
+
+        # Öneksiz veya henüz kaydolmamış kimlik: main.go gibi herkese (eşlere bir kez)
+        self.stats["broadcast"] += 1
+        for client in self.clients:
+            if client is not sender and (client.peer_name is None or forward):
+                self.enqueue(client, message)
+
+    # ===== FEDERASYON =====
+    def advertise(self, message: str) -> None:
+        for peer in self.peers.values():
+            self.enqueue(peer, message)
+
+    def add_peer(self, client: Client, name: str) -> None:
+        old = self.peers.get(name)
+        if old is not None and old is not client:
+            # Aynı eş yeniden bağlandı: eski (muhtemelen yarı ölü) bağlantı kapatılır
+            self.drop_peer(old)
+            asyncio.create_task(old.ws.close(1000, "replaced"))
+        client.peer_name = name
+        self.peers[name] = client
+        self.enqueue(client, "RELAY_DEVICES " + " ".join(sorted(self.devices)))
+        logger.info(f"🔗 Eş bağlandı: {client.name}")
+
+    def drop_peer(self, client: Client) -> None:
+        if self.peers.get(client.peer_name) is client:
+            del self.peers[client.peer_name]
+        for device_id in [d for d, peer in self.remote.items() if peer is client]:
+            del self.remote[device_id]
+
+    def from_peer(self, peer: Client, message: Message) -> None:
+        """Eşten gelen hiçbir mesaj başka eşe aktarılmaz"""
+        if isinstance(message, str) and message.startswith("RELAY_"):
+            kind, _, rest = message.partition(" ")
+            if kind == "RELAY_UP":
+                self.to_controllers(rest)
+            elif kind == "RELAY_DEVICES":
+                for device_id in [d for d, p in self.remote.items() if p is peer]:
+                    del self.remote[device_id]
+                for device_id in rest.split():
+                    self.remote[device_id] = peer
+                logger.info(f"🔗 {peer.name}: {len(rest.split())} cihaz bildirdi")
+            elif kind == "RELAY_ADD":
+                self.remote[rest.strip()] = peer
+            elif kind == "RELAY_DEL":
+                if self.remote.get(rest.strip()) is peer:
+                    del self.remote[rest.strip()]
+            return
+        self.deliver(peer, message, forward=False)
+
+    async def dial_peer(self, url: str) -> None:
+        """Eşe bağlan ve bağlı tut; kopunca full-jitter backoff ile yeniden dene"""
+        step = 0
+        while True:
+            started = time.monotonic()
+            try:
+                async with websockets.connect(url, max_size=None, close_timeout=1) as ws:
+                    await ws.send(f"RELAY_HELLO {self.name}")
+                    client = Client(ws, self.queue_size)
+                    client.peer_name = url
+                    self.peers[url] = client
+                    self.enqueue(client, "RELAY_DEVICES " + " ".join(sorted(self.devices)))
+                    logger.info(f"🔗 Eşe bağlanıldı: {url}")
+                    await self.serve_client(client)
+            except Exception as e:
+                logger.warning(f"⚠️ Eş bağlantısı kurulamadı ({url}): {e}")
+            if time.monotonic() - started >= PEER_MAX_DELAY:
+                step = 0
+            delay = random.uniform(0, min(PEER_MAX_DELAY, 2 ** step))
+            step = min(step + 1, 16)
+            await asyncio.sleep(delay)
+
+    # ===== WEBSOCKET =====
+    async def handler(self, ws: ServerConnection) -> None:
+        await self.serve_client(Client(ws, self.queue_size))
+
+    async def serve_client(self, client: Client) -> None:
+        self.clients.add(client)
+        writer = asyncio.create_task(client.writer(self))
+        logger.info(f"🔌 Bağlandı: {client.name} ({len(self.clients)} istemci)")
+        try:
+            async for message in client.ws:
+                self.route(client, message)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            writer.cancel()
+            self.clients.discard(client)
+            self.unregister(client)
+            if client.peer_name is not None:
+                self.drop_peer(client)
+            logger.info(f"🔌 Ayrıldı: {client.name} ({len(self.clients)} istemci)")
+
+    # ===== HTTP (main.go ile aynı sayfalar) =====
+    def file_response(self, connection: ServerConnection, path: str) -> Response:
+        if not os.path.isfile(path):
+            return connection.respond(404, "404 page not found\n")
+        with open(path, "rb") as f:
+            body = f.read()
+        response = connection.respond(200, "")
+        response.body = body
+        del response.headers["Content-Type"]
+        del response.headers["Content-Length"]
+        response.headers["Content-Type"] = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        response.headers["Content-Length"] = str(len(body))
+        return response
+
+    def process_request(self, connection: ServerConnection, request: Request) -> Optional[Response]:
+        path = request.path.split("?", 1)[0]
+        if path == "/ws":
+            return None   # WebSocket el sıkışması devam eder
+        if path == "/filelist":
+            models_dir = os.path.join(self.root, "3d")
+            names = sorted(n for n in os.listdir(models_dir) if n.endswith(".glb")) if os.path.isdir(models_dir) else []
+            response = connection.respond(200, json.dumps(names or None))
+            del response.headers["Content-Type"]
+            response.headers["Content-Type"] = "application/json"
+            return response
+        if path == "/metrics":
+            return connection.respond(200, json.dumps(self.metrics(), ensure_ascii=False))
+        if path.startswith("/3d/"):
+            models_dir = os.path.join(self.root, "3d")
+            target = os.path.abspath(os.path.join(models_dir, path[len("/3d/"):]))
+            if os.path.commonpath([models_dir, target]) != models_dir:
+                return connection.respond(404, "404 page not found\n")
+            return self.file_response(connection, target)
+        return self.file_response(connection, os.path.join(self.root, "index.html"))
+
+    # ===== METRİKLER =====
+    def metrics(self) -> Dict[str, object]:
+        depths = [c.queue.qsize() for c in self.clients]
+        return {
+            **self.stats,
+            **self.rates,
+            "clients": len(self.clients),
+            "devices": len(self.devices),
+            "peers": sorted(self.peers),
+            "remote_devices": len(self.remote),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "queue_size": self.queue_size,
+            "slowest": [
+                {"client": c.name, "depth": c.queue.qsize(), "dropped": c.dropped}
+                for c in sorted(self.clients, key=lambda c: c.queue.qsize(), reverse=True)[:3]
+                if c.queue.qsize()
+            ],
+        }
+
+    async def report(self, interval: float) -> None:
+        last_in, last_out, last_at = 0, 0, time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            elapsed = now - last_at
+            self.rates["in_per_s"] = round((self.stats["in"] - last_in) / elapsed, 1)
+            self.rates["out_per_s"] = round((self.stats["out"] - last_out) / elapsed, 1)
+            last_in, last_out, last_at = self.stats["in"], self.stats["out"], now
+            m = self.metrics()
+            logger.info(
+                f"📊 {m['clients']} istemci ({m['devices']} cihaz, {len(m['peers'])} eş / "
+                f"{m['remote_devices']} uzak cihaz) · "
+                f"giriş {m['in_per_s']}/sn · çıkış {m['out_per_s']}/sn · "
+                f"kuyruk toplam {m['queue_depth_total']} / en derin {m['queue_depth_max']} · "
+                f"düşen {m['dropped']} · atılan istemci {m['disconnected']}"
+            )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Hologram röle sunucusu (holoserv uyumlu)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--root", default=".", help="index.html ve 3d/ klasörünün bulunduğu yer")
+    parser.add_argument("--queue-size", type=int, default=256, help="istemci başına bekleyen mesaj sınırı")
+    parser.add_argument("--overflow", choices=("drop", "disconnect"), default="drop",
+                        help="kuyruk dolunca: en eskiyi at veya istemciyi düşür")
+    parser.add_argument("--stats-interval", type=float, default=10.0)
+    parser.add_argument("--name", default="", help="federasyonda bu rölenin adı (varsayılan: makine adı)")
+    parser.add_argument("--peer", action="append", default=[], help="eş röle adresi, örn. ws://10.0.1.5:8080/ws")
+    args = parser.parse_args()
+
+    server = RelayServer(args.root, args.queue_size, args.overflow, args.name)
+    async with websockets.serve(server.handler, args.host, args.port,
+                                process_request=server.process_request, max_size=None):
+        logger.info(f"🚀 Röle sunucusu '{server.name}': ws://{args.host}:{args.port}/ws (kök: {server.root})")
+        peers = [asyncio.create_task(server.dial_peer(url)) for url in args.peer]
+        try:
+            await server.report(args.stats_interval)
+        finally:
+            for task in peers:
+                task.cancel()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -272,10 +272,10 @@ class SimpleController:
         self.log_text.pack(fill=tk.BOTH, expand=True)
     
     def select_server_path(self):
-        """holoserv.exe dosyasını seç"""
+        """holoserv.exe (veya relay_server.py) dosyasını seç"""
         filepath = filedialog.askopenfilename(
             title="holoserv.exe Dosyasını Seç",
-            filetypes=[("Executable files", "*.exe"), ("All files", "*.*")]
+            filetypes=[("Executable files", "*.exe"), ("Python files", "*.py"), ("All files", "*.*")]
         )
         
         if filepath:
@@ -321,10 +321,14 @@ class SimpleController:
             # Dosyanın bulunduğu klasörü al
             server_dir = os.path.dirname(self.server_path)
             
-            # .exe dosyasını yeni konsol penceresinde başlat
+            # .exe dosyasını yeni konsol penceresinde başlat; relay_server.py
+            # (holoserv'in Python karşılığı) Python ile çalıştırılır
+            command = [self.server_path]
+            if self.server_path.endswith(".py"):
+                command = [sys.executable, self.server_path]
             self.server_process = subprocess.Popen(
-                [self.server_path],
-                creationflags=subprocess.CREATE_NEW_CONSOLE,
+                command,
+                creationflags=getattr(subprocess, "CREATE_NEW_CONSOLE", 0),
                 cwd=server_dir
             )
             self.log(f"✅ Godot Server başlatıldı! (PID: {self.server_process.pid})")